@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+한국어 + 영어 명령 동시 인식
+- 주 인식기(VoskAsr/TieredAsr, 한국어)와 영어 모델 + 카탈로그 grammar_en 문법 인식기를 같은 VAD 구간에 함께 돌린다.
+  영어 쪽은 전용 스레드에서 디코딩(Vosk 는 디코딩 중 GIL 을 놓으므로 다른 코어에서 병렬)
+  → 청크당 지연은 두 인식기 중 느린 쪽(합이 아님)
+- 확정 시 두 결과를 합친다: 한국어 n-best 확률은 그대로, 영어 문장은 단어 신뢰도 평균 × ASR_EN_WEIGHT 로
+  (ASR_EN_MIN_CONF 미만이거나 [unk] 이면 버림). 의도 점수화는 가설 목록을 그대로 쓰므로 두 언어가
+  같은 의도를 가리키면 점수가 더해지고, 다르면 확신이 큰 쪽이 이긴다.
+- 파셜(~)은 주 인식기 것만.
+"""
+import os
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from voice_pipeline import VoskAsr, SAMPLE_RATE, CHUNK_MS
+from voice_nlp import default_catalog
+
+ASR_EN_MODEL_DIR = os.environ.get("ASR_EN_MODEL_DIR", "")           # 예: /models/vosk-en-small
+ASR_EN_MIN_CONF  = float(os.environ.get("ASR_EN_MIN_CONF", "0.75"))
+ASR_EN_WEIGHT    = float(os.environ.get("ASR_EN_WEIGHT", "1.0"))
+_STASH_CHUNKS    = 20          # 영어만 먼저 확정된 결과를 기다려 주는 길이(청크, 2초)
+
+
+class BilingualAsr:
+    """VoskAsr 와 같은 load/accept/flush. primary 는 한국어 인식기(그대로 감쌈)."""
+
+    def __init__(self, primary, en_model_dir, rate=SAMPLE_RATE, min_conf=ASR_EN_MIN_CONF, weight=ASR_EN_WEIGHT):
+        self.primary = primary
+        self.min_conf = min_conf
+        self.weight = weight
+        # 단일 결과 + 단어 신뢰도(SetMaxAlternatives 없이)로 받아야 언어 사이 비교가 된다
+        self.secondary = VoskAsr(en_model_dir, rate=rate, max_alt=0)
+        self.secondary.word_conf = True
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asr-en")
+        self._stash = None           # (hyps, 지난 청크 수)
+        self._events = deque(maxlen=64)
+        self.en_used = 0
+        self.en_dropped = 0
+        self.chunks = 0
+        self.ko_s = 0.0
+        self.en_s = 0.0
+        self.wall_s = 0.0
+
+    def load(self):
+        tables = default_catalog().tables
+        if not tables.grammar_en:
+            print("[WARN] 카탈로그에 grammar_en 이 없어 영어 인식기를 열린 어휘로 돌립니다.")
+        else:
+            self.secondary.grammar = json.dumps(tables.grammar_en + ["[unk]"], ensure_ascii=False)
+        fut = self._pool.submit(self.secondary.load)
+        self.primary.load()
+        fut.result()
+        self._events.append(("INFO", f"bilingual: + en {self.secondary.model_dir} "
+                                     f"({len(tables.grammar_en)} phrases, min_conf={self.min_conf})"))
+
+    # ---------- 인식 ----------
+    def _en_accept(self, pcm):
+        t0 = time.perf_counter()
+        res = self.secondary.accept(pcm)
+        self.en_s += time.perf_counter() - t0
+        return res
+
+    def accept(self, pcm: bytes):
+        t0 = time.perf_counter()
+        fut = self._pool.submit(self._en_accept, pcm)
+        res = self.primary.accept(pcm)
+        self.ko_s += time.perf_counter() - t0
+        en = fut.result()
+        self.wall_s += time.perf_counter() - t0
+        self.chunks += 1
+        if en is not None and en[0] == "final" and en[1]:
+            self._stash = (en[1], 0)
+        elif self._stash is not None:
+            hyps, age = self._stash
+            self._stash = (hyps, age + 1) if age + 1 < _STASH_CHUNKS else None
+        if res is not None and res[0] == "final":
+            return "final", self._merge(res[1], self._take_en())
+        return res
+
+    def flush(self):
+        fut = self._pool.submit(self.secondary.flush)
+        hyps = self.primary.flush()
+        en = fut.result()
+        if self._stash is not None and not en:
+            en = self._stash[0]
+        self._stash = None
+        return self._merge(hyps, en)
+
+    def _take_en(self):
+        """주 인식기가 먼저 확정: 영어 쪽은 이미 확정한 결과가 있으면 그것, 없으면 지금 확정."""
+        if self._stash is not None:
+            en = self._stash[0]
+            self._stash = None
+            return en
+        return self.secondary.flush()
+
+    def _merge(self, ko, en):
+        if not en:
+            return ko
+        text, conf = en[0]
+        if "[unk]" in text or conf < self.min_conf:
+            self.en_dropped += 1
+            return ko
+        self.en_used += 1
+        self._events.append(("EN", f"'{text}' conf={conf:.2f}"))
+        out = list(ko) + [(text, conf * self.weight)]
+        out.sort(key=lambda h: -h[1])
+        return out
+
+    # ---------- 보고 ----------
+    def pop_events(self):
+        out = list(self._events)
+        self._events.clear()
+        pop = getattr(self.primary, "pop_events", None)
+        if pop is not None:
+            out.extend(pop())
+        return out
+
+    def stats(self) -> dict:
+        n = self.chunks or 1
+        st = {"en_used": self.en_used, "en_dropped": self.en_dropped,
+              "ko_ms_per_chunk": round(self.ko_s / n * 1000.0, 3),
+              "en_ms_per_chunk": round(self.en_s / n * 1000.0, 3),
+              "wall_ms_per_chunk": round(self.wall_s / n * 1000.0, 3),
+              "budget_ms": CHUNK_MS}
+        if hasattr(self.primary, "stats"):
+            st["primary"] = self.primary.stats()
+        return st
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CPU 부하에 따라 ASR 단계(tier)를 바꾸는 Vosk 인식기
+- ASR_TIERS="big=/models/vosk-ko-big,base=/models/vosk-ko,cmd=/models/vosk-ko:grammar"
+  무거운 것 → 가벼운 것 순. ':grammar' 는 카탈로그 명령 문법으로 제한한 디코딩(같은 모델이면 한 번만 로드)
+- 청크마다 디코딩 시간/오디오 길이(RTF)를 재고, 최근 ASR_TIER_WINDOW 초 평균이
+    ASR_TIER_HIGH 이상  → 한 단계 가볍게
+    (다음 무거운 단계의 예상 RTF) ASR_TIER_LOW 이하 → 한 단계 무겁게
+  예상 RTF = 지금 RTF × 비용 비(내려올 때 무거운 단계의 마지막 RTF / 내려온 직후 가벼운 단계 RTF)
+- 바꾸는 시점은 발화 경계(확정 직후)라 인식 중인 문장을 끊지 않는다.
+  실시간을 놓친 경우(RTF ≥ 1)에만 즉시 바꾸고, 현재 발화 오디오를 새 인식기에 다시 넣어 잃지 않는다.
+- 단계 변경은 pop_events() 로 꺼내 Pipeline 이 [TIER] 로그로 남긴다.
+"""
+import os
+import sys
+import json
+import time
+from collections import deque
+
+from voice_pipeline import VoskAsr, SAMPLE_RATE
+from voice_nlp import default_catalog
+
+ASR_TIERS       = os.environ.get("ASR_TIERS", "")
+ASR_TIER_WINDOW = float(os.environ.get("ASR_TIER_WINDOW", "3.0"))   # RTF 평균 구간(오디오 초)
+ASR_TIER_HIGH   = float(os.environ.get("ASR_TIER_HIGH", "0.6"))
+ASR_TIER_LOW    = float(os.environ.get("ASR_TIER_LOW", "0.3"))
+ASR_TIER_HOLD   = float(os.environ.get("ASR_TIER_HOLD", "10.0"))    # 바꾼 뒤 최소 유지 시간(초)
+_REPLAY_MAX_SEC = 15.0                                              # 즉시 전환 때 다시 넣는 최대 길이
+
+def parse_tiers(spec: str):
+    """"big=/m/a,cmd=/m/b:grammar" → [("big", "/m/a", False), ("cmd", "/m/b", True)]"""
+    out = []
+    for i, item in enumerate([x.strip() for x in (spec or "").split(",") if x.strip()]):
+        name, _, rest = item.rpartition("=")
+        path, grammar = rest, False
+        if rest.endswith(":grammar"):
+            path, grammar = rest[: -len(":grammar")], True
+        out.append((name or f"tier{i}", path, grammar))
+    return out
+
+
+class _Tier:
+    __slots__ = ("name", "model_dir", "grammar", "rec", "up_ratio", "audio_s", "busy_s", "entered")
+
+    def __init__(self, name, model_dir, grammar):
+        self.name = name
+        self.model_dir = model_dir
+        self.grammar = grammar
+        self.rec = None
+        self.up_ratio = None      # 한 단계 무거운 쪽과의 RTF 비(같은 부하에서)
+        self.audio_s = 0.0
+        self.busy_s = 0.0
+        self.entered = 0
+
+
+class TieredAsr(VoskAsr):
+    """VoskAsr 와 같은 load/accept/flush. 여러 인식기를 미리 만들어 두고 self.rec 만 바꿔 끼운다."""
+
+    def __init__(self, tiers, rate=SAMPLE_RATE, max_alt=5, alt_temp=1.0, window_sec=ASR_TIER_WINDOW,
+                 high=ASR_TIER_HIGH, low=ASR_TIER_LOW, hold_sec=ASR_TIER_HOLD, start=0):
+        if not tiers:
+            raise ValueError("tiers 가 비어 있음")
+        super().__init__(tiers[start][1], rate=rate, max_alt=max_alt, alt_temp=alt_temp)
+        self.tiers = [_Tier(*t) for t in tiers]
+        self.cur = start
+        self.window_sec = window_sec
+        self.high = high
+        self.low = low
+        self.hold_sec = hold_sec
+        self._win = deque()          # (오디오 초, 디코딩 초)
+        self._win_audio = 0.0
+        self._win_busy = 0.0
+        self._pending = None         # 발화 경계에서 바꿀 단계
+        self._utt = []               # 현재 발화 오디오(즉시 전환 때 재투입)
+        self._utt_bytes = 0
+        self._t_switch = 0.0
+        self._leave_rtf = None       # 가볍게 내려오기 직전 RTF(비용 비 측정용)
+        self._events = deque(maxlen=64)
+        self.switches = 0
+
+    # ---------- 준비 ----------
+    def load(self):
+        try:
+            import vosk
+        except ImportError:
+            print("[ERR] pip install vosk", file=sys.stderr); sys.exit(2)
+        models = {}
+        grammar = None
+        for t in self.tiers:
+            if not os.path.isdir(t.model_dir):
+                print(f"[ERR] VOSK 모델 폴더가 없습니다: {t.model_dir} (tier {t.name})", file=sys.stderr)
+                sys.exit(2)
+            if t.model_dir not in models:
+                print(f"[INFO] load vosk model: {t.model_dir}")
+                models[t.model_dir] = vosk.Model(t.model_dir)
+            if t.grammar:
+                if grammar is None:
+                    grammar = json.dumps(default_catalog().tables.grammar + ["[unk]"], ensure_ascii=False)
+                t.rec = vosk.KaldiRecognizer(models[t.model_dir], self.rate, grammar)
+            else:
+                t.rec = vosk.KaldiRecognizer(models[t.model_dir], self.rate)
+            t.rec.SetWords(True)
+            if self.max_alt > 0:
+                t.rec.SetMaxAlternatives(self.max_alt)
+        self.models = models         # 폴더 → vosk.Model (asr_wake 가 같은 폴더면 나눠 씀)
+        self.rec = self.tiers[self.cur].rec
+        self.tiers[self.cur].entered = 1
+        self._t_switch = time.monotonic()
+        self._note(f"start {self.describe()}")
+
+    def describe(self):
+        names = " > ".join(("*" if i == self.cur else "") + t.name + ("(grammar)" if t.grammar else "")
+                           for i, t in enumerate(self.tiers))
+        return f"asr tiers {names} (RTF high={self.high} low={self.low} window={self.window_sec}s)"
+
+    @property
+    def tier(self) -> str:
+        return self.tiers[self.cur].name
+
+    # ---------- 인식 ----------
+    def accept(self, pcm: bytes):
+        t0 = time.perf_counter()
+        res = super().accept(pcm)
+        self._observe(len(pcm) / 2.0 / self.rate, time.perf_counter() - t0)
+        if res is not None and res[0] == "final":
+            self._utt_reset()
+            self._apply_pending()
+            return res
+        self._utt_keep(pcm)
+        if self._pending is not None and self._pending > self.cur and self.rtf >= 1.0:
+            # 실시간을 놓침: 발화 끝까지 기다리면 확정이 수 초씩 밀린다 → 지금 바꾸고 발화 오디오 재투입
+            return self._switch_now()
+        return res
+
+    def flush(self):
+        hyps = super().flush()
+        self._utt_reset()
+        self._apply_pending()
+        return hyps
+
+    # ---------- 단계 결정 ----------
+    @property
+    def rtf(self) -> float:
+        return self._win_busy / self._win_audio if self._win_audio > 0 else 0.0
+
+    def _observe(self, audio_s, busy_s):
+        t = self.tiers[self.cur]
+        t.audio_s += audio_s
+        t.busy_s += busy_s
+        self._win.append((audio_s, busy_s))
+        self._win_audio += audio_s
+        self._win_busy += busy_s
+        while self._win and self._win_audio - self._win[0][0] >= self.window_sec:
+            a, b = self._win.popleft()
+            self._win_audio -= a
+            self._win_busy -= b
+        if self._win_audio < self.window_sec * 0.9:
+            return
+        rtf = self.rtf
+        if self._leave_rtf is not None and rtf > 0:
+            t.up_ratio = self._leave_rtf / rtf
+            self._leave_rtf = None
+        if time.monotonic() - self._t_switch < self.hold_sec:
+            return
+        want = None
+        if rtf >= self.high and self.cur < len(self.tiers) - 1:
+            want = self.cur + 1
+        elif self.cur > 0:
+            # 무거운 단계와 비교해 본 적이 없으면(가벼운 단계로 시작) 3배로 가정
+            est = rtf * (t.up_ratio or 3.0)
+            if est <= self.low:
+                want = self.cur - 1
+        if want != self._pending:
+            # 부하가 풀리면 예약도 취소(다음 발화 경계까지 조건이 유지될 때만 바꾼다)
+            self._pending = want
+            if want is not None:
+                self._note(f"pending {t.name} → {self.tiers[want].name} (rtf={rtf:.2f})")
+
+    def _apply_pending(self):
+        if self._pending is None or self._pending == self.cur:
+            self._pending = None
+            return
+        self._set_tier(self._pending, "발화 경계")
+
+    def _switch_now(self):
+        old = self.rec
+        if hasattr(old, "Reset"):
+            old.Reset()
+        self._set_tier(self._pending, "실시간 초과 → 즉시")
+        # 지금까지의 발화를 새 인식기로 한 번에 다시 디코딩(파셜은 건너뜀)
+        audio = b"".join(self._utt)
+        self._utt_reset()
+        t0 = time.perf_counter()
+        res = super().accept(audio) if audio else None
+        self._observe(len(audio) / 2.0 / self.rate, time.perf_counter() - t0)
+        if res is not None and res[0] == "final":
+            return res
+        self._utt_keep(audio)
+        return res
+
+    def _set_tier(self, i, why):
+        prev = self.tiers[self.cur]
+        rtf = self.rtf
+        self._leave_rtf = rtf if i > self.cur else None
+        self.cur = i
+        self._pending = None
+        self.rec = self.tiers[i].rec
+        self._last_partial = ""
+        self.tiers[i].entered += 1
+        self.switches += 1
+        self._t_switch = time.monotonic()
+        # 새 단계 RTF 로 다시 채운다
+        self._win.clear()
+        self._win_audio = self._win_busy = 0.0
+        self._note(f"{prev.name} → {self.tiers[i].name} ({why}, rtf={rtf:.2f})")
+
+    def _utt_keep(self, pcm):
+        self._utt.append(pcm)
+        self._utt_bytes += len(pcm)
+        while self._utt and self._utt_bytes > _REPLAY_MAX_SEC * self.rate * 2:
+            self._utt_bytes -= len(self._utt.pop(0))
+
+    def _utt_reset(self):
+        self._utt = []
+        self._utt_bytes = 0
+
+    # ---------- 보고 ----------
+    def _note(self, msg):
+        self._events.append(("TIER", msg))
+
+    def pop_events(self):
+        out = list(self._events)
+        self._events.clear()
+        return out
+
+    def stats(self) -> dict:
+        return {"tier": self.tier, "switches": self.switches, "rtf": round(self.rtf, 3),
+                "tiers": {t.name: {"audio_s": round(t.audio_s, 1),
+                                   "rtf": round(t.busy_s / t.audio_s, 3) if t.audio_s else None,
+                                   "up_ratio": round(t.up_ratio, 2) if t.up_ratio is not None else None,
+                                   "entered": t.entered} for t in self.tiers}}
+
+
+def asr_from_env(model_dir, wake=True, **kw):
+    """
+    ASR_TIERS 가 있으면 TieredAsr, 없으면 model_dir 하나로 VoskAsr.
+    ASR_EN_MODEL_DIR 가 있으면 영어 명령 인식기를 나란히 붙인다(asr_bilingual).
+    WAKE_WORDS 가 있으면 호출어를 들은 뒤에만 위 인식기를 돌린다(asr_wake, wake=False 면 안 붙임).
+    """
+    tiers = parse_tiers(ASR_TIERS)
+    asr = TieredAsr(tiers, **kw) if tiers else VoskAsr(model_dir, **kw)
+    en_dir = os.environ.get("ASR_EN_MODEL_DIR", "")
+    if en_dir:
+        from asr_bilingual import BilingualAsr
+        asr = BilingualAsr(asr, en_dir, rate=kw.get("rate", SAMPLE_RATE))
+    if wake and os.environ.get("WAKE_WORDS", ""):
+        from asr_wake import wake_from_env
+        asr = wake_from_env(asr, tiers[-1][1] if tiers else model_dir, rate=kw.get("rate", SAMPLE_RATE))
+    return asr
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+호출어(wake word) 앞단: "고투야" 를 들은 뒤 잠깐만 전체 인식기를 돌린다
+- 평소에는 VAD 를 통과한 오디오를 작은 키워드 인식기(같은 Vosk 모델 + ["고투야", "[unk]"] 문법)에만 넣는다.
+  모델 폴더가 전체 인식기와 같으면 이미 불러온 vosk.Model 을 나눠 쓴다(모델 RAM 한 벌). WAKE_MODEL_DIR 가
+  다른 모델을 가리킬 때만 따로 불러온다.
+  전 어휘 디코딩이 아니라서 가볍고, 파셜(~)도 명령 오인도 나오지 않는다.
+- 호출어가 잡히면 그 발화의 최근 오디오(WAKE_PREROLL_MS)를 전체 인식기에 넘겨
+  "고투야 앉아" 처럼 이어 말한 명령도 놓치지 않는다. 결과 문장에서 호출어는 지운다.
+- 전체 인식기는 호출 뒤 WAKE_WINDOW_SEC 동안 열리고, 그 뒤 발화 경계에서 닫힌다
+  창 안에서 호출어를 다시 말하면 창이 연장된다. 경계가 없는 연속 잡음이면 WAKE_MAX_SEC 에서 강제로 닫음.
+  시간은 clock(기본 time.monotonic; VAD 가 무음을 거르므로 오디오 길이로는 잴 수 없다).
+- 전체 인식기는 VoskAsr/TieredAsr/BilingualAsr 무엇이든 그대로 감싼다(asr_tiers.asr_from_env)
+"""
+import os
+import sys
+import json
+import time
+from collections import deque
+
+from voice_pipeline import SAMPLE_RATE, CHUNK_MS
+from voice_nlp import result_hypotheses
+
+WAKE_WORDS        = os.environ.get("WAKE_WORDS", "")                # 예: "고투야" (쉼표로 여러 개)
+WAKE_MODEL_DIR    = os.environ.get("WAKE_MODEL_DIR", "")            # 비우면 전체 인식기와 같은 모델
+WAKE_WINDOW_SEC   = float(os.environ.get("WAKE_WINDOW_SEC", "6"))
+WAKE_MAX_SEC      = float(os.environ.get("WAKE_MAX_SEC", "15"))
+WAKE_PREROLL_MS   = int(os.environ.get("WAKE_PREROLL_MS", "2000"))
+WAKE_MIN_CONF     = float(os.environ.get("WAKE_MIN_CONF", "0.6"))
+WAKE_ON_PARTIAL   = os.environ.get("WAKE_ON_PARTIAL", "1") in ("1", "true")
+
+
+def _squash(s):
+    return "".join(s.split())
+
+
+class KeywordSpotter:
+    """Vosk 문법 제한 인식기로 호출어만 찾는다. accept/flush → 찾은 호출어(문자열) 또는 None"""
+
+    def __init__(self, model_dir, words, rate=SAMPLE_RATE, min_conf=WAKE_MIN_CONF, on_partial=WAKE_ON_PARTIAL):
+        self.model_dir = model_dir
+        self.words = list(words)
+        self.rate = rate
+        self.min_conf = min_conf
+        self.on_partial = on_partial
+        self.rec = None
+        self.shared = False          # 전체 인식기의 모델을 나눠 쓰는지
+        self._keys = [(_squash(w), w) for w in self.words]
+
+    def load(self, model=None):
+        """model: 전체 인식기가 이미 불러온 같은 폴더의 vosk.Model(없으면 model_dir 에서 불러옴)"""
+        try:
+            import vosk
+        except ImportError:
+            print("[ERR] pip install vosk", file=sys.stderr); sys.exit(2)
+        self.shared = model is not None
+        if model is None:
+            if not os.path.isdir(self.model_dir):
+                print(f"[ERR] VOSK 모델 폴더가 없습니다: {self.model_dir}", file=sys.stderr)
+                sys.exit(2)
+            print(f"[INFO] load vosk model: {self.model_dir} (wake)")
+            model = vosk.Model(self.model_dir)
+        grammar = json.dumps(self.words + ["[unk]"], ensure_ascii=False)
+        self.rec = vosk.KaldiRecognizer(model, self.rate, grammar)
+        self.rec.SetWords(True)
+
+    def _find(self, text):
+        t = _squash(text)
+        for key, w in self._keys:
+            if key and key in t:
+                return w
+        return None
+
+    def _final(self, res):
+        hyps = result_hypotheses(json.loads(res), word_conf=True)
+        if not hyps:
+            return None
+        text, conf = hyps[0]
+        w = self._find(text)
+        return w if w and conf >= self.min_conf else None
+
+    def accept(self, pcm: bytes):
+        if self.rec.AcceptWaveform(pcm):
+            return self._final(self.rec.Result())
+        if self.on_partial:
+            w = self._find(json.loads(self.rec.PartialResult()).get("partial") or "")
+            if w:
+                self.reset()
+                return w
+        return None
+
+    def flush(self):
+        return self._final(self.rec.FinalResult())
+
+    def reset(self):
+        self.rec.FinalResult()       # 디코딩 상태 비우기(Reset 이 없는 버전도 있음)
+
+
+def _loaded_model(asr, model_dir):
+    """전체 인식기(VoskAsr/TieredAsr/BilingualAsr 의 primary)가 model_dir 로 이미 불러온 vosk.Model 또는 None"""
+    want = os.path.realpath(model_dir)
+    while asr is not None:
+        for d, m in (getattr(asr, "models", None) or {}).items():
+            if os.path.realpath(d) == want:
+                return m
+        m = getattr(asr, "model", None)
+        if m is not None and os.path.realpath(getattr(asr, "model_dir", "") or "") == want:
+            return m
+        asr = getattr(asr, "primary", None)
+    return None
+
+
+class WakeAsr:
+    """VoskAsr 와 같은 load/accept/flush. full 은 호출 뒤에만 돌리는 전체 인식기."""
+
+    def __init__(self, full, words, model_dir, rate=SAMPLE_RATE, window_sec=WAKE_WINDOW_SEC,
+                 max_sec=WAKE_MAX_SEC, preroll_ms=WAKE_PREROLL_MS, min_conf=WAKE_MIN_CONF,
+                 on_partial=WAKE_ON_PARTIAL, clock=time.monotonic):
+        self.full = full
+        self.clock = clock
+        self.spotter = KeywordSpotter(model_dir, words, rate=rate, min_conf=min_conf, on_partial=on_partial)
+        self.rate = rate
+        self.window_sec = window_sec
+        self.max_sec = max_sec
+        self.preroll = deque(maxlen=max(1, preroll_ms // CHUNK_MS))
+        self.armed = False
+        self._in_utt = False         # 전체 인식기가 발화 중간인지(창은 발화 경계에서만 닫힘)
+        self._until = 0.0            # 창이 닫히는 시각(clock)
+        self._t_wake = None          # 마지막 호출 시각(clock), 첫 확정까지
+        self._events = deque(maxlen=64)
+        self.wakes = 0
+        self.wake_to_final = deque(maxlen=50)    # 호출 → 첫 확정(ms)
+        self.handover_ms = deque(maxlen=50)      # preroll 을 전체 인식기에 넣는 데 걸린 시간
+        self.audio_s = 0.0
+        self.armed_s = 0.0
+        self.spot_s = 0.0
+        self.full_s = 0.0
+        self.spot_chunks = 0
+        self.full_chunks = 0
+
+    def load(self):
+        self.full.load()
+        self.spotter.load(_loaded_model(self.full, self.spotter.model_dir))
+        src = "shared" if self.spotter.shared else self.spotter.model_dir
+        self._events.append(("INFO", f"wake: {'/'.join(self.spotter.words)} ({src}) "
+                                     f"→ 전체 인식 {self.window_sec:.0f}s, preroll {self.preroll.maxlen * CHUNK_MS}ms"))
+
+    # ---------- 인식 ----------
+    def accept(self, pcm: bytes):
+        sec = len(pcm) / (2.0 * self.rate)
+        self.audio_s += sec
+        if self.armed and not self._in_utt:
+            self._maybe_close()
+        if not self.armed:
+            self.preroll.append(pcm)
+            t0 = time.perf_counter()
+            w = self.spotter.accept(pcm)
+            self.spot_s += time.perf_counter() - t0
+            self.spot_chunks += 1
+            if w is None:
+                return None
+            return self._wake(w, at_end=False)
+        self.armed_s += sec
+        self.full_chunks += 1
+        self._in_utt = True
+        res = self._full(self.full.accept, pcm)
+        if res is not None and res[0] == "final":
+            self._in_utt = False
+            res = ("final", self._strip(res[1]))
+            self._maybe_close()
+        elif self.clock() > self._until + self.max_sec:
+            self.full.flush()
+            self._close("발화 경계 없음 → 강제 종료")
+        return res
+
+    def flush(self):
+        if not self.armed:
+            t0 = time.perf_counter()
+            w = self.spotter.flush()
+            self.spot_s += time.perf_counter() - t0
+            if w is None:
+                self.preroll.clear()
+                return []
+            res = self._wake(w, at_end=True)
+            return res[1] if res else []
+        self._in_utt = False
+        hyps = self._strip(self._full(self.full.flush))
+        self._maybe_close()
+        return hyps
+
+    def _full(self, fn, *a):
+        t0 = time.perf_counter()
+        res = fn(*a)
+        self.full_s += time.perf_counter() - t0
+        return res
+
+    def _wake(self, word, at_end):
+        """호출어 발견: 창 열고 이 발화의 최근 오디오를 전체 인식기에 넘긴다."""
+        self.wakes += 1
+        self.armed = True
+        self._in_utt = not at_end
+        self._t_wake = self.clock()
+        self._until = self._t_wake + self.window_sec
+        chunks = list(self.preroll)
+        self.preroll.clear()
+        t0 = time.perf_counter()
+        final = partial = None
+        for c in chunks:
+            r = self.full.accept(c)
+            if r is not None:
+                if r[0] == "final":
+                    final = r
+                else:
+                    partial = r
+        if at_end:
+            hyps = self.full.flush()
+            final = ("final", hyps) if hyps or final is None else final
+        ms = (time.perf_counter() - t0) * 1000.0
+        self.full_s += ms / 1000.0
+        self.handover_ms.append(ms)
+        self._events.append(("WAKE", f"'{word}' → {self.window_sec:.0f}s 명령 대기 "
+                                     f"(preroll {len(chunks) * CHUNK_MS}ms, {ms:.0f}ms)"))
+        if final is not None:
+            hyps = self._strip(final[1])
+            if at_end:
+                self._maybe_close()
+            return ("final", hyps) if hyps or at_end else partial
+        return partial
+
+    def _strip(self, hyps):
+        """확정 가설에서 호출어 제거(빈 가설은 버림). 호출 뒤 첫 확정까지의 지연 기록."""
+        out = []
+        now = self.clock()
+        if hyps and self.spotter._find(hyps[0][0]):
+            self._until = now + self.window_sec       # 창 안에서 다시 부름 → 연장
+        for text, p in hyps or []:
+            for w in self.spotter.words:
+                text = text.replace(w, " ")
+            text = " ".join(text.split())
+            if text:
+                out.append((text, p))
+        if out and self._t_wake is not None:
+            self.wake_to_final.append((now - self._t_wake) * 1000.0)
+            self._t_wake = None
+        return out
+
+    def _maybe_close(self):
+        if self.armed and self.clock() >= self._until:
+            self._close("창 종료")
+
+    def _close(self, why):
+        self.armed = False
+        self._t_wake = None
+        self.spotter.reset()
+        self._events.append(("WAKE", f"{why} → 호출어 대기"))
+
+    # ---------- 보고 ----------
+    def pop_events(self):
+        out = list(self._events)
+        self._events.clear()
+        pop = getattr(self.full, "pop_events", None)
+        if pop is not None:
+            out.extend(pop())
+        return out
+
+    def stats(self) -> dict:
+        lat = sorted(self.wake_to_final)
+        st = {"armed": self.armed, "wakes": self.wakes,
+              "armed_frac": round(self.armed_s / self.audio_s, 3) if self.audio_s else 0.0,
+              "spot_ms_per_chunk": round(self.spot_s / max(1, self.spot_chunks) * 1000.0, 3),
+              "full_ms_per_chunk": round(self.full_s / max(1, self.full_chunks) * 1000.0, 3),
+              "cpu_s": {"spot": round(self.spot_s, 2), "full": round(self.full_s, 2)},
+              "wake_to_final_ms": round(lat[len(lat) // 2], 0) if lat else None,
+              "handover_ms": round(sum(self.handover_ms) / len(self.handover_ms), 1) if self.handover_ms else None}
+        if hasattr(self.full, "stats"):
+            st["full"] = self.full.stats()
+        return st
+
+
+def wake_from_env(asr, model_dir, rate=SAMPLE_RATE):
+    """WAKE_WORDS 가 있으면 asr 를 WakeAsr 로 감싼다(없으면 그대로)."""
+    words = [w.strip() for w in WAKE_WORDS.split(",") if w.strip()]
+    if not words:
+        return asr
+    return WakeAsr(asr, words, WAKE_MODEL_DIR or model_dir, rate=rate)
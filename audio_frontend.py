@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+캡처 전처리: 장치 고유 레이트/채널 → ASR 용 16kHz mono
+- PolyphaseResampler : 유리수 비(L/M) 폴리페이즈 FIR. 청크 경계 상태(이력/위상)를 이어 가며
+                       출력 샘플 전체를 한 번의 gather + einsum 으로 계산
+- ChannelMixer       : 다채널 → mono (평균 또는 채널 선택)
+- FrontendChain      : 단계 연결(리샘플 → 빔포머/믹서). Pipeline(frontend=...) 에 그대로 넘김
+- capture_frontend   : 장치 레이트/채널 + MIC_MIX 기준으로 체인 구성(변환이 필요 없으면 None)
+ALSA plughw 변환 대신 hw 장치를 고유 레이트로 열고 여기서 변환하면, 비용과 지연이 파이프라인 통계에 잡힌다.
+"""
+import os
+import sys
+import math
+import time
+
+np = None          # numpy 는 변환 단계를 실제로 만들 때 불러온다(16k mono 장치면 로드하지 않음)
+
+ASR_RATE = 16000
+MIC_MIX = os.environ.get("MIC_MIX", "beam")    # beam(빔포밍) | avg(평균) | <채널 번호>
+
+def _need_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            print("[ERR] pip install numpy  (리샘플/채널 변환에 필요)", file=sys.stderr)
+            sys.exit(2)
+        np = numpy
+    return np
+
+def design_lowpass(L, M, taps_per_phase=32, beta=8.0, rolloff=0.9):
+    """
+    폴리페이즈용 저역통과 필터 → (L, taps_per_phase)
+    L 배 올린 영역에서 차단 = rolloff * 0.5/max(L, M), 이득 L (보간 손실 보상), Kaiser 창.
+    """
+    n = L * taps_per_phase
+    fc = rolloff * 0.5 / max(L, M)
+    t = np.arange(n) - (n - 1) / 2.0
+    h = 2.0 * fc * np.sinc(2.0 * fc * t) * np.kaiser(n, beta) * L
+    # h[p + k*L] → H[p, k]
+    return h.reshape(taps_per_phase, L).T.astype(np.float32).copy()
+
+
+class PolyphaseResampler:
+    """
+    rate_in → rate_out, 채널 수 유지(인터리브 int16 in/out).
+    출력 n 번째 샘플은 L 배 영역 위치 u = pos + n*M 에서 위상 p = u % L 의 필터와
+    입력 x[u//L - k] (k < K) 의 내적. 청크 사이에는 마지막 K-1 입력과 pos 만 넘긴다.
+    """
+
+    def __init__(self, rate_in, rate_out=ASR_RATE, channels=1, taps_per_phase=32):
+        _need_numpy()
+        g = math.gcd(int(rate_in), int(rate_out))
+        self.rate_in = rate_in
+        self.rate_out = rate_out
+        self.channels = channels
+        self.L = rate_out // g
+        self.M = rate_in // g
+        self.K = taps_per_phase
+        self.H = design_lowpass(self.L, self.M, taps_per_phase)
+        self._k = np.arange(self.K)
+        self.reset()
+        self.busy = 0.0
+        self.samples_in = 0
+
+    def reset(self):
+        self._hist = np.zeros((self.channels, self.K - 1), dtype=np.float32)
+        self._pos = 0
+
+    @property
+    def delay_ms(self) -> float:
+        """필터 군지연(입력 K/2 샘플)."""
+        return self.K / 2.0 / self.rate_in * 1000.0
+
+    def describe(self):
+        return f"resample {self.rate_in}->{self.rate_out} (L/M={self.L}/{self.M}, {self.K} taps/phase, ch={self.channels})"
+
+    def process_float(self, x):
+        """(C, n) float → (C, n_out) float"""
+        t0 = time.perf_counter()
+        n = x.shape[1]
+        buf = np.concatenate([self._hist, x], axis=1)
+        L, M, K = self.L, self.M, self.K
+        total = n * L
+        n_out = (total - self._pos + M - 1) // M if total > self._pos else 0
+        if n_out > 0:
+            u = self._pos + np.arange(n_out, dtype=np.int64) * M
+            base = u // L + (K - 1)                                  # buf 안의 현재 입력 위치
+            idx = base[:, None] - self._k[None, :]                     # (n_out, K)
+            coef = self.H[u % L]                                       # (n_out, K)
+            y = np.einsum("cnk,nk->cn", buf[:, idx], coef)
+            self._pos = int(u[-1] + M - total)
+        else:
+            y = np.zeros((self.channels, 0), dtype=np.float32)
+            self._pos -= total
+        self._hist = buf[:, buf.shape[1] - (K - 1):]
+        self.samples_in += n
+        self.busy += time.perf_counter() - t0
+        return y
+
+    def process(self, pcm: bytes) -> bytes:
+        x = _deinterleave(pcm, self.channels)
+        if x is None:
+            return b""
+        return _interleave(self.process_float(x))
+
+    def stats(self) -> dict:
+        sec = self.samples_in / self.rate_in
+        return {"busy_s": round(self.busy, 4), "rtf": round(self.busy / sec, 5) if sec else None,
+                "delay_ms": round(self.delay_ms, 2)}
+
+
+class ChannelMixer:
+    """다채널 → mono. mix='avg' 면 평균, 정수면 그 채널만."""
+
+    def __init__(self, channels, mix="avg"):
+        _need_numpy()
+        self.channels = channels
+        self.mix = mix
+
+    def describe(self):
+        return f"mix {self.channels}ch -> mono ({self.mix})"
+
+    def process_float(self, x):
+        """(C, n) → (1, n)"""
+        if self.mix == "avg":
+            return x.mean(axis=0, keepdims=True)
+        i = int(self.mix)
+        return x[i:i + 1]
+
+    def process(self, pcm: bytes) -> bytes:
+        x = _deinterleave(pcm, self.channels)
+        if x is None:
+            return b""
+        return _interleave(self.process_float(x))
+
+
+class FrontendChain:
+    """여러 단계를 float 배열로 이어 처리(단계마다 int16 왕복 없음)."""
+
+    def __init__(self, stages, channels):
+        self.stages = list(stages)
+        self.channels = channels
+        self.busy = 0.0
+        self.chunks = 0
+        # 빔포머가 있으면 화자 방향 추정도 그대로 노출(Pipeline 의 doa 의도용)
+        for s in self.stages:
+            if hasattr(s, "bearing"):
+                self.bearing = s.bearing
+                break
+
+    def describe(self):
+        return "frontend: " + " → ".join(s.describe() for s in self.stages)
+
+    def process(self, pcm: bytes) -> bytes:
+        t0 = time.perf_counter()
+        x = _deinterleave(pcm, self.channels)
+        if x is None:
+            return b""
+        for s in self.stages:
+            x = s.process_float(x)
+        if x.ndim == 2:          # (1, n) 또는 다채널이면 0번 채널
+            x = x[0]
+        out = _interleave(x[None, :])
+        self.chunks += 1
+        self.busy += time.perf_counter() - t0
+        return out
+
+    def stats(self) -> dict:
+        st = {"busy_s": round(self.busy, 4), "chunks": self.chunks}
+        for s in self.stages:
+            if hasattr(s, "stats"):
+                st[type(s).__name__] = s.stats()
+        return st
+
+
+def _deinterleave(pcm, channels):
+    x = np.frombuffer(pcm, dtype="<i2")
+    n = len(x) // channels
+    if n == 0:
+        return None
+    return x[: n * channels].reshape(n, channels).T.astype(np.float32)
+
+def _interleave(x) -> bytes:
+    return np.clip(np.rint(x.T), -32768, 32767).astype("<i2").tobytes()
+
+def capture_frontend(rate, channels, mix=MIC_MIX):
+    """
+    장치 레이트/채널 → 16kHz mono 체인. 변환할 게 없으면 None.
+    2채널 이상이면 mix="beam" 은 mic_array 빔포머, 그 외는 ChannelMixer 다운믹스.
+    """
+    if rate == ASR_RATE and channels <= 1:
+        return None
+    if channels > 1 and mix != "beam":
+        # 다운믹스는 먼저 해서 리샘플을 1채널만 돌린다
+        stages = [ChannelMixer(channels, mix)]
+        if rate != ASR_RATE:
+            stages.append(PolyphaseResampler(rate, ASR_RATE, 1))
+        return FrontendChain(stages, channels)
+    stages = []
+    if rate != ASR_RATE:
+        stages.append(PolyphaseResampler(rate, ASR_RATE, channels))
+    if channels > 1:
+        from mic_array import beamformer_from_env
+        stages.append(beamformer_from_env(channels, ASR_RATE))
+    return FrontendChain(stages, channels)
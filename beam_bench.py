@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+빔포머 벤치마크: 채널 수별 SNR 이득 vs CPU 비용 + 화자 방향(GCC-PHAT) 정확도 (합성 다채널 신호)
+  python3 beam_bench.py
+환경변수
+  BENCH_CHANNELS=2,4,6,8     채널 수 목록
+  BENCH_ARRAY=linear          linear | circular
+  BENCH_SPACING=0.035         linear 간격 / circular 반지름(m)
+  BENCH_SNR=5                 말소리 대 간섭 잡음(dB, 0번 마이크)
+  BENCH_SRC_AZ=60 BENCH_NOISE_AZ=150
+  BENCH_SEC=10                합성 길이(초)
+  BENCH_JSON=out.json         결과 저장
+  BENCH_DOA=1                 방향 추정 시험(알려진 지연으로 합성한 발화를 여러 방향에서) 0=끔
+  BENCH_WRITE=/tmp/array      채널별 <경로>_<N>ch.raw 로 혼합 신호 저장(RawFileSource channels=N 로 재생)
+"""
+import os
+import json
+import time
+
+from mic_array import (np, _need_numpy, array_geometry, DelayAndSumBeamformer, synth_array,
+                       snr_db, to_interleaved_pcm)
+
+CHANNELS = [int(c) for c in os.environ.get("BENCH_CHANNELS", "2,4,6,8").split(",") if c.strip()]
+ARRAY    = os.environ.get("BENCH_ARRAY", "linear")
+SPACING  = float(os.environ.get("BENCH_SPACING", "0.035"))
+SNR      = float(os.environ.get("BENCH_SNR", "5"))
+SRC_AZ   = float(os.environ.get("BENCH_SRC_AZ", "60"))
+NOISE_AZ = float(os.environ.get("BENCH_NOISE_AZ", "150"))
+SEC      = float(os.environ.get("BENCH_SEC", "10"))
+RATE     = 16000
+CHUNK    = RATE // 10          # 파이프라인과 같은 100ms 청크
+
+def run_chunks(bf, x):
+    """100ms 청크로 흘려보내며 처리 → (출력, 청크당 처리시간 목록)"""
+    out, times = [], []
+    for i in range(0, x.shape[1], CHUNK):
+        c = np.ascontiguousarray(x[:, i:i + CHUNK], dtype=np.float32)
+        t0 = time.perf_counter()
+        out.append(bf.process_float(c))
+        times.append(time.perf_counter() - t0)
+    return np.concatenate(out), times
+
+def bench_one(m):
+    pos, linear = array_geometry(f"{ARRAY}:{m}:{SPACING}")
+    clean, noise = synth_array(pos, RATE, SEC, SRC_AZ, NOISE_AZ, snr_db=SNR)
+    mix = clean + noise
+    if os.environ.get("BENCH_WRITE"):
+        path = f"{os.environ['BENCH_WRITE']}_{m}ch.raw"
+        with open(path, "wb") as f:
+            f.write(to_interleaved_pcm(mix))
+        print(f"[INFO] wrote {path}")
+
+    # 1) 추적 모드로 혼합 신호 처리(실사용과 같은 경로) → 방향/CPU
+    bf = DelayAndSumBeamformer(pos, RATE, linear=linear)
+    _, t_track = run_chunks(bf, mix)
+    az = bf.azimuth
+    # 2) 고정 조향 CPU
+    bf_fix = DelayAndSumBeamformer(pos, RATE, azimuth=az, linear=linear)
+    _, t_fix = run_chunks(bf_fix, mix)
+    # 3) SNR: 선형이므로 같은 조향으로 말소리/잡음을 따로 통과시켜 비교
+    bf_fix.reset()
+    y_s, _ = run_chunks(bf_fix, clean)
+    bf_fix.reset()
+    y_n, _ = run_chunks(bf_fix, noise)
+    snr_in = snr_db(clean[0], noise[0])
+    snr_out = snr_db(y_s, y_n)
+    chunk_ms = CHUNK / RATE * 1000.0
+    ms_track = sorted(t * 1000.0 for t in t_track)
+    ms_fix = sorted(t * 1000.0 for t in t_fix)
+    return {
+        "channels": m, "array": ARRAY, "azimuth_est": az, "azimuth_true": SRC_AZ,
+        "snr_in_db": round(snr_in, 2), "snr_out_db": round(snr_out, 2), "gain_db": round(snr_out - snr_in, 2),
+        "track_ms_p50": round(ms_track[len(ms_track) // 2], 3), "track_ms_max": round(ms_track[-1], 3),
+        "fixed_ms_p50": round(ms_fix[len(ms_fix) // 2], 3),
+        "rtf_track": round(sum(t_track) / SEC, 4), "rtf_fixed": round(sum(t_fix) / SEC, 4),
+        "us_per_ch_chunk": round(ms_track[len(ms_track) // 2] * 1000.0 / m, 1),
+        "chunk_ms": chunk_ms,
+    }
+
+def doa_one(m, utter_sec=1.5):
+    """
+    각 방향에서 발화 하나를 합성 → 빔포머에 흘려 링버퍼에 쌓은 뒤 bearing() 으로 추정.
+    실사용과 같은 경로(최근 utter_sec 초)이며 추정 시간도 함께 잰다.
+    """
+    pos, linear = array_geometry(f"{ARRAY}:{m}:{SPACING}")
+    truth = [15, 40, 65, 90, 115, 140, 165] if linear else [0, 50, 100, 150, 200, 250, 300, 350]
+    errs, ms = [], []
+    for az in truth:
+        clean, noise = synth_array(pos, RATE, utter_sec, az, NOISE_AZ, snr_db=SNR + 5, seed=int(az))
+        bf = DelayAndSumBeamformer(pos, RATE, linear=linear, front_deg=0.0)
+        run_chunks(bf, clean + noise)
+        rel, conf, t_ms = bf.bearing(utter_sec)
+        est = rel % 360.0
+        errs.append(abs((est - az + 180.0) % 360.0 - 180.0))
+        ms.append(t_ms)
+    ms.sort()
+    return {"channels": m, "n": len(truth), "err_mean_deg": round(sum(errs) / len(errs), 1),
+            "err_max_deg": round(max(errs), 1), "ms_p50": round(ms[len(ms) // 2], 2), "ms_max": round(ms[-1], 2)}
+
+def main():
+    _need_numpy()
+    print(f"[INFO] numpy {np.__version__}, {ARRAY} spacing={SPACING}m, src={SRC_AZ}deg noise={NOISE_AZ}deg, "
+          f"snr={SNR}dB, {SEC}s, chunk={CHUNK}")
+    rows = [bench_one(m) for m in CHANNELS]
+    print(f"{'ch':>3} {'az':>5} {'snr_in':>7} {'snr_out':>8} {'gain':>6} {'track p50/max ms':>17} "
+          f"{'fixed p50':>9} {'rtf':>7} {'us/ch':>6}")
+    for r in rows:
+        print(f"{r['channels']:>3} {r['azimuth_est']:>5.0f} {r['snr_in_db']:>7.1f} {r['snr_out_db']:>8.1f} "
+              f"{r['gain_db']:>6.1f} {r['track_ms_p50']:>8.2f}/{r['track_ms_max']:<8.2f} "
+              f"{r['fixed_ms_p50']:>9.2f} {r['rtf_track']:>7.4f} {r['us_per_ch_chunk']:>6.0f}")
+    # 한 코어 실시간 여유: 100ms 청크 처리 시간이 청크 길이보다 충분히 작아야 ASR 에 CPU 가 남는다
+    worst = max(r["rtf_track"] for r in rows)
+    print(f"[INFO] worst RTF {worst:.4f} (1.0 = 한 코어를 다 씀)")
+    result = {"beamformer": rows}
+    if os.environ.get("BENCH_DOA", "1") not in ("0", "false"):
+        doa = [doa_one(m) for m in CHANNELS]
+        print(f"{'ch':>3} {'doa err mean/max deg':>21} {'est ms p50/max':>15}  (예산 {CHUNK / RATE * 1000:.0f}ms)")
+        for r in doa:
+            print(f"{r['channels']:>3} {r['err_mean_deg']:>10.1f}/{r['err_max_deg']:<10.1f} "
+                  f"{r['ms_p50']:>7.2f}/{r['ms_max']:<7.2f}")
+        result["doa"] = doa
+    out = os.environ.get("BENCH_JSON")
+    if out:
+        with open(out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"[INFO] wrote {out}")
+
+if __name__ == "__main__":
+    main()
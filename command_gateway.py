@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+명령 게이트웨이: 음성 없이 문장/의도를 로컬 소켓으로 넣어 음성과 똑같은 경로
+(final 훅 → normalize/점수화 → 디바운스 → intent 훅 → dispatch → ack 훅)로 실행하고 ack 시간을 돌려준다.
+- 켜기: 파이프라인 프로세스에 GATEWAY_ADDR=unix:/tmp/go2voice-cmd.sock (또는 127.0.0.1:9109)
+  마이크 없이 게이트웨이만: python3 command_gateway.py serve (GATEWAY_BACKEND=dry | go2_action_server 경로)
+- 요청(JSON 한 줄, "id" 는 응답에 그대로):
+    {"text":"앉아"}  {"text":"일 미터 앞으로"}  {"hyps":[["앉아",0.7],["안자",0.3]]}
+    {"intent":"forward","text":"1미터 앞으로"}   (점수화 대신 의도 지정. 디바운스/전송은 같음)
+    [{...},{...}] 또는 {"batch":[...]}   → 순서대로 판단, 응답 하나({"results":[...]})
+    {"stats":true}                          → 게이트웨이 통계 + 파이프라인 메트릭
+    JSON 이 아닌 줄은 그대로 문장: echo 앉아 | socat - UNIX-CONNECT:/tmp/go2voice-cmd.sock
+  "wait":false 면 판단(큐에 넣음)까지만 기다리고 바로 응답
+- 응답: {"id","ok","intent","score","why","result","decide_ms","ack_ms","error"}
+    why: no_match | weak | debounced | quit | empty | unknown_intent | unsupported | error(디스패치 예외, error=repr) | timeout | stopping | bad_request
+    ack_ms = 요청 수신 → 백엔드 전송 결과(음성의 "발화 끝 → 결과" 와 같은 기준)
+- 한 연결에서 응답을 기다리지 않고 여러 요청을 이어 보낼 수 있다(id 로 맞춤). 판단은 도착 순서대로
+- 부하 시험: python3 command_gateway.py bench  (GATEWAY_ADDR 가 없으면 dry 게이트웨이를 띄워서 시험)
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import asyncio
+import tempfile
+import subprocess
+from collections import Counter, deque
+
+from voice_pipeline import GATEWAY_ADDR, Pipeline, Debouncer
+from voice_nlp import default_catalog
+
+GATEWAY_ACK_TIMEOUT = float(os.environ.get("GATEWAY_ACK_TIMEOUT", "10"))
+GATEWAY_BACKEND     = os.environ.get("GATEWAY_BACKEND", "dry")         # serve: dry | go2_action_server(_dry) 경로
+GATEWAY_COOLDOWN    = float(os.environ.get("GATEWAY_COOLDOWN", "1.5"))  # serve 의 디바운스(voice_please 와 같게)
+GATEWAY_REPEAT      = float(os.environ.get("GATEWAY_REPEAT", "3.0"))
+BENCH_N      = int(os.environ.get("GATEWAY_BENCH_N", "5000"))
+BENCH_CONC   = int(os.environ.get("GATEWAY_BENCH_CONC", "8"))      # 동시 연결
+BENCH_WINDOW = int(os.environ.get("GATEWAY_BENCH_WINDOW", "4"))    # 연결당 응답 안 온 요청 수
+BENCH_BATCH  = int(os.environ.get("GATEWAY_BENCH_BATCH", "1"))     # 요청 하나에 넣을 명령 수
+BENCH_TEXTS  = os.environ.get("GATEWAY_BENCH_TEXTS", "앉아,일어서,인사해,기지개 켜,엎드려,멈춰,앞으로 가,뒤로 가")
+_DEFAULT_ADDR = "unix:/tmp/go2voice-cmd.sock"
+
+
+def _pct(xs, q):
+    return round(xs[min(len(xs) - 1, int(q * len(xs)))], 2) if xs else None
+
+
+class CommandGateway:
+    """Pipeline 에 붙는 소켓 서버(voice_metrics.MetricsServer 와 같은 방식: extra task + 훅)."""
+
+    def __init__(self, addr, ack_timeout=GATEWAY_ACK_TIMEOUT):
+        self.addr = addr
+        self.ack_timeout = ack_timeout
+        self.pipeline = None
+        self._pending = {}              # id(Command) → Future[(result, latency_ms)]
+        self.outcomes = Counter()       # dispatched | why
+        self.requests = 0
+        self.connections = 0
+        self.ack_ms = deque(maxlen=2000)
+        self.decide_ms = deque(maxlen=2000)
+        self.t_start = time.time()
+
+    def attach(self, pipeline):
+        self.pipeline = pipeline
+        pipeline.gateway = self
+        pipeline.extra_tasks.append(self.serve)
+        pipeline.ack_hooks.append(self._on_ack)
+        return self
+
+    def _on_ack(self, cmd, res, lat_ms):
+        fut = self._pending.pop(id(cmd), None)
+        if fut is not None and not fut.done():
+            fut.set_result((res, lat_ms))
+
+    def _expire(self, key, fut):
+        if self._pending.get(key) is fut:
+            del self._pending[key]
+
+    # ---------- 요청 하나 ----------
+    def _parse(self, req):
+        """→ (hyps, 지정 의도 | None) 또는 사유 문자열"""
+        if isinstance(req, str):
+            req = {"text": req}
+        if not isinstance(req, dict):
+            return "bad_request"
+        forced = None
+        if req.get("intent"):
+            forced = default_catalog().tables.by_name.get(req["intent"])
+            if forced is None:
+                return "unknown_intent"
+        if req.get("hyps"):
+            try:
+                hyps = [(str(t), float(p)) for t, p in req["hyps"]]
+            except (TypeError, ValueError):
+                return "bad_request"
+        else:
+            text = str(req.get("text") or (forced.name if forced is not None else "")).strip()
+            if not text:
+                return "bad_request"
+            hyps = [(text, 1.0)]
+        return hyps, forced
+
+    async def _submit(self, req, t_in):
+        """판단해서 큐에 넣기 → (응답 dict, ack Future | None)"""
+        p = self.pipeline
+        parsed = self._parse(req)
+        if isinstance(parsed, str):
+            return {"ok": False, "why": parsed}, None
+        if p._stopping:
+            return {"ok": False, "why": "stopping"}, None
+        hyps, forced = parsed
+        t0 = time.perf_counter()
+        cmd, why = p.handle_final(hyps, t_in, forced, source="gateway")
+        ms = (time.perf_counter() - t0) * 1000.0
+        self.decide_ms.append(ms)
+        out = {"ok": cmd is not None, "decide_ms": round(ms, 3)}
+        if cmd is None:
+            return dict(out, why=why), None
+        out.update(intent=cmd.intent.name, score=round(cmd.score, 2))
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending[id(cmd)] = fut
+        # ack 가 오지 않으면(기다림 시간 초과, wait=false) 지움. 같은 id 를 새 명령이 쓰고 있으면 두기
+        loop.call_later(self.ack_timeout, self._expire, id(cmd), fut)
+        await p.q_cmd.put(cmd)           # 음성과 같은 큐(가득 차면 여기서 대기)
+        return out, fut
+
+    async def _finish(self, out, fut, wait=True):
+        if fut is None:
+            self.outcomes[out["why"]] += 1
+            return out
+        if not wait:
+            self.outcomes["queued"] += 1
+            return dict(out, why="queued")
+        try:
+            res, lat = await asyncio.wait_for(asyncio.shield(fut), self.ack_timeout)
+        except asyncio.TimeoutError:
+            self.outcomes["timeout"] += 1
+            return dict(out, ok=False, why="timeout")
+        self.ack_ms.append(lat)
+        out["ack_ms"] = round(lat, 2)
+        if isinstance(res, Exception):
+            self.outcomes["error"] += 1
+            return dict(out, ok=False, why="error", error=repr(res))
+        if res is None:
+            self.outcomes["unsupported"] += 1
+            return dict(out, ok=False, why="unsupported")
+        self.outcomes["dispatched"] += 1
+        return dict(out, result=res if isinstance(res, (str, int, float, bool)) else str(res))
+
+    async def _one(self, req, t_in):
+        out, fut = await self._submit(req, t_in)
+        return await self._finish(out, fut, not isinstance(req, dict) or req.get("wait", True))
+
+    async def _batch(self, items, t_in):
+        # 판단은 순서대로(디바운스가 앞 명령을 보도록), ack 는 한꺼번에 기다림
+        subs = [await self._submit(it, t_in) for it in items]
+        waits = [not isinstance(it, dict) or it.get("wait", True) for it in items]
+        return await asyncio.gather(*(self._finish(o, f, w) for (o, f), w in zip(subs, waits)))
+
+    # ---------- 소켓 ----------
+    async def _handle(self, reader, writer):
+        def send(d):
+            if not writer.is_closing():
+                writer.write((json.dumps(d, ensure_ascii=False) + "\n").encode())
+
+        async def reply(coro, tag):
+            out = await coro
+            send(dict({"results": out, "ok": all(r["ok"] for r in out)} if isinstance(out, list) else out, **tag))
+
+        self.connections += 1
+        inflight = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                t_in = time.time()
+                raw = line.decode("utf-8", "replace").strip()
+                if not raw:
+                    continue
+                try:
+                    req = json.loads(raw) if raw[0] in "{[" else raw
+                except ValueError:
+                    send({"ok": False, "why": "bad_request"})
+                    continue
+                if isinstance(req, list):
+                    req = {"batch": req}
+                self.requests += 1
+                tag = {"id": req.pop("id")} if isinstance(req, dict) and "id" in req else {}
+                if isinstance(req, dict) and "stats" in req:
+                    send(dict(self.stats(), pipeline=self.pipeline.metrics(), **tag))
+                    continue
+                if isinstance(req, dict) and "batch" in req:
+                    coro = self._batch(req["batch"] if isinstance(req["batch"], list) else [], t_in)
+                else:
+                    coro = self._one(req, t_in)
+                # 응답은 ack 가 오면 보내고, 다음 줄은 바로 읽는다(파이프라이닝)
+                t = asyncio.ensure_future(reply(coro, tag))
+                inflight.add(t)
+                t.add_done_callback(inflight.discard)
+                await writer.drain()
+            if inflight:
+                await asyncio.gather(*inflight, return_exceptions=True)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for t in inflight:
+                t.cancel()
+            writer.close()
+
+    async def serve(self, pipeline=None):
+        if self.addr.startswith("unix:"):
+            path = self.addr[5:]
+            if os.path.exists(path):
+                os.unlink(path)
+            server = await asyncio.start_unix_server(self._handle, path, limit=1 << 20)
+        else:
+            host, _, port = self.addr.rpartition(":")
+            server = await asyncio.start_server(self._handle, host or "127.0.0.1", int(port), limit=1 << 20)
+            path = None
+        self.pipeline.tel("INFO", f"command gateway: {self.addr}")
+        try:
+            async with server:
+                await asyncio.Event().wait()     # 파이프라인 종료 때 취소됨
+        finally:
+            if path and os.path.exists(path):
+                os.unlink(path)
+
+    def stats(self) -> dict:
+        ack = sorted(self.ack_ms)
+        dec = sorted(self.decide_ms)
+        up = max(1e-6, time.time() - self.t_start)
+        return {"requests": self.requests, "connections": self.connections, "outcomes": dict(self.outcomes),
+                "req_per_s": round(self.requests / up, 1), "pending": len(self._pending),
+                "ack_ms_p50": _pct(ack, 0.5), "ack_ms_p99": _pct(ack, 0.99),
+                "decide_ms_p50": _pct(dec, 0.5), "decide_ms_p99": _pct(dec, 0.99)}
+
+
+# ===== 마이크 없는 게이트웨이 전용 실행(serve) =====
+class _IdleSource:
+    """오디오 없음: 종료 신호까지 대기"""
+
+    def describe(self):
+        return "audio: none (command gateway only)"
+
+    async def open(self):
+        pass
+
+    async def read(self):
+        await asyncio.Event().wait()
+
+    async def close(self):
+        pass
+
+
+class _NoAsr:
+    def load(self):
+        pass
+
+    def accept(self, pcm):
+        return None
+
+    def flush(self):
+        return []
+
+
+def make_backend(spec=GATEWAY_BACKEND):
+    if spec == "dry":
+        from session_replay import DryRunBackend
+        return DryRunBackend()
+    from motion_backends import ActionServerBackend, sdk_env
+    # 시뮬레이션 서버(-DGO2_DRY)는 sudo/SDK 없이, 실제 서버는 voice_agent 와 같은 설정으로
+    dry = "dry" in os.path.basename(spec)
+    return ActionServerBackend(os.path.abspath(spec), os.environ.get("GO2_IFACE", "eth0"),
+                               sudo=() if dry else ("sudo", "-n", "-E"),
+                               env=dict(os.environ) if dry else sdk_env(), echo=False)
+
+
+def serve(addr):
+    Pipeline(_IdleSource(), _NoAsr(), make_backend(),
+             debouncer=Debouncer(GATEWAY_COOLDOWN, GATEWAY_REPEAT),
+             quit_intent=None,
+             show_partial=False,
+             gateway_addr=addr).run()
+
+
+# ===== 클라이언트 =====
+def _connect(addr, timeout=5.0):
+    if addr.startswith("unix:"):
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        target = addr[5:]
+    else:
+        host, _, port = addr.rpartition(":")
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        target = (host or "127.0.0.1", int(port))
+    s.settimeout(timeout)
+    s.connect(target)
+    return s
+
+
+def send(addr, items):
+    """문장/JSON 문자열 여러 개 → 응답 목록(한 줄씩 보내고 id 순으로)"""
+    s = _connect(addr, GATEWAY_ACK_TIMEOUT + 5)
+    f = s.makefile("rb")
+    for i, it in enumerate(items):
+        req = json.loads(it) if it[:1] in "{[" else {"text": it}
+        if isinstance(req, list):
+            req = {"batch": req}
+        req["id"] = i
+        s.sendall((json.dumps(req, ensure_ascii=False) + "\n").encode())
+    got = {}
+    while len(got) < len(items):
+        line = f.readline()
+        if not line:
+            break
+        d = json.loads(line)
+        got[d.get("id")] = d
+    s.close()
+    return [got.get(i) for i in range(len(items))]
+
+
+async def _load(addr, n, conc, window, batch, texts):
+    """연결 conc 개, 연결마다 window 개까지 응답 없이 이어 보내기 → (지연 ms 목록, why 카운터, 경과 초)"""
+    lat, why = [], Counter()
+    todo = iter(range(n))
+
+    async def worker():
+        if addr.startswith("unix:"):
+            reader, writer = await asyncio.open_unix_connection(addr[5:], limit=1 << 20)
+        else:
+            host, _, port = addr.rpartition(":")
+            reader, writer = await asyncio.open_connection(host or "127.0.0.1", int(port), limit=1 << 20)
+        sent = {}
+        sem = asyncio.Semaphore(window)
+
+        async def read_loop():
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                d = json.loads(line)
+                t0 = sent.pop(d.get("id"), None)
+                if t0 is not None:
+                    lat.append((time.perf_counter() - t0) * 1000.0)
+                for r in d.get("results") or [d]:
+                    why[r.get("why") or ("dispatched" if r.get("ok") else "?")] += 1
+                sem.release()
+
+        rd = asyncio.ensure_future(read_loop())
+        for i in todo:
+            await sem.acquire()
+            items = [{"text": texts[(i * batch + k) % len(texts)]} for k in range(batch)]
+            req = {"id": i, "batch": items} if batch > 1 else dict(items[0], id=i)
+            sent[i] = time.perf_counter()
+            writer.write((json.dumps(req, ensure_ascii=False) + "\n").encode())
+            await writer.drain()
+        for _ in range(window):
+            await sem.acquire()
+        rd.cancel()
+        writer.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(conc)))
+    return lat, why, time.perf_counter() - t0
+
+
+def bench():
+    addr = os.environ.get("GATEWAY_ADDR", "")
+    proc = None
+    if not addr:
+        # 대상이 없으면 디바운스 없는 dry 게이트웨이를 따로 띄운다(클라이언트와 다른 프로세스)
+        addr = "unix:" + os.path.join(tempfile.mkdtemp(prefix="go2gw"), "cmd.sock")
+        env = dict(os.environ, GATEWAY_COOLDOWN="0", GATEWAY_REPEAT="0", METRICS_ADDR="")
+        proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve", addr], env=env,
+                                stdout=subprocess.DEVNULL)
+        for _ in range(100):
+            if os.path.exists(addr[5:]):
+                break
+            time.sleep(0.05)
+    texts = [t.strip() for t in BENCH_TEXTS.split(",") if t.strip()]
+    print(f"[BENCH] {addr} n={BENCH_N} conc={BENCH_CONC} window={BENCH_WINDOW} batch={BENCH_BATCH}"
+          f"{' (dry gateway, debounce off)' if proc else ''}")
+    try:
+        asyncio.run(_load(addr, min(200, BENCH_N), BENCH_CONC, BENCH_WINDOW, BENCH_BATCH, texts))   # 예열
+        lat, why, sec = asyncio.run(_load(addr, BENCH_N, BENCH_CONC, BENCH_WINDOW, BENCH_BATCH, texts))
+        lat.sort()
+        cmds = BENCH_N * BENCH_BATCH
+        print(f"[BENCH] {BENCH_N} requests ({cmds} commands) in {sec:.2f}s → {BENCH_N / sec:.0f} req/s, "
+              f"{cmds / sec:.0f} cmd/s")
+        print(f"[BENCH] roundtrip ms p50={_pct(lat, 0.5)} p90={_pct(lat, 0.9)} p99={_pct(lat, 0.99)} "
+              f"max={round(lat[-1], 2) if lat else None}")
+        print(f"[BENCH] outcomes {dict(why)}")
+        st = send(addr, ['{"stats":true}'])[0] or {}
+        print(f"[BENCH] server ack_ms p50={st.get('ack_ms_p50')} p99={st.get('ack_ms_p99')} "
+              f"decide_ms p50={st.get('decide_ms_p50')} p99={st.get('decide_ms_p99')}")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(10)
+            shutil.rmtree(os.path.dirname(addr[5:]), ignore_errors=True)
+
+
+def main():
+    args = sys.argv[1:]
+    what = args[0] if args else ""
+    if what == "serve":
+        serve(args[1] if len(args) > 1 else (GATEWAY_ADDR or _DEFAULT_ADDR))
+    elif what == "bench":
+        bench()
+    elif what == "send" and len(args) > 1:
+        addr = GATEWAY_ADDR or _DEFAULT_ADDR
+        try:
+            replies = send(addr, args[1:])
+        except OSError as e:
+            print(f"[ERR] 게이트웨이 연결 실패({addr}): {e}", file=sys.stderr)
+            sys.exit(1)
+        for r in replies:
+            print(json.dumps(r, ensure_ascii=False))
+    else:
+        print(__doc__)
+        print("  python3 command_gateway.py serve [addr] | send <문장|JSON>... | bench")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+// go2_action_bench.cpp — go2_action_server 요청 파싱 처리량 비교(SDK 불필요)
+//   g++ -O2 -std=c++14 go2_action_bench.cpp -o go2_action_bench && ./go2_action_bench [반복 수] [서버 경로]
+// 1) 이전 parse_json_kv(키마다 줄 전체 find) vs go2_json.hpp 단일 패스 파서: 줄/초, 줄당 ns
+// 2) 동작 N 개를 한 줄(배치)로 보낼 때와 N 줄로 보낼 때 동작당 파싱 비용
+// 3) 서버 경로를 주면(SDK 없이: g++ -O2 -DGO2_DRY go2_action_server.cpp -o go2_action_server_dry)
+//    파이프 왕복(한 줄 보내고 응답 한 줄 받기, ActionServerBackend.call 과 같은 방식)으로
+//    한 줄 한 동작 vs 배치 한 줄의 동작당 지연
+#include <iostream>
+#include <string>
+#include <vector>
+#include <chrono>
+#include <cstdlib>
+#include <cctype>
+#include <cstdio>
+#include <unistd.h>
+#include <sys/wait.h>
+
+#include "go2_json.hpp"
+
+using Clock = std::chrono::steady_clock;
+
+// ----- 이전 서버의 파서(비교용으로 그대로) -----
+static bool parse_json_kv(const std::string& s, const std::string& key, std::string& out) {
+    auto pos = s.find("\""+key+"\"");
+    if (pos == std::string::npos) return false;
+    pos = s.find(':', pos);
+    if (pos == std::string::npos) return false;
+    while (pos < s.size() && (s[pos]==':' || isspace((unsigned char)s[pos]))) pos++;
+    if (pos>=s.size()) return false;
+    if (s[pos]=='\"') {
+        size_t p2 = s.find('"', pos+1);
+        if (p2==std::string::npos) return false;
+        out = s.substr(pos+1, p2-(pos+1));
+        return true;
+    } else {
+        size_t p2 = pos;
+        while (p2<s.size() && (isdigit((unsigned char)s[p2])||s[p2]=='-'||s[p2]=='+'||s[p2]=='.'||s[p2]=='e'||s[p2]=='E')) p2++;
+        out = s.substr(pos, p2-pos);
+        return true;
+    }
+}
+
+static bool parse_json_num(const std::string& s, const std::string& key, double& val) {
+    std::string tmp;
+    if (!parse_json_kv(s, key, tmp)) return false;
+    try { val = std::stod(tmp); return true; } catch (...) { return false; }
+}
+
+// 서버가 한 줄에서 꺼내는 것과 같은 일: action + (move 면) vx/vy/vyaw
+static double old_handle(const std::string& line) {
+    std::string act;
+    if (!parse_json_kv(line, "action", act)) return -1;
+    double vx = 0, vy = 0, vyaw = 0;
+    if (act == "move") {
+        parse_json_num(line, "vx", vx);
+        parse_json_num(line, "vy", vy);
+        parse_json_num(line, "vyaw", vyaw);
+    }
+    return (double)act.size() + vx + vy + vyaw;
+}
+
+static double step_fields(const JsonRef& a) {
+    std::string act;
+    if (!a.get_str("action", act)) return -1;
+    double vx = 0, vy = 0, vyaw = 0, delay = 0;
+    if (act == "move") {
+        a.get_num("vx", vx);
+        a.get_num("vy", vy);
+        a.get_num("vyaw", vyaw);
+    }
+    a.get_num("delay_ms", delay);
+    return (double)act.size() + vx + vy + vyaw + delay;
+}
+
+static JsonDoc g_doc;          // 서버처럼 재사용
+
+static double new_handle(const std::string& line, size_t* actions) {
+    if (!g_doc.parse(line)) return -1;
+    JsonRef root = g_doc.root();
+    double acc = 0;
+    if (root.is_array()) {
+        JsonRef s = root.first();
+        for (uint32_t i = 0; i < root.size(); ++i, s = s.next()) acc += step_fields(s);
+        *actions += root.size();
+    } else {
+        acc = step_fields(root);
+        *actions += 1;
+    }
+    return acc;
+}
+
+template <class F>
+static double time_ns(const std::vector<std::string>& lines, long reps, F fn, double* sink) {
+    auto t0 = Clock::now();
+    double acc = 0;
+    for (long r = 0; r < reps; ++r)
+        for (const auto& l : lines) acc += fn(l);
+    *sink += acc;
+    return std::chrono::duration<double, std::nano>(Clock::now() - t0).count();
+}
+
+// 서버를 띄워 stdin/stdout 파이프로 연결
+struct Child {
+    pid_t pid = -1;
+    FILE* in = nullptr;     // 서버 stdin
+    FILE* out = nullptr;    // 서버 stdout
+};
+
+static bool spawn(const char* path, Child& c) {
+    int to[2], from[2];
+    if (pipe(to) || pipe(from)) return false;
+    c.pid = fork();
+    if (c.pid < 0) return false;
+    if (c.pid == 0) {
+        dup2(to[0], 0);
+        dup2(from[1], 1);
+        close(to[1]); close(from[0]);
+        execl(path, path, "lo", (char*)nullptr);
+        _exit(127);
+    }
+    close(to[0]); close(from[1]);
+    c.in = fdopen(to[1], "w");
+    c.out = fdopen(from[0], "r");
+    return c.in && c.out;
+}
+
+// 줄 하나 보내고 응답 한 줄 기다리기를 count 번 → 걸린 ns
+static double roundtrip_ns(Child& c, const std::string& line, long count) {
+    char buf[8192];
+    auto t0 = Clock::now();
+    for (long i = 0; i < count; ++i) {
+        fputs(line.c_str(), c.in);
+        fputc('\n', c.in);
+        fflush(c.in);
+        if (!fgets(buf, sizeof(buf), c.out)) return -1;
+    }
+    return std::chrono::duration<double, std::nano>(Clock::now() - t0).count();
+}
+
+static void pipe_bench(const char* path, long count) {
+    Child c;
+    if (!spawn(path, c)) { std::cerr << "[ERR] spawn failed: " << path << "\n"; return; }
+    std::cout << "\n[pipe] " << path << " (요청 " << count << "번씩, 응답까지 기다림)\n";
+    std::cout << "case                        lines/s   us/line  us/action\n";
+    auto row = [](const char* name, double ns, double lines, double actions) {
+        char buf[160];
+        snprintf(buf, sizeof(buf), "%-24s %10.0f %9.1f %10.1f", name, lines / (ns / 1e9), ns / lines / 1000.0,
+                 ns / actions / 1000.0);
+        std::cout << buf << "\n";
+    };
+    roundtrip_ns(c, "{\"action\":\"sit\"}", 200);          // 워밍업
+    double ns = roundtrip_ns(c, "{\"action\":\"move\",\"vx\":0.3,\"vyaw\":0.0}", count);
+    row("1 action / line", ns, (double)count, (double)count);
+    for (int n : {4, 16}) {
+        std::string b = "[";
+        for (int i = 0; i < n; ++i) b += std::string(i ? "," : "") + "{\"action\":\"move\",\"vx\":0.3,\"vyaw\":0.0}";
+        b += "]";
+        long k = count / n;
+        ns = roundtrip_ns(c, b, k);
+        char name[40];
+        snprintf(name, sizeof(name), "%d actions / batch", n);
+        row(name, ns, (double)k, (double)k * n);
+    }
+    fputs("{\"action\":\"quit\"}\n", c.in);
+    fflush(c.in);
+    fclose(c.in);
+    fclose(c.out);
+    waitpid(c.pid, nullptr, 0);
+}
+
+int main(int argc, char** argv) {
+    long reps = argc > 1 ? std::atol(argv[1]) : 200000;
+    // 실제 voice_agent/ActionServerBackend 가 보내는 줄 모양
+    std::vector<std::string> mix = {
+        "{\"action\": \"sit\"}",
+        "{\"action\": \"stand\"}",
+        "{\"action\": \"hello\"}",
+        "{\"action\": \"move\", \"vx\": 0.3}",
+        "{\"action\": \"move\", \"vx\": 0.0, \"vyaw\": 0.8}",
+        "{\"action\": \"stop\"}",
+    };
+    // ActionServerBackend 는 필드 순서가 dict 순서라 id 가 앞에 오기도 한다 → 이전 파서는 긴 줄일수록 불리
+    std::vector<std::string> long_lines = {
+        "{\"id\": 12345, \"source\": \"voice\", \"text\": \"앞으로 가 \\\"천천히\\\"\", \"action\": \"move\", "
+        "\"vx\": 0.3, \"vy\": 0.0, \"vyaw\": 0.0}",
+    };
+    double sink = 0;
+    size_t acts = 0;
+
+    std::cout << "reps=" << reps << "\n";
+    std::cout << "case                      parser      lines/s     ns/line   ns/action\n";
+    auto row = [](const char* name, const char* parser, double ns, double lines, double actions) {
+        char buf[160];
+        snprintf(buf, sizeof(buf), "%-25s %-8s %12.0f %11.1f %11.1f", name, parser,
+                 lines / (ns / 1e9), ns / lines, ns / actions);
+        std::cout << buf << "\n";
+    };
+
+    for (auto* set : {&mix, &long_lines}) {
+        const char* name = set == &mix ? "single (typical mix)" : "single (long line)";
+        double lines = (double)set->size() * reps;
+        double ns_old = time_ns(*set, reps, old_handle, &sink);
+        acts = 0;
+        double ns_new = time_ns(*set, reps, [&](const std::string& l) { return new_handle(l, &acts); }, &sink);
+        row(name, "old", ns_old, lines, lines);
+        row(name, "new", ns_new, lines, (double)acts);
+    }
+
+    // 배치: 같은 N 동작을 N 줄 vs 한 줄
+    for (int n : {2, 4, 8}) {
+        std::string batch = "[";
+        std::vector<std::string> singles;
+        for (int i = 0; i < n; ++i) {
+            const std::string& s = mix[i % mix.size()];
+            batch += (i ? "," : "") + s.substr(0, s.size() - 1) + ", \"delay_ms\": 500}";
+            singles.push_back(s);
+        }
+        batch += "]";
+        std::vector<std::string> one = {batch};
+        long r = reps / n * 2;
+        acts = 0;
+        double ns_lines = time_ns(singles, r, old_handle, &sink);
+        double ns_batch = time_ns(one, r, [&](const std::string& l) { return new_handle(l, &acts); }, &sink);
+        char name[40];
+        snprintf(name, sizeof(name), "%d actions: %d lines", n, n);
+        row(name, "old", ns_lines, (double)n * r, (double)n * r);
+        snprintf(name, sizeof(name), "%d actions: 1 batch", n);
+        row(name, "new", ns_batch, (double)r, (double)acts);
+    }
+    // 최적화로 계산이 지워지지 않게
+    if (sink == 12345.678) std::cout << "";
+    if (argc > 2) pipe_bench(argv[2], 20000);
+    return 0;
+}
@@ -2,45 +2,40 @@
 #include <string>
 #include <sstream>
 #include <cctype>
+#include <cerrno>
 #include <cstdio>
 #include <cstdlib>
 #include <cmath>
+#include <chrono>
+#include <algorithm>
+#include <deque>
+#include <poll.h>
+#include <unistd.h>
 
+#include "go2_json.hpp"
+
+#ifndef GO2_DRY
 // Unitree SDK headers (경로는 프로젝트 include에 이미 잡혀 있어야 함)
 #include <unitree/robot/channel/channel_factory.hpp>
 #include "unitree/robot/go2/sport/sport_client.hpp"
+#else
+// PC 시험용(-DGO2_DRY): SDK 없이 호출 횟수만 센다
+struct DrySport {
+    long calls = 0;
+    void Sit() { ++calls; }
+    void RiseSit() { ++calls; }
+    void Hello() { ++calls; }
+    void Heart() { ++calls; }
+    void Scrape() { ++calls; }
+    void StopMove() { ++calls; }
+    void Move(double, double, double) { ++calls; }
+};
+#endif
 
-// 간단 JSON 파서(최소한) — 외부 의존 회피
-static bool parse_json_kv(const std::string& s, const std::string& key, std::string& out) {
-    // "key":"value" 또는 "key":value (숫자)
-    auto pos = s.find("\""+key+"\"");
-    if (pos == std::string::npos) return false;
-    pos = s.find(':', pos);
-    if (pos == std::string::npos) return false;
-    // 공백 스킵
-    while (pos < s.size() && (s[pos]==':' || isspace((unsigned char)s[pos]))) pos++;
-    if (pos>=s.size()) return false;
-    if (s[pos]=='\"') {
-        size_t p2 = s.find('"', pos+1);
-        if (p2==std::string::npos) return false;
-        out = s.substr(pos+1, p2-(pos+1));
-        return true;
-    } else {
-        // 숫자/토큰
-        size_t p2 = pos;
-        while (p2<s.size() && (isdigit((unsigned char)s[p2])||s[p2]=='-'||s[p2]=='+'||s[p2]=='.'||s[p2]=='e'||s[p2]=='E')) p2++;
-        out = s.substr(pos, p2-pos);
-        return true;
-    }
-}
+using Clock = std::chrono::steady_clock;
 
-static bool parse_json_num(const std::string& s, const std::string& key, double& val) {
-    std::string tmp;
-    if (!parse_json_kv(s, key, tmp)) return false;
-    try {
-        val = std::stod(tmp);
-        return true;
-    } catch (...) { return false; }
+static double us_since(Clock::time_point t0) {
+    return std::chrono::duration<double, std::micro>(Clock::now() - t0).count();
 }
 
 static void usage() {
@@ -49,78 +44,280 @@ static void usage() {
     "  sudo -n -E ./go2_action_server [iface]\n"
     "  # 이후 stdin에 JSON 한 줄씩:\n"
     "  # {\"action\":\"stand\"}\n"
-    "  # {\"action\":\"move\",\"vx\":0.3,\"vy\":0.0,\"vyaw\":0.0}\n";
+    "  # {\"action\":\"move\",\"vx\":0.3,\"vy\":0.0,\"vyaw\":0.0}\n"
+    "  # 여러 동작(서버에서 순서대로, delay_ms 는 그 단계 전 대기):\n"
+    "  # [{\"action\":\"stand\"},{\"action\":\"hello\",\"delay_ms\":1500}]\n"
+    "  # {\"batch\":[...],\"id\":7}\n"
+    "  # 응답에 id(보냈으면), parse_us/exec_us, 배치는 단계별 at_ms 가 붙는다.\n"
+    "  # 배치 대기 중 새 줄은 줄을 세워 배치 뒤에 처리한다. stop/quit 또는 \"replace\":true 인 줄만\n"
+    "  # 남은 단계와 줄 선 명령을 취소(error: preempted)하고 바로 처리한다.\n";
+}
+
+// stdin 줄 읽기(대기 시간 지정). 배치 대기 중에도 새 줄(특히 stop)을 받아야 해서 getline 대신 사용
+class LineReader {
+public:
+    // 1: 줄 있음, 0: 시간 초과, -1: EOF.  timeout_ms < 0 이면 무한 대기
+    int next(std::string& line, int timeout_ms) {
+        auto t0 = Clock::now();
+        while (true) {
+            size_t nl = buf_.find('\n', pos_);
+            if (nl != std::string::npos) {
+                size_t n = nl - pos_;
+                if (n && buf_[nl - 1] == '\r') --n;
+                line.assign(buf_, pos_, n);
+                pos_ = nl + 1;
+                if (pos_ > 65536) { buf_.erase(0, pos_); pos_ = 0; }
+                return 1;
+            }
+            if (eof_) {
+                if (pos_ < buf_.size()) { line.assign(buf_, pos_, std::string::npos); pos_ = buf_.size(); return 1; }
+                return -1;
+            }
+            int wait = timeout_ms;
+            if (timeout_ms >= 0) {
+                wait = timeout_ms - (int)(us_since(t0) / 1000.0);
+                if (wait < 0) wait = 0;
+            }
+            pollfd pfd{0, POLLIN, 0};
+            int r = poll(&pfd, 1, wait);
+            if (r == 0) return 0;
+            if (r < 0) {
+                if (errno == EINTR) continue;
+                eof_ = true;
+                continue;
+            }
+            char tmp[8192];
+            ssize_t n = read(0, tmp, sizeof(tmp));
+            if (n <= 0) eof_ = true;
+            else buf_.append(tmp, (size_t)n);
+        }
+    }
+
+private:
+    std::string buf_;
+    size_t pos_ = 0;
+    bool eof_ = false;
+};
+
+// action 이름은 intent_catalog.json 의 action 필드와 일치해야 함
+static bool known_action(const std::string& a) {
+    return a == "sit" || a == "stand" || a == "hello" || a == "heart" || a == "bow" ||
+           a == "stop" || a == "move" || a == "quit" || a == "exit";
 }
 
+// 동작 하나 실행. extra 에 응답용 추가 필드(",\"vx\":0.3" 형식)
+template <class Sport>
+static bool run_action(Sport& sport, const JsonRef& a, const std::string& act, std::string& extra) {
+    if (act == "sit") sport.Sit();
+    else if (act == "stand") sport.RiseSit();
+    else if (act == "hello") sport.Hello();
+    else if (act == "heart") sport.Heart();
+    else if (act == "bow") sport.Scrape();
+    else if (act == "stop") sport.StopMove();
+    else if (act == "move") {
+        double vx = 0.0, vyaw = 0.0;
+        a.get_num("vx", vx);
+        a.get_num("vyaw", vyaw);
+        // 안전 클램프(teleop와 유사)
+        vx   = std::max(-1.0, std::min(1.0, vx));
+        vyaw = std::max(-2.0, std::min(2.0, vyaw));
+        sport.Move(vx, 0.0 /*vy는 미사용*/, vyaw);
+        std::ostringstream o;
+        o << ",\"vx\":" << vx << ",\"vy\":0.0,\"vyaw\":" << vyaw;
+        extra = o.str();
+    }
+    else return false;
+    return true;
+}
+
+// 요청의 id(숫자/문자열)를 응답에 원문 그대로
+static std::string id_field(const JsonRef& id) {
+    if (!id || (id.type() != JsonTok::Number && id.type() != JsonTok::String)) return "";
+    return ",\"id\":" + id.raw();
+}
+
+template <class Sport>
+class Server {
+public:
+    explicit Server(Sport& sport) : sport_(sport) {}
+
+    // false 면 종료
+    bool handle(const std::string& line) {
+        auto t0 = Clock::now();
+        if (!doc_.parse(line)) {
+            reply("{\"ok\":false,\"error\":" + json_escape(std::string("bad json: ") + doc_.error()) + "}");
+            return true;
+        }
+        double parse_us = us_since(t0);
+        JsonRef root = doc_.root();
+        if (root.is_array()) return batch(root, JsonRef(), parse_us);
+        if (!root.is_object()) {
+            reply("{\"ok\":false,\"error\":\"expected object or array\"}");
+            return true;
+        }
+        JsonRef steps = root.get("batch");
+        if (steps.is_array()) return batch(steps, root.get("id"), parse_us);
+        return single(root, parse_us);
+    }
+
+    bool next_line(std::string& line, int timeout_ms) {
+        if (!pending_.empty()) { line.swap(pending_.front()); pending_.pop_front(); return true; }
+        return in_.next(line, timeout_ms) == 1;
+    }
+
+private:
+    static constexpr size_t kMaxPending = 64;
+
+    Sport& sport_;
+    LineReader in_;
+    std::deque<std::string> pending_;   // 배치 대기 중 받은 줄(배치 뒤에 순서대로, 선점 줄은 맨 앞)
+    JsonDoc doc_;             // 줄마다 재사용(토큰 배열 할당 없음)
+    JsonDoc peek_;            // 배치 대기 중 새 줄 분류용(doc_ 는 실행 중인 배치를 가리키고 있음)
+    std::string act_;
+
+    void reply(const std::string& s) { std::cout << s << '\n' << std::flush; }
+
+    bool single(const JsonRef& a, double parse_us) {
+        std::string& act = act_;
+        std::string idf = id_field(a.get("id"));
+        if (!a.get_str("action", act)) {
+            reply("{\"ok\":false,\"error\":\"no action\"" + idf + "}");
+            return true;
+        }
+        if (act == "quit" || act == "exit") {
+            reply("{\"ok\":true,\"action\":\"quit\"" + idf + "}");
+            return false;
+        }
+        std::string extra;
+        auto t1 = Clock::now();
+        bool ok = run_action(sport_, a, act, extra);
+        double exec_us = us_since(t1);
+        std::ostringstream o;
+        if (!ok) o << "{\"ok\":false,\"error\":\"unknown action\",\"action\":" << json_escape(act) << idf << "}";
+        else o << "{\"ok\":true,\"action\":\"" << act << "\"" << extra << idf
+               << ",\"parse_us\":" << (long)parse_us << ",\"exec_us\":" << (long)exec_us << "}";
+        reply(o.str());
+        return true;
+    }
+
+    // 배치를 끊는 줄: stop/quit/exit 동작, 또는 "replace":true (단일/배치 모두)
+    bool preempts(const std::string& line) {
+        if (!peek_.parse(line)) return false;          // 잘못된 줄은 차례가 오면 오류 응답
+        JsonRef root = peek_.root();
+        if (!root.is_object()) return false;
+        JsonRef rep = root.get("replace");
+        if (rep && rep.type() == JsonTok::Bool && rep.raw() == "true") return true;
+        std::string act;
+        return root.get_str("action", act) && (act == "stop" || act == "quit" || act == "exit");
+    }
+
+    // 줄 선 명령 취소: 기다리는 클라이언트가 응답을 받도록 줄마다 실패 응답
+    void drop_pending() {
+        for (const std::string& l : pending_) {
+            std::string act;
+            JsonRef root = peek_.parse(l) ? peek_.root() : JsonRef();
+            bool obj = root.is_object();
+            if (!obj || !root.get_str("action", act)) act = "batch";
+            reply("{\"ok\":false,\"action\":" + json_escape(act) + ",\"error\":\"preempted\""
+                  + (obj ? id_field(root.get("id")) : std::string()) + "}");
+        }
+        pending_.clear();
+    }
+
+    // 대기: 선점 줄이 오면 true(줄 선 명령은 취소, 선점 줄을 다음 차례로). 그 밖의 줄은 배치 뒤로 줄 세움
+    bool wait_or_preempt(double ms) {
+        auto t_end = Clock::now() + std::chrono::microseconds((long)(ms * 1000.0));
+        while (true) {
+            double left = std::chrono::duration<double, std::milli>(t_end - Clock::now()).count();
+            if (left <= 0) return false;
+            std::string line;
+            int r = in_.next(line, (int)std::ceil(left));
+            if (r == 1) {
+                if (line.empty()) continue;
+                if (preempts(line)) {
+                    drop_pending();
+                    pending_.push_back(std::move(line));
+                    return true;
+                }
+                if (pending_.size() >= kMaxPending) {
+                    reply("{\"ok\":false,\"error\":\"busy\"}");
+                    continue;
+                }
+                pending_.push_back(std::move(line));
+                continue;
+            }
+            if (r < 0) return false;      // EOF: 남은 배치는 마저 실행
+        }
+    }
+
+    bool batch(const JsonRef& steps, const JsonRef& id, double parse_us) {
+        std::string idf = id_field(id);
+        const uint32_t n = steps.size();
+        // 먼저 전부 검사: 반쯤 실행하고 멈추는 일이 없도록
+        JsonRef s = steps.first();
+        for (uint32_t i = 0; i < n; ++i, s = s.next()) {
+            std::string& act = act_;
+            if (!s.is_object() || !s.get_str("action", act) || !known_action(act)) {
+                std::ostringstream o;
+                o << "{\"ok\":false,\"action\":\"batch\",\"error\":\"step " << i << ": "
+                  << (s.is_object() && s.get_str("action", act) ? "unknown action" : "no action") << "\"" << idf << "}";
+                reply(o.str());
+                return true;
+            }
+        }
+        auto t0 = Clock::now();
+        std::ostringstream st;
+        size_t done = 0;
+        bool preempted = false, quit = false;
+        s = steps.first();
+        for (uint32_t i = 0; i < n; ++i, s = s.next()) {
+            double delay = 0.0;
+            if (s.get_num("delay_ms", delay) && delay > 0 && wait_or_preempt(delay)) { preempted = true; break; }
+            std::string& act = act_;
+            std::string extra;
+            s.get_str("action", act);
+            double at_ms = us_since(t0) / 1000.0;
+            if (act == "quit" || act == "exit") { quit = true; break; }
+            auto t1 = Clock::now();
+            run_action(sport_, s, act, extra);
+            double exec_us = us_since(t1);
+            st << (done ? "," : "") << "{\"action\":\"" << act << "\"" << extra
+               << ",\"at_ms\":" << std::round(at_ms * 10.0) / 10.0 << ",\"exec_us\":" << (long)exec_us << "}";
+            ++done;
+        }
+        std::ostringstream o;
+        o << "{\"ok\":" << (done == n || quit ? "true" : "false") << ",\"action\":\"batch\"" << idf
+          << ",\"n\":" << n << ",\"done\":" << done;
+        if (preempted) o << ",\"error\":\"preempted\"";
+        o << ",\"parse_us\":" << (long)parse_us << ",\"total_ms\":" << std::round(us_since(t0) / 100.0) / 10.0
+          << ",\"steps\":[" << st.str() << "]}";
+        reply(o.str());
+        return !quit;
+    }
+};
+
 int main(int argc, char** argv) {
     std::string iface = "eth0";
     if (argc >= 2) iface = argv[1];
+    if (iface == "-h" || iface == "--help") { usage(); return 0; }
 
     try {
+#ifndef GO2_DRY
         // DDS / 통신 초기화
         unitree::robot::ChannelFactory::Instance()->Init(0, iface);
 
         // 최신 네임스페이스의 SportClient
         unitree::robot::go2::SportClient sport;
-
+#else
+        DrySport sport;
+#endif
         std::ios::sync_with_stdio(false);
-        std::cin.tie(nullptr);
 
+        Server<decltype(sport)> server(sport);
         std::string line;
-        while (std::getline(std::cin, line)) {
+        while (server.next_line(line, -1)) {
             if (line.empty()) continue;
-
-            std::string act;
-            if (!parse_json_kv(line, "action", act)) {
-                std::cout << "{\"ok\":false,\"error\":\"no action\"}\n" << std::flush;
-                continue;
-            }
-
-            if (act=="quit" || act=="exit") {
-                std::cout << "{\"ok\":true,\"action\":\"quit\"}\n" << std::flush;
-                break;
-            }
-            else if (act=="sit") {
-                sport.Sit();
-                std::cout << "{\"ok\":true,\"action\":\"sit\"}\n" << std::flush;
-            }
-            else if (act=="stand") {
-                sport.RiseSit();
-                std::cout << "{\"ok\":true,\"action\":\"stand\"}\n" << std::flush;
-            }
-            else if (act=="hello") {
-                sport.Hello();
-                std::cout << "{\"ok\":true,\"action\":\"hello\"}\n" << std::flush;
-            }
-            else if (act=="heart") {
-                sport.Heart();
-                std::cout << "{\"ok\":true,\"action\":\"heart\"}\n" << std::flush;
-            }
-            else if (act=="bow") {
-                sport.Scrape();
-                std::cout << "{\"ok\":true,\"action\":\"bow\"}\n" << std::flush;
-            }
-            else if (act=="stop") {
-                sport.StopMove();
-                std::cout << "{\"ok\":true,\"action\":\"stop\"}\n" << std::flush;
-            }
-            else if (act=="move") {
-                double vx=0.0, vy=0.0, vyaw=0.0;
-                parse_json_num(line, "vx", vx);
-                parse_json_num(line, "vy", vy);
-                parse_json_num(line, "vyaw", vyaw);
-
-                // 안전 클램프(teleop와 유사)
-                vx   = std::max(-1.0, std::min(1.0, vx));
-                vyaw = std::max(-2.0, std::min(2.0, vyaw));
-
-                sport.Move(vx, 0.0 /*vy는 미사용*/, vyaw);
-                std::cout << "{\"ok\":true,\"action\":\"move\",\"vx\":" << vx
-                          << ",\"vy\":0.0,\"vyaw\":" << vyaw << "}\n" << std::flush;
-            }
-            else {
-                std::cout << "{\"ok\":false,\"error\":\"unknown action\"}\n" << std::flush;
-            }
+            if (!server.handle(line)) break;
         }
         return 0;
     } catch (const std::exception& e) {
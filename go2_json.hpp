@@ -0,0 +1,381 @@
+// go2_json.hpp — go2_action_server 용 한 줄 JSON 파서(외부 의존 없음)
+// - 한 번 훑으면서(single pass) 문법 검사 + 토큰 배열(평탄화된 트리)을 만든다.
+//   토큰은 원문 안의 위치만 들고 있어서 값 복사/할당이 없다(JsonDoc 을 재사용하면 줄마다 할당 0)
+// - 중첩 object/array, 문자열 이스케이프(\" \\ \/ \b \f \n \r \t \uXXXX, 서로게이트 쌍 → UTF-8)
+// - 문자열은 꺼낼 때만 디코딩(이스케이프 없으면 그대로 복사), 숫자도 꺼낼 때 strtod
+// - 출력용 json_escape() 포함
+#pragma once
+#include <string>
+#include <vector>
+#include <cstdlib>
+#include <cstdint>
+#include <cstring>
+
+struct JsonTok {
+    enum Type : uint8_t { Null, Bool, Number, String, Array, Object };
+    Type type;
+    bool escaped;      // String: 이스케이프 포함 여부(디코딩 필요)
+    uint32_t start;    // 원문 위치(String 은 따옴표 안쪽)
+    uint32_t end;
+    uint32_t count;    // Array: 원소 수, Object: 키 수
+    uint32_t skip;     // 이 값(하위 포함) 다음 토큰 index
+};
+
+class JsonDoc;
+
+// 토큰 하나를 가리키는 가벼운 참조(i < 0 이면 없음)
+class JsonRef {
+public:
+    JsonRef() : d_(nullptr), i_(-1) {}
+    JsonRef(const JsonDoc* d, int i) : d_(d), i_(i) {}
+    explicit operator bool() const { return i_ >= 0; }
+    JsonTok::Type type() const;
+    bool is_object() const { return i_ >= 0 && type() == JsonTok::Object; }
+    bool is_array() const { return i_ >= 0 && type() == JsonTok::Array; }
+    uint32_t size() const;
+    JsonRef get(const char* key) const;              // object 필드
+    JsonRef at(uint32_t n) const;                    // array 원소(순차 순회는 first/next 가 빠름)
+    JsonRef first() const;                           // array 첫 원소
+    JsonRef next() const;                            // 같은 array 의 다음 원소(호출자가 size 로 끝을 센다)
+    bool str(std::string& out) const;                // 문자열 값
+    bool num(double& out) const;                     // 숫자(문자열 "0.3" 도 허용: 예전 클라이언트 호환)
+    bool get_str(const char* key, std::string& out) const { JsonRef v = get(key); return v && v.str(out); }
+    bool get_num(const char* key, double& out) const { JsonRef v = get(key); return v && v.num(out); }
+    std::string raw() const;                         // 원문 그대로(숫자 id 를 응답에 되돌릴 때)
+
+private:
+    const JsonDoc* d_;
+    int i_;
+};
+
+class JsonDoc {
+public:
+    // 실패 시 false + error(). src 는 JsonDoc 을 쓰는 동안 살아 있어야 한다
+    bool parse(const std::string& src) {
+        src_ = &src;
+        p_ = src.data();
+        b_ = p_;
+        end_ = p_ + src.size();
+        toks_.clear();
+        err_ = "";
+        ws();
+        if (!value(0)) return false;
+        ws();
+        if (p_ != end_) return fail("trailing characters");
+        return true;
+    }
+    JsonRef root() const { return toks_.empty() ? JsonRef() : JsonRef(this, 0); }
+    const char* error() const { return err_; }
+
+private:
+    friend class JsonRef;
+    static const int kMaxDepth = 32;
+    const std::string* src_ = nullptr;
+    const char* b_ = nullptr;
+    const char* p_ = nullptr;
+    const char* end_ = nullptr;
+    const char* err_ = "";
+    std::vector<JsonTok> toks_;
+
+    bool fail(const char* e) { err_ = e; return false; }
+    void ws() { while (p_ < end_ && (*p_ == ' ' || *p_ == '\t' || *p_ == '\r' || *p_ == '\n')) ++p_; }
+    uint32_t off() const { return (uint32_t)(p_ - b_); }
+
+    size_t push(JsonTok::Type t) {
+        toks_.push_back(JsonTok{t, false, off(), 0, 0, 0});
+        return toks_.size() - 1;
+    }
+
+    bool value(int depth) {
+        if (p_ >= end_) return fail("unexpected end");
+        switch (*p_) {
+        case '{': return object(depth);
+        case '[': return array(depth);
+        case '"': return string_tok();
+        case 't': return literal("true", 4, JsonTok::Bool);
+        case 'f': return literal("false", 5, JsonTok::Bool);
+        case 'n': return literal("null", 4, JsonTok::Null);
+        default:  return number();
+        }
+    }
+
+    bool literal(const char* w, size_t n, JsonTok::Type t) {
+        if ((size_t)(end_ - p_) < n || std::memcmp(p_, w, n) != 0) return fail("bad literal");
+        size_t i = push(t);
+        p_ += n;
+        toks_[i].end = off();
+        toks_[i].skip = (uint32_t)toks_.size();
+        return true;
+    }
+
+    static bool digit(char c) { return c >= '0' && c <= '9'; }
+
+    // JSON 숫자 문법 그대로 검사(검사를 통과한 구간은 strtod 가 정확히 같은 곳에서 멈춘다)
+    bool number() {
+        size_t i = push(JsonTok::Number);
+        if (p_ < end_ && *p_ == '-') ++p_;
+        if (p_ >= end_ || !digit(*p_)) return fail("bad number");
+        if (*p_ == '0') ++p_;
+        else while (p_ < end_ && digit(*p_)) ++p_;
+        if (p_ < end_ && *p_ == '.') {
+            ++p_;
+            if (p_ >= end_ || !digit(*p_)) return fail("bad number");
+            while (p_ < end_ && digit(*p_)) ++p_;
+        }
+        if (p_ < end_ && (*p_ == 'e' || *p_ == 'E')) {
+            ++p_;
+            if (p_ < end_ && (*p_ == '+' || *p_ == '-')) ++p_;
+            if (p_ >= end_ || !digit(*p_)) return fail("bad number");
+            while (p_ < end_ && digit(*p_)) ++p_;
+        }
+        toks_[i].end = off();
+        toks_[i].skip = (uint32_t)toks_.size();
+        return true;
+    }
+
+    static int hexval(char h) {
+        if (h >= '0' && h <= '9') return h - '0';
+        if (h >= 'a' && h <= 'f') return h - 'a' + 10;
+        if (h >= 'A' && h <= 'F') return h - 'A' + 10;
+        return -1;
+    }
+
+    // 문자열 구간 검사만(디코딩은 JsonRef::str 에서)
+    bool string_scan(bool& escaped) {
+        ++p_;                                           // 여는 "
+        escaped = false;
+        while (p_ < end_) {
+            char c = *p_;
+            if (c == '"') return true;
+            if ((unsigned char)c < 0x20) return fail("control char in string");
+            if (c != '\\') { ++p_; continue; }
+            escaped = true;
+            if (++p_ >= end_) break;
+            char e = *p_++;
+            if (e == 'u') {
+                if (end_ - p_ < 4) return fail("bad \\u escape");
+                for (int k = 0; k < 4; ++k)
+                    if (hexval(p_[k]) < 0) return fail("bad \\u escape");
+                p_ += 4;
+            } else if (!std::strchr("\"\\/bfnrt", e)) {
+                return fail("bad escape");
+            }
+        }
+        return fail("unterminated string");
+    }
+
+    bool string_tok() {
+        size_t i = push(JsonTok::String);
+        toks_[i].start = off() + 1;
+        bool esc;
+        if (!string_scan(esc)) return false;
+        toks_[i].end = off();
+        toks_[i].escaped = esc;
+        ++p_;                                           // 닫는 "
+        toks_[i].skip = (uint32_t)toks_.size();
+        return true;
+    }
+
+    bool array(int depth) {
+        if (depth >= kMaxDepth) return fail("too deep");
+        size_t i = push(JsonTok::Array);
+        ++p_;
+        ws();
+        uint32_t n = 0;
+        if (p_ < end_ && *p_ == ']') {
+            ++p_;
+        } else {
+            while (true) {
+                ws();
+                if (!value(depth + 1)) return false;
+                ++n;
+                ws();
+                if (p_ >= end_) return fail("unterminated array");
+                if (*p_ == ',') { ++p_; continue; }
+                if (*p_ == ']') { ++p_; break; }
+                return fail("expected , or ]");
+            }
+        }
+        toks_[i].end = off();
+        toks_[i].count = n;
+        toks_[i].skip = (uint32_t)toks_.size();
+        return true;
+    }
+
+    bool object(int depth) {
+        if (depth >= kMaxDepth) return fail("too deep");
+        size_t i = push(JsonTok::Object);
+        ++p_;
+        ws();
+        uint32_t n = 0;
+        if (p_ < end_ && *p_ == '}') {
+            ++p_;
+        } else {
+            while (true) {
+                ws();
+                if (p_ >= end_ || *p_ != '"') return fail("expected key");
+                if (!string_tok()) return false;
+                ws();
+                if (p_ >= end_ || *p_ != ':') return fail("expected :");
+                ++p_;
+                ws();
+                if (!value(depth + 1)) return false;
+                ++n;
+                ws();
+                if (p_ >= end_) return fail("unterminated object");
+                if (*p_ == ',') { ++p_; continue; }
+                if (*p_ == '}') { ++p_; break; }
+                return fail("expected , or }");
+            }
+        }
+        toks_[i].end = off();
+        toks_[i].count = n;
+        toks_[i].skip = (uint32_t)toks_.size();
+        return true;
+    }
+
+    // 이스케이프 디코딩(문법은 parse 에서 이미 검사됨)
+    static void put_utf8(std::string& o, uint32_t c) {
+        if (c < 0x80) o += (char)c;
+        else if (c < 0x800) { o += (char)(0xC0 | (c >> 6)); o += (char)(0x80 | (c & 0x3F)); }
+        else if (c < 0x10000) {
+            o += (char)(0xE0 | (c >> 12)); o += (char)(0x80 | ((c >> 6) & 0x3F)); o += (char)(0x80 | (c & 0x3F));
+        } else {
+            o += (char)(0xF0 | (c >> 18)); o += (char)(0x80 | ((c >> 12) & 0x3F));
+            o += (char)(0x80 | ((c >> 6) & 0x3F)); o += (char)(0x80 | (c & 0x3F));
+        }
+    }
+
+    static uint32_t hex4(const char* p) {
+        return (uint32_t)(hexval(p[0]) << 12 | hexval(p[1]) << 8 | hexval(p[2]) << 4 | hexval(p[3]));
+    }
+
+    void decode(const JsonTok& t, std::string& o) const {
+        const char* p = b_ + t.start;
+        const char* e = b_ + t.end;
+        o.clear();
+        if (!t.escaped) { o.assign(p, e); return; }
+        while (p < e) {
+            if (*p != '\\') { o += *p++; continue; }
+            char c = p[1];
+            p += 2;
+            switch (c) {
+            case 'b': o += '\b'; break;
+            case 'f': o += '\f'; break;
+            case 'n': o += '\n'; break;
+            case 'r': o += '\r'; break;
+            case 't': o += '\t'; break;
+            case 'u': {
+                uint32_t cp = hex4(p);
+                p += 4;
+                if (cp >= 0xD800 && cp <= 0xDBFF && e - p >= 6 && p[0] == '\\' && p[1] == 'u') {
+                    uint32_t lo = hex4(p + 2);
+                    if (lo >= 0xDC00 && lo <= 0xDFFF) {
+                        cp = 0x10000 + ((cp - 0xD800) << 10) + (lo - 0xDC00);
+                        p += 6;
+                    }
+                }
+                put_utf8(o, cp);
+                break;
+            }
+            default: o += c;          // " \ /
+            }
+        }
+    }
+
+    // 키 비교: 이스케이프 없는 키는 원문과 바로 비교
+    bool key_eq(const JsonTok& t, const char* key, size_t klen) const {
+        if (!t.escaped)
+            return t.end - t.start == klen && std::memcmp(b_ + t.start, key, klen) == 0;
+        std::string k;
+        decode(t, k);
+        return k.size() == klen && std::memcmp(k.data(), key, klen) == 0;
+    }
+};
+
+inline JsonTok::Type JsonRef::type() const { return d_->toks_[i_].type; }
+inline uint32_t JsonRef::size() const { return i_ < 0 ? 0 : d_->toks_[i_].count; }
+
+inline JsonRef JsonRef::get(const char* key) const {
+    if (!is_object()) return JsonRef();
+    const auto& toks = d_->toks_;
+    size_t klen = std::strlen(key);
+    uint32_t n = toks[i_].count;
+    uint32_t k = (uint32_t)i_ + 1;
+    for (uint32_t c = 0; c < n; ++c) {
+        uint32_t v = k + 1;
+        if (d_->key_eq(toks[k], key, klen)) return JsonRef(d_, (int)v);
+        k = toks[v].skip;
+    }
+    return JsonRef();
+}
+
+inline JsonRef JsonRef::first() const {
+    return (is_array() && size() > 0) ? JsonRef(d_, i_ + 1) : JsonRef();
+}
+
+inline JsonRef JsonRef::next() const {
+    uint32_t s = d_->toks_[i_].skip;
+    return s < d_->toks_.size() ? JsonRef(d_, (int)s) : JsonRef();
+}
+
+inline JsonRef JsonRef::at(uint32_t n) const {
+    if (!is_array() || n >= size()) return JsonRef();
+    JsonRef r = first();
+    while (n--) r = r.next();
+    return r;
+}
+
+inline bool JsonRef::str(std::string& out) const {
+    if (i_ < 0 || type() != JsonTok::String) return false;
+    d_->decode(d_->toks_[i_], out);
+    return true;
+}
+
+inline bool JsonRef::num(double& out) const {
+    if (i_ < 0) return false;
+    const JsonTok& t = d_->toks_[i_];
+    if (t.type == JsonTok::Number) {
+        // 검사된 숫자 구간 뒤는 구분자(, } ] 공백 또는 끝)라 strtod 가 정확히 거기서 멈춘다
+        out = std::strtod(d_->b_ + t.start, nullptr);
+        return true;
+    }
+    if (t.type == JsonTok::String) {
+        std::string s;
+        d_->decode(t, s);
+        char* e = nullptr;
+        double v = std::strtod(s.c_str(), &e);
+        if (e && e != s.c_str() && *e == '\0') { out = v; return true; }
+    }
+    return false;
+}
+
+inline std::string JsonRef::raw() const {
+    if (i_ < 0) return std::string();
+    const JsonTok& t = d_->toks_[i_];
+    if (t.type == JsonTok::String) return d_->src_->substr(t.start - 1, t.end - t.start + 2);
+    return d_->src_->substr(t.start, t.end - t.start);
+}
+
+// 응답 문자열용 이스케이프(따옴표 포함해서 돌려줌)
+inline std::string json_escape(const std::string& s) {
+    std::string o;
+    o.reserve(s.size() + 2);
+    o += '"';
+    for (char c : s) {
+        switch (c) {
+        case '"': o += "\\\""; break;
+        case '\\': o += "\\\\"; break;
+        case '\n': o += "\\n"; break;
+        case '\r': o += "\\r"; break;
+        case '\t': o += "\\t"; break;
+        default:
+            if ((unsigned char)c < 0x20) {
+                static const char* hx = "0123456789abcdef";
+                o += "\\u00"; o += hx[(c >> 4) & 0xF]; o += hx[c & 0xF];
+            } else o += c;
+        }
+    }
+    o += '"';
+    return o;
+}
@@ -20,13 +20,49 @@ static std::atomic<bool> special_trigger(false);  // 특수 신호(SIGUSR1 또
 static std::atomic<bool> pending_standup(false);  // 규칙 A: StandDown 후 대기 → 특수신호 시 StandUp
 static std::atomic<bool> pending_risesit(false);  // 규칙 B: Sit 후 대기 → 특수신호 시 RiseSit
 
+// 추측 준비(/prep <id>): 파셜 단계에서 미리 해 둔 준비 동작. 본 명령이 PREP_TTL_MS 안에 오면 그만큼 건너뜀
+static const int PRE_BALANCE_MS = 600;
+static const int PREP_TTL_MS    = 5000;
+static int prep_id = 0;
+static std::chrono::steady_clock::time_point prep_at;
+
 // SIGINT: 종료
 void on_sigint(int){ stop_flag = true; }
 // SIGUSR1: 특수 신호 트리거
 void on_sigusr1(int){ special_trigger = true; }
 
 // 안전을 위한 사전 균형 서기(점프류 호출 전 권장)
-static inline void pre_balance(SportClient& c){ c.BalanceStand(); msleep(600); }
+static inline void pre_balance(SportClient& c){ c.BalanceStand(); msleep(PRE_BALANCE_MS); }
+
+static int prep_age_ms(){
+  return (int)std::chrono::duration_cast<std::chrono::milliseconds>(std::chrono::steady_clock::now() - prep_at).count();
+}
+
+// /prep <id> : 안전한 준비 동작만(현재는 점프 전 균형서기). 틀리면 그대로 유지(hold) — 서 있는 자세라 되돌릴 것 없음
+// /prep 0    : 준비 취소(빗나간 추측). 로봇은 움직이지 않고 준비 상태만 버림
+static void run_prep(SportClient& cli, int id){
+  if (id == 0){ prep_id = 0; std::cout << "[PREP] #0 cancel" << std::endl; return; }
+  if (id != 13){ std::cout << "[PREP] #" << id << " none" << std::endl; return; }
+  if (prep_id == id && prep_age_ms() < PREP_TTL_MS){
+    prep_at = std::chrono::steady_clock::now();
+    std::cout << "[PREP] #" << id << " held" << std::endl;
+    return;
+  }
+  int32_t ret = cli.BalanceStand();
+  if (ret == 0){ prep_id = id; prep_at = std::chrono::steady_clock::now(); }
+  std::cout << "[PREP] #" << id << " set ret=" << ret << std::endl;
+}
+
+// 점프 전 균형서기: 준비가 살아 있으면 남은 안정화 시간만 기다림
+static void pre_balance_or_prep(SportClient& cli, bool prepped){
+  if (prepped){
+    int left = PRE_BALANCE_MS - prep_age_ms();
+    if (left > 0) msleep(left);
+    std::cout << "[PREP] #13 hit saved=" << (left > 0 ? PRE_BALANCE_MS - left : PRE_BALANCE_MS) << "ms" << std::endl;
+  } else {
+    pre_balance(cli);
+  }
+}
 
 // 규칙 A/B: 특수 신호 수신 시, 대기 중 자동 동작을 수행
 static void process_special_triggers(SportClient& cli){
@@ -35,17 +71,17 @@ static void process_special_triggers(SportClient& cli){
   // Sit 이후 RiseSit가 먼저, 그 다음 StandDown 이후 StandUp 순으로 처리
   if (pending_risesit.exchange(false)) {
     int32_t ret = cli.RiseSit();   // 앉은 자세 복구
-    std::cout << "[TRIGGER] RiseSit => ret=" << ret << "\n";
+    std::cout << "[TRIGGER] RiseSit => ret=" << ret << std::endl;
     msleep(400);
   }
   if (pending_standup.exchange(false)) {
     int32_t ret = cli.StandUp();   // 관절잠금 서기
-    std::cout << "[TRIGGER] StandUp => ret=" << ret << "\n";
+    std::cout << "[TRIGGER] StandUp => ret=" << ret << std::endl;
     msleep(400);
   }
 }
 
-// 메뉴 항목
+// 메뉴 항목 (번호 실행기. 음성 키워드 ↔ 번호 매핑은 intent_catalog.json 의 motion2 필드에서 관리)
 struct Item { int id; const char* name; const char* note; };
 static const Item MENU[] = {
   { 1,"StandUp",       "관절 잠금 서기" },
@@ -68,11 +104,15 @@ static void print_menu(){
   for (auto &m: MENU) std::cout << m.id << ". " << m.name << " - " << m.note << "\n";
   std::cout << "-----------------------------\n";
   std::cout << "[특수 신호] ➊ 다른 터미널: kill -USR1 <PID>  ➋ 여기 입력창: /go\n";
+  std::cout << "[추측 준비] /prep 13 (점프 전 균형서기를 미리) — 이어서 13 이 오면 안정화 대기만큼 빨라짐, /prep 0 취소\n";
+  std::cout << "[상태 복원] /pending sit|down|none (동작 없이 특수 신호 대기 상태만 설정, 재시작 직후용)\n";
   std::cout << "=============================\n";
 }
 
 // 단일 동작 실행 함수
 static int run_motion_id(SportClient& cli, int id){
+  const bool prepped = (prep_id == 13 && prep_age_ms() < PREP_TTL_MS);
+  prep_id = 0;                     // 한 번 쓰거나 다른 동작이 끼면 준비는 무효
   switch(id){
     case 1:  return cli.StandUp();
     case 2:  { int r=cli.StandDown(); if(r==0) pending_standup=true; return r; }
@@ -86,7 +126,7 @@ static int run_motion_id(SportClient& cli, int id){
     case 10: return cli.Content();
     case 11: return cli.Heart();
     case 12: return cli.Scrape();
-    case 13: pre_balance(cli); return cli.FrontJump();
+    case 13: pre_balance_or_prep(cli, prepped); return cli.FrontJump();
     default:
       std::cout << "[WARN] 알 수 없는 번호: " << id << "\n";
       return -1;
@@ -119,7 +159,7 @@ int main(int argc, char** argv){
       try{
         int id = std::stoi(argv[i]);
         int ret = run_motion_id(cli, id);
-        std::cout << "[RUN argv] id=" << id << " ret=" << ret << "\n";
+        std::cout << "[RUN argv] id=" << id << " ret=" << ret << std::endl;
         msleep(400);
         process_special_triggers(cli);
       }catch(...){
@@ -137,6 +177,18 @@ int main(int argc, char** argv){
     if(!std::getline(std::cin, line)) break;
     if(line=="q" || line=="Q") break;
     if(line=="/go"){ special_trigger = true; }
+    if(line.rfind("/prep ", 0) == 0){
+      try{ run_prep(cli, std::stoi(line.substr(6))); }catch(...){ std::cout << "[WARN] bad /prep: " << line << "\n"; }
+      continue;
+    }
+    if(line.rfind("/pending ", 0) == 0){
+      // 로봇은 움직이지 않고 대기 플래그만(재시작 전 Sit/StandDown 상태 이어받기)
+      std::string st = line.substr(9);
+      pending_risesit = (st == "sit");
+      pending_standup = (st == "down");
+      std::cout << "[PENDING] " << st << std::endl;
+      continue;
+    }
 
     // 특수 신호 처리(대기중 자동동작 실행)
     process_special_triggers(cli);
@@ -147,8 +199,9 @@ int main(int argc, char** argv){
     int id;
     while(iss >> id && !stop_flag){
       int ret = run_motion_id(cli, id);
-      if (ret==0) std::cout << "[OK] #" << id << " 성공\n";
-      else        std::cout << "[FAIL] #" << id << " ret=" << ret << "\n";
+      // 파이프로 읽는 쪽(motion_events.py)이 완료 시점을 바로 알 수 있도록 즉시 flush
+      if (ret==0) std::cout << "[OK] #" << id << " 성공" << std::endl;
+      else        std::cout << "[FAIL] #" << id << " ret=" << ret << std::endl;
       msleep(500);
 
       // 각 명령 사이에도 특수 신호를 즉시 반영
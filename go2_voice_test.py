@@ -5,9 +5,13 @@ import threading
 import subprocess
 from getpass import getpass
 
+from motion_events import MotionEvents
+
 BIN_DIR  = "/home/unitree/unitree_sdk2-main/build/bin"
 BIN_PATH = os.path.join(BIN_DIR, "go2_motion2")
 IFACE    = "eth0"   # 네트워크 인터페이스명
+# [OK] 는 SportClient 호출이 반환된 시점이지 동작이 끝난 시점이 아님 → 보낸 뒤 최소 이만큼은 기다렸다가 다음 동작
+DWELL_SEC = float(os.environ.get("DEMO_DWELL_SEC", "2.0"))
 
 class Go2MotionController:
     def __init__(self, iface=IFACE, bin_path=BIN_PATH, sudo_pw=None):
@@ -17,6 +21,7 @@ class Go2MotionController:
         self._out_thread = None
         self._running = False
         self.sudo_pw = "123"
+        self.events = MotionEvents()
 
     def start(self):
         if not os.path.isfile(self.bin_path):
@@ -55,8 +60,8 @@ class Go2MotionController:
         self._out_thread = threading.Thread(target=self._pump_stdout, daemon=True)
         self._out_thread.start()
 
-        # 프로그램이 메뉴를 띄울 시간을 잠깐 줌
-        time.sleep(1.0)
+        # 프로그램이 메뉴를 띄울 때까지 대기
+        self.events.wait_ready(timeout=5.0)
         print("[READY] 번호를 보낼 준비 완료.")
 
     def _pump_stdout(self):
@@ -64,28 +69,45 @@ class Go2MotionController:
             for line in self.proc.stdout:
                 sys.stdout.write(line)
                 sys.stdout.flush()
+                self.events.feed(line)
         except Exception as e:
             if self._running:
                 print(f"[WARN] stdout pump error: {e}")
 
     def send_id(self, motion_id: int):
-        """메뉴 번호(정수)를 실행. 예: 8(Hello), 3(Sit) 등"""
+        """메뉴 번호(정수)를 실행. 예: 8(Hello), 3(Sit) 등. 이벤트 기준점(mark) 반환."""
         if self.proc is None or self.proc.poll() is not None:
             print("[ERR] process not running.")
-            return
+            return None
+        mark = self.events.mark()
         s = f"{int(motion_id)}\n"
         self.proc.stdin.write(s)
         self.proc.stdin.flush()
         print(f"[SEND] {motion_id}")
+        return mark
+
+    def run_id(self, motion_id: int, timeout=10.0, dwell=DWELL_SEC):
+        """번호 실행 후 [OK]/[FAIL] 이 나올 때까지 대기(보낸 뒤 최소 dwell 초). 완료 이벤트(또는 None) 반환."""
+        t0 = time.monotonic()
+        mark = self.send_id(motion_id)
+        if mark is None:
+            return None
+        ev = self.events.wait_ack(mark, motion_id=int(motion_id), timeout=timeout)
+        if ev is None:
+            print(f"[WARN] #{motion_id} 응답 없음({timeout}s)")
+        _dwell(t0, dwell)
+        return ev
 
     def special_go(self):
         """특수 신호(/go) 전달 (StandDown→StandUp, Sit→RiseSit 트리거)"""
         if self.proc is None or self.proc.poll() is not None:
             print("[ERR] process not running.")
             return
+        mark = self.events.mark()
         self.proc.stdin.write("/go\n")
         self.proc.stdin.flush()
         print("[SEND] /go")
+        return mark
 
     def stop(self):
         """메뉴 종료(q) 후 프로세스 종료"""
@@ -106,19 +128,54 @@ class Go2MotionController:
             self.proc = None
             print("[DONE] stopped.")
 
+def _dwell(t0, sec):
+    rest = sec - (time.monotonic() - t0)
+    if rest > 0:
+        time.sleep(rest)
+
 def demo():
     ctrl = Go2MotionController()
     ctrl.start()
 
     # 예시: 8=Hello, 3=Sit, (특수신호) /go → RiseSit, 1=StandUp
-    time.sleep(2.0); ctrl.send_id(8)     # Hello
-    time.sleep(3.0); ctrl.send_id(3)     # Sit
-    time.sleep(2.0); ctrl.special_go()   # /go → RiseSit
-    time.sleep(3.0); ctrl.send_id(1)     # StandUp
+    # 고정 sleep 대신 go2_motion2 의 [OK]/[FAIL]/[TRIGGER] 출력을 기다렸다가 다음 동작
+    ctrl.run_id(8)                       # Hello
+    ctrl.run_id(3)                       # Sit
+    t0 = time.monotonic()
+    mark = ctrl.special_go()             # /go → RiseSit
+    ctrl.events.wait(lambda ev: ev.kind == "trigger", mark, timeout=10.0)
+    _dwell(t0, DWELL_SEC)
+    ctrl.run_id(1)                       # StandUp
 
     # 종료
-    time.sleep(2.0)
     ctrl.stop()
 
+def demo_arbiter():
+    # 중재기(motion_arbiter)가 떠 있으면 SportClient 를 따로 잡지 않고 script 등급 클라이언트로 같은 순서 실행
+    from motion_arbiter import ArbiterClient
+    from motion_events import parse_line
+    lost = []
+
+    def on_line(line):
+        # 응답과 별개로 오는 알림(임대 빼앗김 등)
+        ev = parse_line(line)
+        if ev is not None and ev.kind == "event":
+            print(f"[ARB] {ev.name} {ev.raw}")
+            if ev.name == "lease_lost":
+                lost.append(ev)
+
+    cl = ArbiterClient("demo", "script", on_line=on_line)
+    print("[INFO]", cl.connect())
+    print("[INFO] lease", cl.lease(15))          # 데모 동안 음성 명령은 거절(teleop 은 빼앗을 수 있음)
+    for act in ("hello", "sit", "stand"):
+        if lost:
+            print("[INFO] 임대를 빼앗김 → 데모 중단")
+            break
+        t0 = time.monotonic()
+        print(f"[SEND] {act} →", cl.call(act))
+        _dwell(t0, DWELL_SEC)
+    cl.release()
+    cl.close()
+
 if __name__ == "__main__":
-    demo()
\ No newline at end of file
+    demo_arbiter() if os.environ.get("ARBITER_ADDR") else demo()
\ No newline at end of file
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+go2voice: 음성 제어 스크립트 통합 진입점
+  go2voice run [please|agent|motion]     음성 제어 실행 (please=go2_motion2, agent=ROS2+action server, motion=단일 motion2)
+  go2voice diag                          캡처 경로 진단(voice_diag.py)
+  go2voice bench [beam|resample|wake|soak|startup] 벤치마크 / soak: 장시간 자원·지연 추세 / startup: 기동 시간
+  go2voice replay <dir> [t0 [t1]]        녹화 세션 조회/재실행(session_replay.py)
+  go2voice arbiter                       동작 중재기(motion_arbiter.py): 음성/teleop/데모 명령 우선순위·임대
+  go2voice gateway [serve|send <문장>...|bench] 음성 없이 문장/의도 입력(command_gateway.py, GATEWAY_ADDR)
+  go2voice eval <corpus>                 녹음 코퍼스 의도 정확도(intent_eval.py, 인식 결과 캐시 재사용)
+설치: pip install -e .   (설치 없이 python3 go2voice.py ... 도 동일)
+무거운 모듈(vosk, numpy, rclpy)은 하위 명령이 실제로 쓰는 시점에만 불러온다.
+GO2VOICE_DRY=1 이면 하위 명령 모듈만 불러오고 바로 끝낸다(기동 시간 측정용).
+"""
+import os
+import sys
+import time
+
+_T0 = time.perf_counter()
+HEAVY = ("numpy", "vosk", "rclpy")     # 기동 측정에서 로드 여부를 확인할 모듈
+
+def _run_mode(args):
+    mode = args[0] if args else "please"
+    mods = {"please": "voice_please", "agent": "voice_agent", "motion": "go2_voice2motion"}
+    if mode not in mods:
+        raise SystemExit(f"[ERR] run 모드: {'|'.join(mods)} (입력: {mode})")
+    mod = __import__(mods[mode])
+    return mod.main
+
+def _diag(args):
+    import runpy
+    # voice_diag 는 위에서 아래로 실행되는 스크립트라 import 가 곧 실행
+    return lambda: runpy.run_module("voice_diag", run_name="__main__")
+
+def _bench(args):
+    what = args[0] if args else "startup"
+    if what == "startup":
+        return lambda: startup_bench(args[1:])
+    mods = {"beam": "beam_bench", "resample": "resample_bench", "wake": "wake_bench", "soak": "soak_test"}
+    if what not in mods:
+        raise SystemExit(f"[ERR] bench 종류: {'|'.join(mods)}|startup (입력: {what})")
+    return __import__(mods[what]).main
+
+def _replay(args):
+    import session_replay
+    def run():
+        sys.argv = ["session_replay.py"] + list(args)
+        session_replay.main()
+    return run
+
+def _arbiter(args):
+    return __import__("motion_arbiter").main
+
+def _gateway(args):
+    import command_gateway
+    def run():
+        sys.argv = ["command_gateway.py"] + list(args)
+        command_gateway.main()
+    return run
+
+def _eval(args):
+    import intent_eval
+    def run():
+        sys.argv = ["intent_eval.py"] + list(args)
+        intent_eval.main()
+    return run
+
+def _need_catalog(cmd, args):
+    """카탈로그를 쓰는 하위 명령이면 기동 때 파일부터 확인(첫 로드에서 알 수 없는 오류로 죽지 않게)"""
+    if cmd not in ("run", "gateway", "eval", "replay") and not (cmd == "bench" and args[:1] in (["wake"], ["soak"])):
+        return
+    from voice_nlp import CATALOG_PATH
+    if not os.path.isfile(CATALOG_PATH):
+        raise SystemExit(f"[ERR] 의도 카탈로그가 없습니다: {CATALOG_PATH}\n"
+                         f"      INTENT_CATALOG=<intent_catalog.json 경로> 로 지정하거나, "
+                         f"소스 폴더에서 pip install -e . / pip install . 로 다시 설치하세요")
+
+COMMANDS = {"run": _run_mode, "diag": _diag, "bench": _bench, "replay": _replay, "eval": _eval,
+            "arbiter": _arbiter, "gateway": _gateway}
+
+def startup_bench(args):
+    """하위 명령마다 새 인터프리터로 GO2VOICE_DRY=1 실행 → 기동 ms, 불러온 무거운 모듈"""
+    import json
+    import subprocess
+    n = int(os.environ.get("BENCH_REPEAT", "5"))
+    # diag 는 제외: voice_diag 는 main() 없는 스크립트라 DRY 에서는 실제 import(vosk 등)를 재지 못하고 빈 인터프리터만 잰다
+    cases = [["run", "please"], ["run", "motion"], ["run", "agent"], ["bench", "resample"],
+             ["bench", "beam"], ["bench", "wake"], ["bench", "soak"], ["replay"], ["eval"], ["arbiter"], ["gateway"]]
+    env = dict(os.environ, GO2VOICE_DRY="1")
+    rows = []
+    for case in cases:
+        times, inner, heavy, err = [], [], None, None
+        for _ in range(n):
+            t0 = time.perf_counter()
+            p = subprocess.run([sys.executable, os.path.abspath(__file__)] + case, env=env,
+                               capture_output=True, text=True)
+            times.append((time.perf_counter() - t0) * 1000.0)
+            if p.returncode != 0:
+                err = (p.stderr.strip().splitlines() or ["?"])[-1]
+                break
+            d = json.loads(p.stdout.strip().splitlines()[-1])
+            inner.append(d["ms"])
+            heavy = d["heavy"]
+        times.sort()
+        inner.sort()
+        rows.append({"cmd": " ".join(case), "wall_ms": round(times[len(times) // 2], 1),
+                     "import_ms": round(inner[len(inner) // 2], 1) if inner else None,
+                     "heavy": heavy, "error": err})
+    print(f"{'command':<16} {'wall ms':>8} {'import ms':>10}  heavy modules")
+    for r in rows:
+        imp = "-" if r["import_ms"] is None else f"{r['import_ms']:.1f}"
+        tail = r["error"] or (",".join(r["heavy"]) or "-")
+        print(f"{r['cmd']:<16} {r['wall_ms']:>8.1f} {imp:>10}  {tail}")
+    out = os.environ.get("BENCH_JSON")
+    if out:
+        with open(out, "w") as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+        print(f"[INFO] wrote {out}")
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help", "help") or argv[0] not in COMMANDS:
+        print(__doc__)
+        sys.exit(0 if argv and argv[0] in ("-h", "--help", "help") else 2)
+    cmd, args = argv[0], argv[1:]
+    _need_catalog(cmd, args)
+    run = COMMANDS[cmd](args)
+    if os.environ.get("GO2VOICE_DRY", "0") in ("1", "true"):
+        import json
+        print(json.dumps({"cmd": cmd, "ms": round((time.perf_counter() - _T0) * 1000.0, 2),
+                          "heavy": [m for m in HEAVY if m in sys.modules]}))
+        return
+    run()
+
+if __name__ == "__main__":
+    main()
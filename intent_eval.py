@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+녹음 코퍼스 의도 정확도 회귀 평가 (인식 결과는 transcript_cache 로 재사용)
+  python3 intent_eval.py <corpus>            # 또는 EVAL_CORPUS=<corpus>
+코퍼스(16kHz mono .raw 또는 .wav, 한 파일 = 명령 한 번)
+  <corpus>/<의도 이름>/*.wav    예: sit/001.wav, front_jump/a.raw, none/잡담.wav (none = 명령이 나오면 안 됨)
+  또는 <corpus>/labels.tsv      "상대 경로<TAB>의도 이름" 줄 (있으면 폴더 이름 대신 사용)
+처음 한 번은 전부 Vosk 로 디코딩해 TRANSCRIPT_CACHE 에 저장하고, 다음부터는 모델/인식 설정이 같으면
+NLP(카탈로그, normalize_korean, 점수화)만 다시 돈다 → 수천 개도 몇 초.
+  EVAL_CATALOG=x.json  다른 카탈로그로 평가
+  EVAL_REFRESH=1     캐시 무시하고 다시 디코딩(결과는 캐시에 덮어씀)
+  EVAL_SHOW=20       틀린 파일 몇 개까지 출력
+  EVAL_JSON=out.json 결과 저장(파일별 예측 포함) → 두 번 돌려 diff
+예측 = 파일의 확정 결과를 순서대로 점수화해 처음 MIN_SCORE 를 넘은 의도(디바운스 없음).
+"""
+import os
+import sys
+import json
+import time
+from collections import Counter
+
+from voice_nlp import load_catalog, score_hypotheses, best_intent, result_hypotheses, MIN_SCORE, CATALOG_PATH
+from transcript_cache import CachedTranscriber, read_pcm
+
+VOSK_MODEL_DIR = os.environ.get("VOSK_MODEL_DIR", "/models/vosk-ko")
+ASR_MAX_ALT    = int(os.environ.get("ASR_MAX_ALT", "5"))
+ASR_ALT_TEMP   = float(os.environ.get("ASR_ALT_TEMP", "1.0"))
+EVAL_CATALOG   = os.environ.get("EVAL_CATALOG", CATALOG_PATH)   # 다른 카탈로그 파일과 비교할 때
+EVAL_REFRESH   = os.environ.get("EVAL_REFRESH", "0") in ("1", "true")
+EVAL_SHOW      = int(os.environ.get("EVAL_SHOW", "20"))
+NONE = "none"
+_AUDIO = (".wav", ".raw")
+
+
+def load_corpus(root):
+    """[(상대 경로, 기대 의도)]"""
+    labels = os.path.join(root, "labels.tsv")
+    items = []
+    if os.path.exists(labels):
+        with open(labels, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                rel, _, want = line.partition("\t")
+                items.append((rel.strip(), want.strip() or NONE))
+        return items
+    for d in sorted(os.listdir(root)):
+        sub = os.path.join(root, d)
+        if not os.path.isdir(sub):
+            continue
+        for dirpath, _, files in os.walk(sub):
+            for name in sorted(files):
+                if name.lower().endswith(_AUDIO):
+                    items.append((os.path.relpath(os.path.join(dirpath, name), root), d))
+    return items
+
+
+def predict(events, tables, alt_temp=ASR_ALT_TEMP, min_score=MIN_SCORE):
+    """이벤트 목록 → (의도 이름 | none, 점수, 근거 문장)"""
+    for kind, _, payload in events:
+        if kind != "f":
+            continue
+        hyps = result_hypotheses(payload, alt_temp)
+        if not hyps:
+            continue
+        scores, _ = score_hypotheses(hyps, tables)
+        intent, score = best_intent(scores, tables, min_score)
+        if intent is not None:
+            return intent.name, score, hyps[0][0]
+    finals = [e for e in events if e[0] == "f"]
+    last = result_hypotheses(finals[-1][2], alt_temp) if finals else []
+    return NONE, 0.0, last[0][0] if last else ""
+
+
+def main():
+    root = sys.argv[1] if len(sys.argv) > 1 else os.environ.get("EVAL_CORPUS", "")
+    if not root or not os.path.isdir(root):
+        print(__doc__)
+        raise SystemExit(2)
+    items = load_corpus(root)
+    if not items:
+        print(f"[ERR] 녹음이 없습니다: {root}", file=sys.stderr)
+        raise SystemExit(2)
+    tables = load_catalog(EVAL_CATALOG)
+    known = set(tables.by_name) | {NONE}
+    tr = CachedTranscriber(VOSK_MODEL_DIR, max_alt=ASR_MAX_ALT, refresh=EVAL_REFRESH)
+    print(f"[INFO] {len(items)} files, asr key {tr.key} (cache {tr.cache.path or 'off'})")
+
+    t0 = time.perf_counter()
+    read_s = nlp_s = 0.0
+    rows, confusion = [], Counter()
+    per = {}                        # 의도 → [맞음, 전체]
+    try:
+        for i, (rel, want) in enumerate(items):
+            if want not in known:
+                print(f"[WARN] 카탈로그에 없는 의도 '{want}': {rel}")
+            t1 = time.perf_counter()
+            try:
+                pcm = read_pcm(os.path.join(root, rel))
+            except (OSError, ValueError, EOFError) as e:
+                print(f"[WARN] {rel}: {e}")
+                continue
+            read_s += time.perf_counter() - t1
+            events, hit = tr.transcribe(pcm)
+            t2 = time.perf_counter()
+            got, score, text = predict(events, tables)
+            nlp_s += time.perf_counter() - t2
+            ok = got == want
+            st = per.setdefault(want, [0, 0])
+            st[0] += ok
+            st[1] += 1
+            if not ok:
+                confusion[(want, got)] += 1
+            rows.append({"file": rel, "want": want, "got": got, "ok": ok, "score": round(score, 2),
+                         "text": text, "cached": hit})
+            if not hit and tr.decoded % 100 == 0:
+                print(f"[INFO] decoded {tr.decoded} ({i + 1}/{len(items)}), {tr.decode_s:.0f}s")
+    finally:
+        cst = tr.cache.stats()
+        tr.close()
+    wall = time.perf_counter() - t0
+
+    n = len(rows)
+    correct = sum(r["ok"] for r in rows)
+    print("----- 틀린 파일 -----")
+    for r in [r for r in rows if not r["ok"]][:EVAL_SHOW]:
+        print(f"[MISS] {r['file']:<32} want={r['want']:<12} got={r['got']:<12} '{r['text']}' ({r['score']})")
+    print("----- 의도별 -----")
+    for name, (c, t) in sorted(per.items()):
+        print(f"[EVAL] {name:<14} {c}/{t} ({c * 100.0 / t:.1f}%)")
+    for (want, got), c in confusion.most_common(10):
+        print(f"[CONF] {want} → {got}: {c}")
+    print(f"[EVAL] accuracy {correct}/{n} ({correct * 100.0 / max(1, n):.2f}%)  "
+          f"cache hit {cst['hits']}/{cst['hits'] + cst['misses']}  decode {tr.decoded} files {tr.decode_s:.1f}s  "
+          f"read {read_s:.2f}s  nlp {nlp_s:.2f}s  total {wall:.2f}s")
+    out = os.environ.get("EVAL_JSON")
+    if out:
+        with open(out, "w") as f:
+            json.dump({"accuracy": correct / max(1, n), "n": n, "asr_key": tr.key, "per_intent": per,
+                       "confusion": [[w, g, c] for (w, g), c in confusion.most_common()], "files": rows},
+                      f, indent=2, ensure_ascii=False)
+        print(f"[INFO] wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
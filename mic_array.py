@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+다채널 마이크 어레이 전처리 (ASR 앞단)
+- array_geometry : "linear:4:0.035" / "circular:6:0.0463" / "x,y;x,y;..." → 마이크 좌표(m)
+- DelayAndSumBeamformer : 주파수 영역 지연-합 빔포머. 말소리가 큰 프레임에서 SRP-PHAT 로
+  화자 방향을 추적하고 그쪽으로 조향한 mono 16bit 를 돌려준다(청크 간 상태 유지).
+- gcc_phat_doa : 버퍼에 모아 둔 발화 구간의 화자 방향(GCC-PHAT, 마이크 쌍 전체를 한 번에)
+- synth_array : 방향/지연을 아는 합성 다채널 신호(벤치마크·시험용)
+NumPy 필요. 청크마다 프레임을 한꺼번에 FFT/einsum 으로 처리해 파이썬 루프를 두지 않는다.
+"""
+import os
+import sys
+import math
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SOUND_SPEED = 343.0
+MIC_GEOMETRY = os.environ.get("MIC_GEOMETRY", "")        # 비우면 linear:<채널수>:0.04
+BEAM_AZIMUTH = os.environ.get("BEAM_AZIMUTH", "")        # 각도(도) 고정 조향, 비우면 자동 추적
+MIC_FRONT_DEG = float(os.environ.get("MIC_FRONT_DEG", "90"))   # 어레이 좌표에서 로봇 정면 방향(도)
+
+def _need_numpy():
+    if np is None:
+        print("[ERR] pip install numpy  (다채널 빔포밍에 필요)", file=sys.stderr)
+        sys.exit(2)
+
+def array_geometry(spec: str, channels: int = None):
+    """
+    "linear:4:0.035"    : 간격 3.5cm 일렬 4개(가운데 원점, x축)
+    "circular:6:0.0463" : 반지름 4.63cm 원형 6개
+    "0,0;0.05,0;..."     : 직접 좌표(m)
+    → (좌표 리스트 [(x, y)], 일렬 여부)
+    """
+    spec = (spec or "").strip()
+    if not spec:
+        spec = f"linear:{channels or 2}:0.04"
+    kind, _, rest = spec.partition(":")
+    if kind in ("linear", "circular"):
+        n_s, _, d_s = rest.partition(":")
+        n = int(n_s)
+        d = float(d_s) if d_s else 0.04
+        if kind == "linear":
+            pos = [((i - (n - 1) / 2.0) * d, 0.0) for i in range(n)]
+        else:
+            pos = [(d * math.cos(2 * math.pi * i / n), d * math.sin(2 * math.pi * i / n)) for i in range(n)]
+    else:
+        pos = [tuple(float(v) for v in p.split(",")) for p in spec.split(";") if p.strip()]
+    if channels and len(pos) != channels:
+        raise ValueError(f"mic geometry has {len(pos)} mics but capture has {channels} channels")
+    linear = all(abs(y) < 1e-9 for _, y in pos)
+    return pos, linear
+
+def steering_delays(positions, azimuths_deg):
+    """방향별 마이크 도달 시간차 τ[d, m] (원점 대비, +면 먼저 도달)."""
+    p = np.asarray(positions, dtype=np.float64)
+    a = np.radians(np.asarray(azimuths_deg, dtype=np.float64))
+    u = np.stack([np.cos(a), np.sin(a)], axis=1)
+    return (u @ p.T) / SOUND_SPEED
+
+
+class DelayAndSumBeamformer:
+    """
+    positions : 마이크 좌표(m), 채널 순서와 같아야 함
+    frame     : STFT 길이(샘플). hop=frame/2, sqrt-Hann 분석/합성 창(완전 재구성)
+    azimuth   : 고정 조향 각도(도). None 이면 SRP-PHAT 로 추적
+    process(pcm) 는 들어온 것과 같은 길이의 mono 를 돌려준다(지연 frame 샘플).
+    """
+
+    def __init__(self, positions, rate=16000, frame=512, azimuth=None, step_deg=None,
+                 band=(300.0, 4000.0), decay=0.97, ratio=2.0, linear=None, keep_sec=3.0,
+                 front_deg=MIC_FRONT_DEG):
+        _need_numpy()
+        self.positions = [tuple(p) for p in positions]
+        self.m = len(self.positions)
+        self.rate = rate
+        self.frame = frame
+        self.hop = frame // 2
+        if linear is None:
+            linear = all(abs(p[1]) < 1e-9 for p in self.positions)
+        # 일렬 배열은 앞/뒤 구분이 안 되므로 0~180도만
+        if step_deg is None:
+            step_deg = 5.0 if linear else 10.0
+        span = 180.0 if linear else 360.0
+        n_dir = int(round(span / step_deg)) + (1 if linear else 0)
+        self.azimuths = np.arange(n_dir) * step_deg
+        n = np.arange(frame)
+        self.win = np.sqrt(0.5 - 0.5 * np.cos(2 * np.pi * n / frame)).astype(np.float32)
+        freqs = np.fft.rfftfreq(frame, 1.0 / rate)
+        tau = steering_delays(self.positions, self.azimuths)                       # (D, M)
+        self.weights = (np.exp(-2j * np.pi * tau[:, :, None] * freqs[None, None, :]) / self.m
+                        ).astype(np.complex64)                                     # (D, M, F)
+        self._band = np.nonzero((freqs >= band[0]) & (freqs <= band[1]))[0]
+        self._wband = np.ascontiguousarray(self.weights[:, :, self._band])
+        self.linear = linear
+        self.band = band
+        self.front_deg = front_deg
+        self.keep = int(rate * keep_sec)       # 방향 추정용 원본 다채널 링버퍼
+        self.decay = decay
+        self.ratio = ratio
+        self.track = azimuth is None
+        self._dir = 0 if azimuth is None else int(np.argmin(np.abs(self.azimuths - float(azimuth) % (span + 1e-9))))
+        self.reset()
+        # 통계
+        self.chunks = 0
+        self.frames = 0
+        self.busy = 0.0
+
+    def reset(self):
+        self._in = np.zeros((self.m, self.frame - self.hop), dtype=np.float32)
+        self._ola = np.zeros(self.hop, dtype=np.float32)
+        self._out = np.zeros(self.hop, dtype=np.float32)
+        self._srp = np.zeros(len(self.azimuths), dtype=np.float64)
+        self._noise = None
+        self._psd = None
+        self._ring = np.zeros((self.m, self.keep), dtype=np.float32)
+        self._ring_w = 0
+        self._ring_n = 0
+
+    @property
+    def azimuth(self) -> float:
+        """현재 조향 각도(도)."""
+        return float(self.azimuths[self._dir])
+
+    def describe(self):
+        mode = "track" if self.track else f"fixed {self.azimuth:.0f}deg"
+        return f"beamformer: {self.m}ch delay-and-sum, frame={self.frame}, {mode}"
+
+    # ---------- 스트림 ----------
+    def process(self, pcm: bytes) -> bytes:
+        """인터리브 int16 M채널 → 조향된 int16 mono (같은 샘플 수)."""
+        x = np.frombuffer(pcm, dtype="<i2")
+        n = len(x) // self.m
+        if n == 0:
+            return b""
+        x = x[: n * self.m].reshape(n, self.m).T.astype(np.float32)
+        y = self.process_float(x)
+        return np.clip(np.rint(y), -32768, 32767).astype("<i2").tobytes()
+
+    def process_float(self, x):
+        """(M, n) float → (n,) float. 프레임을 모아 한 번에 FFT → 조향 합 → 역FFT/중첩합."""
+        t0 = time.perf_counter()
+        self._remember(x)
+        buf = np.concatenate([self._in, x], axis=1) if self._in.shape[1] else x
+        L = buf.shape[1]
+        k = (L - self.frame) // self.hop + 1 if L >= self.frame else 0
+        if k > 0:
+            idx = np.arange(k)[:, None] * self.hop + np.arange(self.frame)[None, :]
+            X = np.fft.rfft(buf[:, idx] * self.win, axis=-1)                    # (M, k, F)
+            if self.track:
+                self._update_doa(X)
+            Y = np.einsum("mf,mkf->kf", self.weights[self._dir], X)
+            yk = np.fft.irfft(Y, n=self.frame, axis=-1).astype(np.float32) * self.win
+            ola = np.zeros((k + 1) * self.hop, dtype=np.float32)
+            ola[: self.hop] = self._ola
+            ola[: k * self.hop] += yk[:, : self.hop].reshape(-1)
+            ola[self.hop:] += yk[:, self.hop:].reshape(-1)
+            self._out = np.concatenate([self._out, ola[: k * self.hop]])
+            self._ola = ola[k * self.hop:]
+            buf = buf[:, k * self.hop:]
+            self.frames += k
+        self._in = np.ascontiguousarray(buf)
+        n = x.shape[1]
+        y, self._out = self._out[:n], self._out[n:]
+        self.chunks += 1
+        self.busy += time.perf_counter() - t0
+        return y
+
+    def _update_doa(self, X):
+        """
+        큰 프레임만 SRP-PHAT 맵에 누적(잡음/무음으로는 방향을 바꾸지 않음).
+        조용한 프레임으로 잡음 스펙트럼을 추정해, 말소리가 잡음보다 큰 주파수 칸만 가중한다
+        (PHAT 백색화만 하면 넓은 대역 잡음원 쪽으로 끌려간다).
+        """
+        Xb = X[:, :, self._band]
+        pw = (Xb.real ** 2 + Xb.imag ** 2).mean(axis=0)                          # (k, F)
+        e = pw.sum(axis=1)                                                       # (k,)
+        if self._noise is None:
+            self._noise = float(np.median(e)) + 1e-9
+            self._psd = np.median(pw, axis=0) + 1e-9
+        loud = e > self._noise * self.ratio
+        quiet = ~loud
+        if quiet.any():
+            self._noise = 0.9 * self._noise + 0.1 * float(e[quiet].mean())
+            self._psd = 0.9 * self._psd + 0.1 * pw[quiet].mean(axis=0)
+        self._srp *= self.decay ** X.shape[1]
+        if not loud.any():
+            return
+        Xn = Xb[:, loud, :]
+        Xn = Xn / (np.abs(Xn) + 1e-9)
+        mask = np.clip(1.0 - 2.0 * self._psd / (pw[loud] + 1e-9), 0.0, 1.0)       # (k', F)
+        P = np.abs(np.einsum("dmf,mkf->dkf", self._wband, Xn)) ** 2              # (D, k', F)
+        P = (P * mask).sum(axis=2)
+        P /= P.sum(axis=0, keepdims=True) + 1e-12
+        self._srp += P.sum(axis=1)
+        self._dir = int(np.argmax(self._srp))
+
+    def _remember(self, x):
+        n = min(x.shape[1], self.keep)
+        w = self._ring_w
+        first = min(n, self.keep - w)
+        self._ring[:, w:w + first] = x[:, x.shape[1] - n:x.shape[1] - n + first]
+        if first < n:
+            self._ring[:, : n - first] = x[:, x.shape[1] - n + first:]
+        self._ring_w = (w + n) % self.keep
+        self._ring_n = min(self.keep, self._ring_n + n)
+
+    def recent(self, sec=None):
+        """최근 sec 초 원본 다채널 (M, n)."""
+        n = self._ring_n if sec is None else min(self._ring_n, int(sec * self.rate))
+        idx = (self._ring_w - n + np.arange(n)) % self.keep
+        return self._ring[:, idx]
+
+    def bearing(self, sec=None):
+        """
+        방금 끝난 발화(링버퍼의 최근 구간)의 화자 방향 → (로봇 정면 기준 각도, 신뢰도, 소요 ms)
+        각도는 +가 왼쪽(반시계), 일렬 배열은 -90~+90 만 구분된다.
+        """
+        t0 = time.perf_counter()
+        az, conf = gcc_phat_doa(self.recent(sec), self.positions, self.rate, linear=self.linear, band=self.band)
+        rel = (az - self.front_deg + 180.0) % 360.0 - 180.0
+        return rel, conf, (time.perf_counter() - t0) * 1000.0
+
+    def stats(self) -> dict:
+        audio_s = self.chunks and (self.frames * self.hop / self.rate)
+        return {"chunks": self.chunks, "frames": self.frames, "busy_s": round(self.busy, 4),
+                "rtf": round(self.busy / audio_s, 4) if audio_s else None, "azimuth": self.azimuth}
+
+
+def gcc_phat_doa(x, positions, rate=16000, frame=512, up=8, step_deg=1.0, linear=None,
+                 band=(300.0, 4000.0), ratio=2.0):
+    """
+    x: (M, n) 다채널 발화 구간 → (방위각(도, 어레이 좌표), 신뢰도)
+    - 프레임별 FFT → 말소리 프레임(잡음 바닥의 ratio 배 이상)만 골라 마이크 쌍 교차 스펙트럼을 평균
+    - PHAT 정규화 후 역FFT(up 배 보간)로 쌍마다 GCC 를 구하고, 방향 격자별 기대 지연 위치의 값을 합산
+    모든 쌍/방향을 배열 연산 한 번씩으로 처리한다. 신뢰도 = 최고점 / 평균(1 이면 방향성 없음).
+    """
+    _need_numpy()
+    m, n = x.shape
+    if linear is None:
+        linear = all(abs(p[1]) < 1e-9 for p in positions)
+    span = 180.0 if linear else 360.0
+    az = np.arange(int(round(span / step_deg)) + (1 if linear else 0)) * step_deg
+    if n < frame or m < 2:
+        return float(az[len(az) // 2]), 0.0
+    hop = frame // 2
+    k = (n - frame) // hop + 1
+    idx = np.arange(k)[:, None] * hop + np.arange(frame)[None, :]
+    win = np.hanning(frame).astype(np.float32)
+    X = np.fft.rfft(x[:, idx] * win, axis=-1)                                   # (M, k, F)
+    freqs = np.fft.rfftfreq(frame, 1.0 / rate)
+    e = (X.real ** 2 + X.imag ** 2).sum(axis=(0, 2))
+    floor = np.percentile(e, 20) + 1e-9
+    sel = e > floor * ratio
+    if not sel.any():
+        sel = e >= np.median(e)
+    I, J = np.triu_indices(m, 1)
+    fb = np.nonzero((freqs >= band[0]) & (freqs <= band[1]))[0]
+    Xs = X[:, sel][:, :, fb]                                                    # 말소리 프레임 × 대역만
+    C = np.einsum("ikf,jkf->ijf", Xs, np.conj(Xs))                              # (M, M, F') 교차 스펙트럼
+    G = np.zeros((len(I), X.shape[2]), dtype=C.dtype)
+    G[:, fb] = C[I, J] / (np.abs(C[I, J]) + 1e-12)                              # PHAT
+    N = frame * up
+    cc = np.fft.irfft(G, n=N, axis=-1)                                          # (P, N)
+    tau = steering_delays(positions, az)                                       # (D, M)
+    lag = np.rint(-(tau[:, I] - tau[:, J]) * rate * up).astype(np.int64) % N    # (D, P)
+    score = cc[np.arange(len(I))[None, :], lag].sum(axis=1)                     # (D,)
+    best = int(np.argmax(score))
+    conf = float(score[best] / (np.abs(score).mean() + 1e-12))
+    return float(az[best]), conf
+
+def beamformer_from_env(channels: int, rate: int = 16000):
+    """MIC_GEOMETRY / BEAM_AZIMUTH 환경변수 기준. 1채널이면 None."""
+    if channels <= 1:
+        return None
+    pos, linear = array_geometry(MIC_GEOMETRY, channels)
+    az = float(BEAM_AZIMUTH) if BEAM_AZIMUTH else None
+    return DelayAndSumBeamformer(pos, rate, azimuth=az, linear=linear)
+
+# ===== 합성 신호 =====
+def _shift(sig, tau, rate):
+    """분수 지연: τ 초 먼저 도착(원형 FFT 위상 이동)."""
+    n = len(sig)
+    f = np.fft.rfftfreq(n, 1.0 / rate)
+    return np.fft.irfft(np.fft.rfft(sig) * np.exp(2j * np.pi * f * tau), n=n)
+
+def speech_like(rate, dur, seed=0):
+    """말소리 비슷한 신호: 흔들리는 f0 의 고조파 + 음절(4Hz) 포락선 + 쉼."""
+    rng = np.random.default_rng(seed)
+    n = int(rate * dur)
+    t = np.arange(n) / rate
+    f0 = 150.0 + 40.0 * np.sin(2 * np.pi * 0.7 * t) + 10.0 * rng.standard_normal(n).cumsum() / math.sqrt(n)
+    phase = 2 * np.pi * np.cumsum(f0) / rate
+    s = np.zeros(n)
+    for h in range(1, 26):
+        if 150.0 * h > 4000.0:
+            break
+        s += np.sin(h * phase) / h
+    env = np.clip(np.sin(2 * np.pi * 4.0 * t), 0, None) * (np.sin(2 * np.pi * 0.3 * t) > -0.3)
+    return s * env
+
+def synth_array(positions, rate=16000, dur=5.0, src_az=60.0, interf_az=150.0,
+                snr_db=0.0, diffuse_db=-15.0, seed=0):
+    """
+    → (clean (M, n), noise (M, n))  int16 스케일 float
+    src_az 방향 말소리 + interf_az 방향 간섭 잡음(점음원) + 마이크별 독립 잡음.
+    snr_db : 말소리 대 간섭 잡음, diffuse_db : 독립 잡음의 말소리 대비 레벨(0번 마이크 기준).
+    """
+    _need_numpy()
+    rng = np.random.default_rng(seed + 1)
+    s = speech_like(rate, dur, seed)
+    s *= 3000.0 / (np.sqrt(np.mean(s ** 2)) + 1e-9)
+    p_s = np.mean(s ** 2)
+    n = len(s)
+    tau_s = steering_delays(positions, [src_az])[0]
+    clean = np.stack([_shift(s, t, rate) for t in tau_s])
+    noise = np.zeros_like(clean)
+    if interf_az is not None:
+        v = rng.standard_normal(n)
+        v *= math.sqrt(p_s * 10 ** (-snr_db / 10.0) / np.mean(v ** 2))
+        tau_i = steering_delays(positions, [interf_az])[0]
+        noise += np.stack([_shift(v, t, rate) for t in tau_i])
+    if diffuse_db is not None:
+        d = rng.standard_normal(clean.shape)
+        noise += d * math.sqrt(p_s * 10 ** (diffuse_db / 10.0))
+    return clean, noise
+
+def snr_db(sig, noise) -> float:
+    return 10.0 * math.log10((np.mean(np.square(sig)) + 1e-12) / (np.mean(np.square(noise)) + 1e-12))
+
+def to_interleaved_pcm(x) -> bytes:
+    """(M, n) float → 인터리브 int16 bytes (RawFileSource/arecord 와 같은 배치)."""
+    return np.clip(np.rint(x.T), -32768, 32767).astype("<i2").tobytes()
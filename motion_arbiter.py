@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+동작 중재기(arbiter): go2_action_server(SportClient 연결) 하나를 혼자 소유하고
+음성/원격조종(teleop)/데모 스크립트 등 여러 클라이언트의 명령을 한 줄로 세운다.
+  python3 motion_arbiter.py                         # ARBITER_ADDR=unix:/tmp/go2arbiter.sock
+  ARBITER_ADDR=unix:/tmp/go2arbiter.sock python3 voice_agent.py    # 음성은 중재기를 거쳐 전송
+프로토콜: 소켓 연결 하나에 JSON 한 줄씩(명령마다 프로세스를 띄우지 않음)
+  {"hello":"joy","class":"teleop"}             이름/우선순위 등급(ARBITER_CLASSES 순서, 앞이 높음)
+  {"action":"sit","id":7}                      → {"id":7,"ok":true,"action":"sit","queue_ms":..,"exec_ms":..}
+  {"batch":[...]} / [{...},{...}]              서버 배치 그대로
+  {"lease":5}  {"release":true}  {"stats":true}
+규칙
+- stop 은 줄을 서지 않고 바로 서버로 보낸다. 대기 중인 명령은 모두 취소("preempted")
+- 등급이 높은 클라이언트 명령이 먼저(엄격 우선순위), 같은 등급끼리는 클라이언트별 번갈아(round-robin)
+- 제어 임대(lease): 임대 중에는 다른 클라이언트 명령을 거절("leased"). 더 높은 등급이 요청하면 빼앗고
+  이전 보유자에게 {"event":"lease_lost"}. 최대 ARBITER_LEASE_MAX 초, 끊기면 해제
+- move 는 최신 값만 의미가 있으므로 같은 클라이언트의 대기 중 move 를 새 것으로 교체("superseded")
+- 움직이던 클라이언트가 끊기면 정지(move 0)
+- ARBITER_ROS="teleop:/teleop/cmd_vel,voice:/voice/cmd_vel" : ROS Twist 토픽을 등급별 클라이언트로 받아 move 로 전달,
+  받는 동안 ARBITER_ROS_LEASE 초 임대를 갱신(조이스틱을 놓으면 곧 풀림)
+클라이언트별 대기/실행 지연(p50/p95)과 거절/취소 수는 {"stats":true} 와 [ARB] 로그(ARBITER_REPORT_SEC)로 본다.
+"""
+import os
+import json
+import math
+import time
+import socket
+import asyncio
+import threading
+from collections import deque
+
+from motion_backends import ActionServerBackend, BIN_DIR, sdk_env
+
+ARBITER_ADDR         = os.environ.get("ARBITER_ADDR", "unix:/tmp/go2arbiter.sock")
+ARBITER_CLASSES      = [c.strip() for c in os.environ.get("ARBITER_CLASSES", "teleop,voice,script").split(",")
+                        if c.strip()]
+ARBITER_QUEUE        = int(os.environ.get("ARBITER_QUEUE", "8"))            # 클라이언트별 대기 명령 상한
+ARBITER_LEASE_MAX    = float(os.environ.get("ARBITER_LEASE_MAX", "30"))
+ARBITER_EXEC_TIMEOUT = float(os.environ.get("ARBITER_EXEC_TIMEOUT", "5"))
+ARBITER_REPORT_SEC   = float(os.environ.get("ARBITER_REPORT_SEC", "60"))
+ARBITER_ROS          = os.environ.get("ARBITER_ROS", "")
+ARBITER_ROS_LEASE    = float(os.environ.get("ARBITER_ROS_LEASE", "1.0"))
+ARBITER_SERVER_BIN   = os.environ.get("ARBITER_SERVER_BIN", os.path.join(BIN_DIR, "go2_action_server"))
+GO2_IFACE            = os.environ.get("GO2_IFACE", "eth0")
+ARBITER_SUDO         = os.environ.get("ARBITER_SUDO", "1") in ("1", "true")   # 시뮬레이션 서버면 0
+
+
+def _pct(vals, q):
+    if not vals:
+        return None
+    v = sorted(vals)
+    return round(v[min(len(v) - 1, int(len(v) * q))], 1)
+
+
+def _is_moving(req):
+    return req.get("action") == "move" and any(abs(float(req.get(k) or 0.0)) > 1e-6 for k in ("vx", "vy", "vyaw"))
+
+
+class _Item:
+    __slots__ = ("client", "req", "cid", "t_in", "fut")
+
+    def __init__(self, client, req, cid, fut):
+        self.client = client
+        self.req = req
+        self.cid = cid                # 클라이언트가 붙인 id(응답에 그대로)
+        self.t_in = time.monotonic()
+        self.fut = fut
+
+
+class Client:
+    """연결 하나(또는 ROS 토픽 하나). send(dict) 로 알림/응답을 돌려준다."""
+
+    def __init__(self, name, cls, send):
+        self.name = name
+        self.cls = cls
+        self.send = send
+        self.queue = deque()
+        self.counts = {"requests": 0, "done": 0, "failed": 0, "rejected": 0, "preempted": 0, "superseded": 0}
+        self.queue_ms = deque(maxlen=500)
+        self.exec_ms = deque(maxlen=500)
+        self.total_ms = deque(maxlen=500)
+        self.lease_s = 0.0
+
+    def stats(self) -> dict:
+        return dict(self.counts, cls=self.cls, queued=len(self.queue), lease_s=round(self.lease_s, 1),
+                    queue_ms_p50=_pct(self.queue_ms, 0.5), queue_ms_p95=_pct(self.queue_ms, 0.95),
+                    exec_ms_p50=_pct(self.exec_ms, 0.5), exec_ms_p95=_pct(self.exec_ms, 0.95),
+                    total_ms_p95=_pct(self.total_ms, 0.95))
+
+
+class Arbiter:
+    """스케줄러 + 임대 관리. 모든 메서드는 이벤트 루프 스레드에서 호출."""
+
+    def __init__(self, backend, classes=ARBITER_CLASSES, queue_max=ARBITER_QUEUE,
+                 lease_max=ARBITER_LEASE_MAX, exec_timeout=ARBITER_EXEC_TIMEOUT):
+        self.backend = backend
+        self.rank = {c: i for i, c in enumerate(classes)}
+        self.queue_max = queue_max
+        self.lease_max = lease_max
+        self.exec_timeout = exec_timeout
+        self.clients = {}
+        self.gone = {}                # 끊긴 클라이언트의 마지막 통계
+        self._rr = {}                 # 등급 → 클라이언트 이름 순환 목록
+        self.lease = None             # (클라이언트 이름, 만료 monotonic, 시작)
+        self._pending = {}            # 서버 요청 id → future
+        self._seq = 0
+        self._wake = None
+        self._loop = None
+        self.moving_by = None         # 마지막으로 0 이 아닌 move 를 실행한 클라이언트
+        self.stops = 0
+
+    # ---------- 연결 ----------
+    def add_client(self, name, cls, send):
+        base, n = name, 1
+        while name in self.clients:
+            n += 1
+            name = f"{base}#{n}"
+        if cls not in self.rank:
+            cls = list(self.rank)[-1]
+        c = Client(name, cls, send)
+        self.clients[name] = c
+        self._rr.setdefault(cls, deque()).append(name)
+        return c
+
+    def remove_client(self, c):
+        self._flush(c, "disconnected")
+        if self.lease and self.lease[0] == c.name:
+            self._end_lease()
+        self.clients.pop(c.name, None)
+        rr = self._rr.get(c.cls)
+        if rr and c.name in rr:
+            rr.remove(c.name)
+        self.gone[c.name] = c.stats()
+        if self.moving_by == c.name:
+            # 움직이던 클라이언트가 사라짐 → 그 자리에 세운다
+            self.moving_by = None
+            self._send_now({"action": "move", "vx": 0.0, "vy": 0.0, "vyaw": 0.0})
+            print(f"[ARB] {c.name} 끊김(이동 중) → 정지")
+
+    # ---------- 임대 ----------
+    def _lease_holder(self):
+        if self.lease and time.monotonic() >= self.lease[1]:
+            self._end_lease()
+        return self.lease[0] if self.lease else None
+
+    def _end_lease(self):
+        name, _, t0 = self.lease
+        self.lease = None
+        c = self.clients.get(name)
+        if c is not None:
+            c.lease_s += time.monotonic() - t0
+
+    def request_lease(self, c, sec):
+        holder = self._lease_holder()
+        sec = max(0.1, min(float(sec), self.lease_max))
+        now = time.monotonic()
+        if holder is not None and holder != c.name:
+            h = self.clients.get(holder)
+            if h is not None and self.rank[h.cls] <= self.rank[c.cls]:
+                return {"ok": False, "error": "leased", "holder": holder,
+                        "left_s": round(self.lease[1] - now, 2)}
+            self._end_lease()
+            if h is not None:
+                h.send({"event": "lease_lost", "by": c.name})
+                self._flush(h, "preempted")
+        if self.lease and self.lease[0] == c.name:
+            self.lease = (c.name, now + sec, self.lease[2])
+        else:
+            self.lease = (c.name, now + sec, now)
+            # 임대 전부터 기다리던 다른 클라이언트 명령은 취소
+            for other in self.clients.values():
+                if other is not c:
+                    self._flush(other, "preempted")
+        return {"ok": True, "lease": round(sec, 2)}
+
+    def release(self, c):
+        if self.lease and self.lease[0] == c.name:
+            self._end_lease()
+        return {"ok": True, "lease": 0}
+
+    # ---------- 명령 ----------
+    def submit(self, c, req, cid=None):
+        """→ future(응답 dict). stop 은 바로 보내고, 나머지는 대기열로."""
+        c.counts["requests"] += 1
+        fut = self._loop.create_future()
+        act = req.get("action")
+        if act in ("quit", "exit"):
+            return self._reject(c, fut, cid, "not allowed")
+        if act == "stop":
+            self.stops += 1
+            for other in self.clients.values():
+                self._flush(other, "preempted")
+            self._execute_now(_Item(c, req, cid, fut))
+            return fut
+        holder = self._lease_holder()
+        if holder is not None and holder != c.name:
+            return self._reject(c, fut, cid, "leased", holder=holder)
+        if act == "move" and c.queue and c.queue[-1].req.get("action") == "move":
+            old = c.queue.pop()
+            c.counts["superseded"] += 1
+            self._finish(old, {"ok": False, "error": "superseded"}, count=False)
+        if len(c.queue) >= self.queue_max:
+            return self._reject(c, fut, cid, "busy")
+        c.queue.append(_Item(c, req, cid, fut))
+        self._wake.set()
+        return fut
+
+    def _reject(self, c, fut, cid, why, **kw):
+        c.counts["rejected"] += 1
+        fut.set_result(dict({"ok": False, "error": why}, **({"id": cid} if cid is not None else {}), **kw))
+        return fut
+
+    def _flush(self, c, why):
+        while c.queue:
+            it = c.queue.popleft()
+            c.counts["preempted" if why == "preempted" else "failed"] += 1
+            self._finish(it, {"ok": False, "error": why}, count=False)
+
+    def _finish(self, it, res, count=True, t_send=None):
+        now = time.monotonic()
+        c = it.client
+        res = dict(res)
+        if it.cid is not None:
+            res["id"] = it.cid
+        if t_send is not None:
+            q, e = (t_send - it.t_in) * 1000.0, (now - t_send) * 1000.0
+            res["queue_ms"], res["exec_ms"] = round(q, 1), round(e, 1)
+            c.queue_ms.append(q)
+            c.exec_ms.append(e)
+            c.total_ms.append(q + e)
+        if count:
+            c.counts["done" if res.get("ok") else "failed"] += 1
+        if not it.fut.done():
+            it.fut.set_result(res)
+
+    def _pick(self):
+        """가장 높은 등급에서 대기 중인 클라이언트를 돌아가며 하나"""
+        for cls in sorted(self._rr, key=lambda k: self.rank[k]):
+            rr = self._rr[cls]
+            for _ in range(len(rr)):
+                name = rr[0]
+                rr.rotate(-1)
+                c = self.clients.get(name)
+                if c is not None and c.queue:
+                    return c.queue.popleft()
+        return None
+
+    def _send_now(self, req):
+        """→ (서버 요청 id, 응답 future)"""
+        self._seq += 1
+        rid = self._seq
+        fut = self._loop.create_future()
+        self._pending[rid] = fut
+        if self.backend.sup is None or not self.backend.sup.send(json.dumps(dict(req, id=rid), ensure_ascii=False)):
+            self._pending.pop(rid, None)
+            fut.set_result({"ok": False, "error": "server down"})
+        return rid, fut
+
+    async def _exec(self, it):
+        t_send = time.monotonic()
+        rid, fut = self._send_now(it.req)
+        try:
+            raw = await asyncio.wait_for(fut, self.exec_timeout)
+        except asyncio.TimeoutError:
+            # 서버가 멈췄거나 재시작됨: 늦은 응답은 버리고 id 도 지운다
+            self._pending.pop(rid, None)
+            raw = {"ok": False, "error": "timeout"}
+        res = {k: v for k, v in raw.items() if k != "id"}
+        if res.get("ok") and it.req.get("action") == "move":
+            self.moving_by = it.client.name if _is_moving(it.req) else None
+        elif res.get("ok") and it.req.get("action") == "stop":
+            self.moving_by = None
+        self._finish(it, res, t_send=t_send)
+
+    def _execute_now(self, it):
+        self._loop.create_task(self._exec(it))
+
+    def on_event(self, ev):
+        """MotionEvents 리스너(펌프 스레드) → 서버 응답을 기다리던 future 로"""
+        if ev.kind in ("reply", "fail") and ev.motion_id in self._pending:
+            self._loop.call_soon_threadsafe(self._resolve, ev.motion_id, ev.raw)
+
+    def _resolve(self, rid, raw):
+        fut = self._pending.pop(rid, None)
+        if fut is not None and not fut.done():
+            fut.set_result(raw)
+
+    async def run(self):
+        """대기열 → 서버. 한 번에 하나(서버가 SportClient 호출을 순서대로 처리)."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self.backend.events.add_listener(self.on_event)
+        while True:
+            self._lease_holder()
+            it = self._pick()
+            if it is None:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            await self._exec(it)
+
+    def stats(self) -> dict:
+        holder = self._lease_holder()
+        return {"lease": {"holder": holder, "left_s": round(self.lease[1] - time.monotonic(), 2)} if holder else None,
+                "stops": self.stops, "moving_by": self.moving_by,
+                "clients": {n: c.stats() for n, c in self.clients.items()}, "gone": self.gone}
+
+
+# ===== 소켓 서버 =====
+def _lease_sec(v):
+    """임대 초(숫자 또는 숫자 문자열) → float, 아니면 None"""
+    if isinstance(v, bool):
+        return None
+    try:
+        sec = float(v)
+    except (TypeError, ValueError):
+        return None
+    return sec if math.isfinite(sec) else None
+
+
+async def _handle(arb, reader, writer):
+    def send(d):
+        if not writer.is_closing():
+            writer.write((json.dumps(d, ensure_ascii=False) + "\n").encode())
+
+    c = None
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                req = json.loads(line)
+            except ValueError:
+                send({"ok": False, "error": "bad json"})
+                continue
+            if isinstance(req, list):
+                req = {"batch": req}
+            if not isinstance(req, dict):
+                send({"ok": False, "error": "bad request"})
+                continue
+            if c is None:
+                hello = req.get("hello") if isinstance(req, dict) else None
+                cls = req.get("class")
+                c = arb.add_client(str(hello or f"client{id(writer) % 10000}"),
+                                   cls if isinstance(cls, str) else "script", send)
+                print(f"[ARB] + {c.name} ({c.cls})")
+                if hello is not None:
+                    send({"ok": True, "hello": c.name, "class": c.cls})
+                    continue
+            cid = req.pop("id", None)
+            tag = {"id": cid} if cid is not None else {}
+            if "lease" in req:
+                sec = _lease_sec(req["lease"])
+                send(dict(arb.request_lease(c, sec) if sec is not None else {"ok": False, "error": "bad request"},
+                          **tag))
+            elif "release" in req:
+                send(dict(arb.release(c), **tag))
+            elif "stats" in req:
+                send(dict(arb.stats(), **tag))
+            else:
+                if "batch" in req:
+                    req.setdefault("action", "batch")
+                arb.submit(c, req, cid).add_done_callback(lambda f: send(f.result()))
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        if c is not None:
+            arb.remove_client(c)
+            print(f"[ARB] - {c.name} {json.dumps(c.stats(), ensure_ascii=False)}")
+        writer.close()
+
+
+async def _serve(arb, addr):
+    handler = lambda r, w: _handle(arb, r, w)
+    if addr.startswith("unix:"):
+        path = addr[5:]
+        if os.path.exists(path):
+            os.unlink(path)
+        server = await asyncio.start_unix_server(handler, path)
+    else:
+        host, _, port = addr.rpartition(":")
+        server = await asyncio.start_server(handler, host or "127.0.0.1", int(port))
+        path = None
+    print(f"[ARB] listening on {addr} (classes: {' > '.join(sorted(arb.rank, key=arb.rank.get))})")
+    try:
+        async with server:
+            await asyncio.Event().wait()
+    finally:
+        if path and os.path.exists(path):
+            os.unlink(path)
+
+
+async def _report(arb, every):
+    while True:
+        await asyncio.sleep(every)
+        for name, st in arb.stats()["clients"].items():
+            if st["requests"]:
+                print(f"[ARB] {name:<12} {st['cls']:<7} req={st['requests']} done={st['done']} "
+                      f"rej={st['rejected']} pre={st['preempted']} sup={st['superseded']} "
+                      f"queue p95={st['queue_ms_p95']}ms exec p95={st['exec_ms_p95']}ms")
+
+
+# ===== ROS Twist → move =====
+class RosTeleopBridge:
+    """Twist 토픽마다 클라이언트 하나. 받을 때마다 move 제출 + 임대 갱신, 0 이면 임대 해제."""
+
+    def __init__(self, arb, spec=ARBITER_ROS, lease_sec=ARBITER_ROS_LEASE):
+        from voice_ros import ros_modules
+        self.ros, _, self.Twist = ros_modules()
+        if not self.ros.ok():
+            self.ros.init()
+        self.node = self.ros.create_node("go2_arbiter")
+        self.arb = arb
+        self.lease_sec = lease_sec
+        self.topics = []
+        for part in spec.split(","):
+            cls, _, topic = part.strip().partition(":")
+            if not topic:
+                continue
+            c = arb.add_client(f"{cls}-ros", cls, lambda d: None)
+            self.node.create_subscription(self.Twist, topic, lambda msg, c=c: self._on_twist(c, msg), 10)
+            self.topics.append((topic, c.name, c.cls))
+
+    def describe(self):
+        return "ros: " + ", ".join(f"{t} → {n}({cls})" for t, n, cls in self.topics)
+
+    def _on_twist(self, c, msg):
+        req = {"action": "move", "vx": float(msg.linear.x), "vy": float(msg.linear.y), "vyaw": float(msg.angular.z)}
+        if _is_moving(req):
+            if not self.arb.request_lease(c, self.lease_sec).get("ok"):
+                c.counts["rejected"] += 1
+                return
+        self.arb.submit(c, req)
+        if not _is_moving(req):
+            self.arb.release(c)
+
+    async def spin(self):
+        while self.ros.ok():
+            self.ros.spin_once(self.node, timeout_sec=0.0)
+            await asyncio.sleep(0.005)
+
+
+# ===== 클라이언트 =====
+class ArbiterClient:
+    """
+    중재기 연결(동기 API, 응답은 읽기 스레드가 받음).
+      cl = ArbiterClient("demo", "script"); cl.call("hello"); cl.lease(10); ...
+    on_line(line): 받은 줄마다(응답/알림) 호출 — ArbiterBackend 가 MotionEvents.feed 로 연결
+    """
+
+    def __init__(self, name, cls="script", addr=ARBITER_ADDR, on_line=None, timeout=3.0):
+        self.name = name
+        self.cls = cls
+        self.addr = addr
+        self.on_line = on_line
+        self.timeout = timeout
+        self.sock = None
+        self._lock = threading.Lock()
+        self._waiting = {}            # id → [Event, 응답]
+        self._seq = 0
+        self._reader = None
+
+    def connect(self):
+        if self.addr.startswith("unix:"):
+            s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            s.connect(self.addr[5:])
+        else:
+            host, _, port = self.addr.rpartition(":")
+            s = socket.create_connection((host or "127.0.0.1", int(port)), timeout=self.timeout)
+            s.settimeout(None)
+        self.sock = s
+        self._reader = threading.Thread(target=self._read, daemon=True, name=f"arb-{self.name}")
+        self._reader.start()
+        return self.request({"hello": self.name, "class": self.cls})
+
+    def _read(self):
+        f = self.sock.makefile("r", encoding="utf-8")
+        for line in f:
+            try:
+                d = json.loads(line)
+            except ValueError:
+                continue
+            if self.on_line is not None:
+                self.on_line(line)
+            key = d.get("id", "hello" if "hello" in d else None)
+            with self._lock:
+                w = self._waiting.pop(key, None)
+            if w is not None:
+                w[1] = d
+                w[0].set()
+
+    def _next_id(self):
+        with self._lock:
+            self._seq += 1
+            return self._seq
+
+    def send(self, req) -> int:
+        """응답을 기다리지 않고 보냄 → id"""
+        rid = self._next_id()
+        self.sock.sendall((json.dumps(dict(req, id=rid), ensure_ascii=False) + "\n").encode())
+        return rid
+
+    def request(self, req, timeout=None):
+        """보내고 응답(dict) 대기. 시간 초과면 None"""
+        ev = threading.Event()
+        hello = "hello" in req
+        rid = "hello" if hello else self._next_id()
+        w = [ev, None]
+        with self._lock:
+            self._waiting[rid] = w
+        line = req if hello else dict(req, id=rid)
+        self.sock.sendall((json.dumps(line, ensure_ascii=False) + "\n").encode())
+        if not ev.wait(timeout or self.timeout):
+            with self._lock:
+                self._waiting.pop(rid, None)
+            return None
+        return w[1]
+
+    def call(self, action, timeout=None, **params):
+        return self.request(dict(action=action, **params), timeout or ARBITER_EXEC_TIMEOUT + self.timeout)
+
+    def lease(self, sec):
+        return self.request({"lease": sec})
+
+    def release(self):
+        return self.request({"release": True})
+
+    def stats(self):
+        return self.request({"stats": True})
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)     # 읽기 스레드의 makefile 도 깨운다
+            except OSError:
+                pass
+            try:
+                self.sock.close()
+            finally:
+                self.sock = None
+
+
+class ArbiterBackend(ActionServerBackend):
+    """ActionServerBackend 와 같은 쓰임새(dispatch/send_action/call/turn), 전송만 중재기 경유"""
+
+    def __init__(self, client_name="voice", cls="voice", addr=ARBITER_ADDR, **kw):
+        super().__init__(env={}, **kw)
+        self.name = f"arbiter[{client_name}]"
+        self.client = ArbiterClient(client_name, cls, addr, on_line=self.events.feed)
+
+    def start(self):
+        res = self.client.connect()
+        print(f"[INFO] arbiter {self.client.addr}: {res}")
+
+    def send_action(self, action: str, **params):
+        mark = self.events.mark()
+        self.client.send(dict(action=action, **params))
+        return mark
+
+    def send_batch(self, steps, **params):
+        mark = self.events.mark()
+        self.client.send(dict(batch=list(steps), **params))
+        return mark
+
+    def stop(self):
+        self._cancel_turn()
+        self.client.close()
+
+
+# ===== 메인 =====
+async def amain(addr=ARBITER_ADDR):
+    backend = ActionServerBackend(ARBITER_SERVER_BIN, GO2_IFACE, sudo=("sudo", "-n", "-E") if ARBITER_SUDO else (),
+                                  env=sdk_env(), echo=False)
+    backend.start()
+    arb = Arbiter(backend)
+    tasks = [asyncio.ensure_future(arb.run()), asyncio.ensure_future(_serve(arb, addr))]
+    if ARBITER_REPORT_SEC > 0:
+        tasks.append(asyncio.ensure_future(_report(arb, ARBITER_REPORT_SEC)))
+    if ARBITER_ROS:
+        bridge = RosTeleopBridge(arb)
+        print(f"[ARB] {bridge.describe()}")
+        tasks.append(asyncio.ensure_future(bridge.spin()))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for t in tasks:
+            t.cancel()
+        backend.stop()
+        print(f"[ARB] exit {json.dumps(arb.stats(), ensure_ascii=False)}")
+
+
+def main():
+    try:
+        asyncio.run(amain())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+파이프라인 dispatch 단계가 쓰는 동작 백엔드
+- Motion2Backend      : go2_motion2 (stdin 번호/'/go')
+- ActionServerBackend : go2_action_server (stdin JSON 한 줄)
+둘 다 MotionSupervisor 로 감시/재시작되고 stdout 은 MotionEvents 로 파싱된다.
+dispatch(cmd) 는 파이프 쓰기만 하고 바로 돌아온다(완료는 events.wait_ack 로 확인).
+"""
+import os
+import sys
+import json
+import math
+import time
+import threading
+import subprocess
+from getpass import getpass
+
+from motion_events import MotionEvents
+from motion_supervisor import MotionSupervisor
+from voice_nlp import default_catalog
+
+SDK_DIR = os.path.expanduser(os.environ.get("GO2_SDK_DIR", "/home/unitree/unitree_sdk2-main"))
+BIN_DIR = os.path.join(SDK_DIR, "build", "bin")
+
+def sdk_env():
+    """SDK 공유 라이브러리 경로를 LD_LIBRARY_PATH 에 추가한 환경."""
+    env = os.environ.copy()
+    lib1 = os.path.join(SDK_DIR, "lib", "aarch64")
+    lib2 = os.path.join(SDK_DIR, "thirdparty", "lib", "aarch64")
+    env["LD_LIBRARY_PATH"] = f"{lib1}:{lib2}:{os.environ.get('LD_LIBRARY_PATH','')}"
+    return env
+
+# ===== sudo 인증 캐시 확보 =====
+def ensure_sudo_cache():
+    ok = subprocess.run(["sudo","-n","-v"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if ok.returncode == 0:
+        return
+    pw = getpass("[SUDO] password: ")
+    p = subprocess.Popen(["sudo","-S","-v"], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    p.communicate(pw + "\n")
+    if p.returncode != 0:
+        print("[ERR] sudo auth failed", file=sys.stderr)
+        sys.exit(1)
+
+
+class Motion2Backend:
+    """go2_motion2 메뉴 번호 실행기. 자세 추적 + 재시작 시 자세 복원."""
+    name = "go2_motion2"
+
+    def __init__(self, bin_path=os.path.join(BIN_DIR, "go2_motion2"), iface="eth0",
+                 sudo=("sudo", "-E"), cwd=None, env=None, echo=True, ready_timeout=5.0, name=None):
+        if name:
+            self.name = name
+        self.bin_path = bin_path
+        self.iface = iface
+        self.sudo = list(sudo or [])
+        self.cwd = cwd if cwd is not None else os.path.dirname(bin_path)
+        self.env = env
+        self.echo = echo
+        self.ready_timeout = ready_timeout
+        self.sup = None
+        self.events = MotionEvents()   # stdout → [OK]/[FAIL]/[TRIGGER] 이벤트
+        self.events.add_listener(self._on_event)
+        # 아주 단순한 자세 추적(앉음/서있음). 실제 피드백이 없어서 우리가 보낸 명령 기준으로만 저장.
+        self.posture = "unknown"   # "sit" | "stand" | "down" | "unknown"
+        self._posture_line = None  # 현재 자세를 만든 마지막 명령(재시작 시 대기 상태 복원에 사용)
+
+    def start(self):
+        if self.sudo and "-n" not in self.sudo:
+            ensure_sudo_cache()
+        if not os.path.isfile(self.bin_path):
+            raise FileNotFoundError(f"BIN not found: {self.bin_path}")
+        # 프로세스가 죽으면 감시기가 재실행 + 자세 복원 + 대기 명령 전달
+        self.sup = MotionSupervisor(self.sudo + [self.bin_path, self.iface],
+                                    name=self.name, cwd=self.cwd, env=self.env, echo=self.echo,
+                                    replay=self._replay_lines, on_line=self.events.feed)
+        self.sup.start()
+        # 고정 sleep 대신 메뉴(입력 대기) 출력을 기다림
+        if self.events.wait_ready(timeout=self.ready_timeout) is None:
+            if self.sup.last_exit_code not in (None, 0):
+                print(f"[ERR] {self.name} 프로세스가 즉시 종료되었습니다(code={self.sup.last_exit_code}).", file=sys.stderr)
+                print("[HINT] 먼저 터미널에서 한번 직접 실행해 sudo 캐시를 채워두세요:", file=sys.stderr)
+                print(f"  sudo {self.bin_path} {self.iface}", file=sys.stderr)
+                self.sup.stop()
+                raise RuntimeError(f"{self.name} launch failed")
+            print(f"[WARN] {self.name} 메뉴 출력 없음({self.ready_timeout}s) → 그대로 진행", file=sys.stderr)
+
+    def _on_event(self, ev):
+        if ev.kind == "fail":
+            print(f"[GO2] 동작 실패 #{ev.motion_id} ret={ev.ret}", file=sys.stderr)
+
+    def _replay_lines(self):
+        # go2_motion2 의 대기 상태(Sit → RiseSit 등)는 재시작하면 사라진다. 자세 명령("3")을 다시 보내면
+        # 로봇이 실제로 한 번 더 앉으므로, 동작 없이 플래그만 세우는 "/pending" 줄로 복원한다
+        if self._posture_line and self.posture in ("sit", "down"):
+            return [f"/pending {self.posture}"]
+        return []
+
+    def send_line(self, line: str):
+        """번호/'/go' 한 줄 전송 후 이벤트 기준점(mark) 반환 → events.wait_ack(mark) 로 완료 대기."""
+        if not self.sup:
+            print("[ERR] not running"); return None
+        mark = self.events.mark()
+        self.sup.send(line)
+        if line == "/go":
+            # /go 로 대기 동작(RiseSit/StandUp)이 소비됨
+            if self.posture in ("sit", "down"):
+                self.posture = "stand"
+                self._posture_line = None
+            return mark
+        # 보낸 명령 기반으로 posture 추정 업데이트(카탈로그의 posture 필드)
+        posture = default_catalog().tables.posture_after.get(line)
+        if posture:
+            self.posture = posture
+            self._posture_line = line
+        return mark
+
+    def send_id(self, motion_id: int):
+        return self.send_line(str(int(motion_id)))
+
+    def send_go(self):
+        return self.send_line("/go")
+
+    def dispatch(self, cmd):
+        """Command → go2_motion2 한 줄. 보낸 줄(로그용) 또는 None(미지원 의도)."""
+        intent = cmd.intent
+        if not intent.motion2:
+            return None
+        # “일어서/일어나”를 들었을 때 앉아있는 상태면 RiseSit 등, 자세별 대체 동작
+        line = intent.motion_for(self.posture)
+        self.send_line(line)
+        return line
+
+    def stop(self):
+        try:
+            if self.sup:
+                self.sup.stop()
+                st = self.sup.stats()
+                print(f"[INFO] {self.name} restarts={st['restarts']} downtime={st['downtime_total']:.2f}s "
+                      f"dropped={st['dropped']}")
+        finally:
+            self.sup = None
+
+
+class ActionServerBackend:
+    """
+    go2_action_server 를 한 번 띄워 두고 stdin 에 JSON 한 줄씩 보낸다.
+    - visudo:
+      Defaults:unitree env_keep += "LD_LIBRARY_PATH"
+      unitree ALL=(ALL) NOPASSWD: /home/unitree/unitree_sdk2-main/build/bin/go2_action_server
+    """
+    name = "go2_action_server"
+
+    def __init__(self, bin_path=os.path.join(BIN_DIR, "go2_action_server"), iface="eth0",
+                 sudo=("sudo", "-n", "-E"), env=None, echo=True, move_speed=0.3, turn_speed=0.8, name=None):
+        if name:
+            self.name = name
+        self.bin_path = bin_path
+        self.move_speed = move_speed  # m/s
+        self.turn_speed = turn_speed  # rad/s (화자 쪽 회전)
+        self._turn = None             # 진행 중 회전의 취소 이벤트
+        self.iface = iface
+        self.sudo = list(sudo or [])
+        self.env = env if env is not None else sdk_env()
+        self.echo = echo
+        self.sup = None
+        self.events = MotionEvents()   # 서버 JSON 응답 → reply/fail 이벤트
+
+    def start(self):
+        self.sup = MotionSupervisor(self.sudo + [self.bin_path, self.iface],
+                                    name=self.name, env=self.env, echo=self.echo,
+                                    on_line=self.events.feed)
+        self.sup.start()
+
+    def send_action(self, action: str, **params):
+        """JSON 한 줄 전송 후 이벤트 기준점(mark) 반환."""
+        if not self.sup:
+            print("[ERR] not running"); return None
+        mark = self.events.mark()
+        self.sup.send(json.dumps(dict(action=action, **params)))
+        return mark
+
+    def send_batch(self, steps, **params):
+        """동작 여러 개를 한 줄로 전송(서버가 순서대로 실행, 각 단계 delay_ms). 응답 action 은 "batch"."""
+        if not self.sup:
+            print("[ERR] not running"); return None
+        mark = self.events.mark()
+        self.sup.send(json.dumps(dict(batch=list(steps), **params), ensure_ascii=False))
+        return mark
+
+    def call(self, action: str, timeout=4.0, **params):
+        """전송 후 서버 응답(reply/fail)을 기다림. 반환 (rc, 응답 문자열)."""
+        mark = self.send_action(action, **params)
+        if mark is None:
+            return 1, ""
+        ev = self.events.wait_ack(mark, action=action, timeout=timeout)
+        if ev is None:
+            return 1, ""
+        return (0 if ev.ok else 1), json.dumps(ev.raw, ensure_ascii=False)
+
+    def turn(self, bearing_deg: float, min_deg=10.0, rate_hz=10.0):
+        """
+        제자리 회전으로 bearing_deg(+왼쪽) 만큼 돌기: move vyaw 를 |각도|/turn_speed 초 동안
+        rate_hz 로 반복 전송한 뒤 정지. 새 명령이 오면 그 자리에서 취소된다.
+        """
+        self._cancel_turn()
+        if abs(bearing_deg) < min_deg:
+            return f"turn_to {bearing_deg:+.0f}deg (이미 정면)"
+        vyaw = math.copysign(self.turn_speed, bearing_deg)
+        dur = math.radians(abs(bearing_deg)) / self.turn_speed
+        cancel = threading.Event()
+        self._turn = cancel
+
+        def run():
+            t_end = time.monotonic() + dur
+            while not cancel.is_set() and time.monotonic() < t_end:
+                self.send_action("move", vx=0.0, vyaw=vyaw)
+                cancel.wait(1.0 / rate_hz)
+            if not cancel.is_set():
+                self.send_action("move", vx=0.0, vyaw=0.0)
+        threading.Thread(target=run, daemon=True, name="turn").start()
+        return f"turn_to {bearing_deg:+.0f}deg (vyaw={vyaw:+.2f}, {dur:.1f}s)"
+
+    def _cancel_turn(self):
+        if self._turn is not None:
+            self._turn.set()
+            self._turn = None
+
+    def dispatch(self, cmd):
+        act = cmd.intent.action
+        if not act:
+            return None
+        self._cancel_turn()       # 회전 중 새 명령(특히 정지)이 오면 회전부터 끊는다
+        if act["action"] == "turn_to":
+            bearing = getattr(cmd, "bearing", None)
+            return None if bearing is None else self.turn(bearing)
+        params = {k: v for k, v in act.items() if k != "action"}
+        if "dir" in params:   # 카탈로그의 전/후진 방향 → 서버 move 속도
+            params["vx"] = self.move_speed * float(params.pop("dir"))
+        self.send_action(act["action"], **params)
+        return act["action"]
+
+    def stop(self):
+        self._cancel_turn()
+        try:
+            if self.sup:
+                self.sup.stop(quit_line='{"action":"quit"}')
+        finally:
+            self.sup = None
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+go2_motion2 / go2_action_server stdout → 타입이 있는 이벤트
+  go2_motion2       : "[OK] #3 성공", "[FAIL] #13 ret=3104", "[TRIGGER] RiseSit => ret=0",
+                      "[RUN argv] id=8 ret=0", "==== Go2 Motion ..." (메뉴 = 입력 대기),
+                      "[PREP] #13 set ret=0" / "[PREP] #13 hit saved=420ms" (추측 준비, motion_speculate)
+  go2_action_server : {"ok":true,"action":"sit"} / {"ok":false,"error":"unknown action"}
+  motion_arbiter    : {"event":"lease_lost","by":"joy"} (알림, 명령 응답 아님 → ack 대기와 무관)
+프롬프트("> 번호 입력 ...: ")가 개행 없이 찍히므로 태그는 줄 중간에서도 찾는다.
+"""
+import json
+import time
+import threading
+from collections import deque, defaultdict, namedtuple
+
+# kind: ack | fail | trigger | ready | reply | warn | prep | event
+MotionEvent = namedtuple("MotionEvent", "seq ts kind motion_id ret name ok raw")
+
+_TAGS = ("[OK] #", "[FAIL] #", "[TRIGGER] ", "[RUN argv] ", "[PREP] #", "[WARN] ")
+
+def _int_after(s: str, key: str):
+    i = s.find(key)
+    if i < 0:
+        return None
+    i += len(key)
+    j = i
+    n = len(s)
+    if j < n and s[j] in "+-":
+        j += 1
+    while j < n and s[j].isdigit():
+        j += 1
+    try:
+        return int(s[i:j])
+    except ValueError:
+        return None
+
+def parse_line(line: str, ts: float = 0.0, seq: int = 0):
+    """한 줄 → MotionEvent 또는 None(관심 없는 줄). 정규식 없이 find/슬라이스만 사용."""
+    s = line.strip()
+    if not s:
+        return None
+    if s[0] == "{":
+        try:
+            d = json.loads(s)
+        except ValueError:
+            return None
+        if "event" in d and "ok" not in d:
+            return MotionEvent(seq, ts, "event", None, None, d["event"], True, d)
+        ok = bool(d.get("ok"))
+        name = d.get("action") or d.get("error")
+        ret = d.get("ret")
+        return MotionEvent(seq, ts, "reply" if ok else "fail", d.get("id"), ret, name, ok, d)
+    if "[" not in s:
+        if "Go2 Motion" in s:
+            return MotionEvent(seq, ts, "ready", None, None, None, True, s)
+        return None
+    for tag in _TAGS:
+        i = s.find(tag)
+        if i < 0:
+            continue
+        body = s[i + len(tag):]
+        if tag == "[OK] #":
+            return MotionEvent(seq, ts, "ack", _int_after(body, ""), 0, None, True, s)
+        if tag == "[FAIL] #":
+            return MotionEvent(seq, ts, "fail", _int_after(body, ""), _int_after(body, "ret="), None, False, s)
+        if tag == "[TRIGGER] ":
+            ret = _int_after(body, "ret=")
+            return MotionEvent(seq, ts, "trigger", None, ret, body.split(" ", 1)[0], ret == 0, s)
+        if tag == "[PREP] #":
+            # name: set | held | hit | cancel | none,  hit 이면 ret 자리에 절약한 ms
+            parts = body.split()
+            name = parts[1] if len(parts) > 1 else None
+            ret = _int_after(body, "saved=") if name == "hit" else _int_after(body, "ret=")
+            ok = name in ("held", "hit", "cancel") or (name == "set" and ret == 0)
+            return MotionEvent(seq, ts, "prep", _int_after(body, ""), ret, name, ok, s)
+        if tag == "[RUN argv] ":
+            ret = _int_after(body, "ret=")
+            kind = "ack" if ret == 0 else "fail"
+            return MotionEvent(seq, ts, kind, _int_after(body, "id="), ret, None, ret == 0, s)
+        return MotionEvent(seq, ts, "warn", None, None, None, False, s)
+    return None
+
+
+class MotionEvents:
+    """
+    이벤트 스트림 + 대기(wait) 지원. MotionSupervisor(on_line=events.feed) 로 연결.
+      mark = events.mark(); sup.send("3"); ev = events.wait_ack(mark, motion_id=3)
+    """
+
+    def __init__(self, maxlen: int = 256):
+        self._cv = threading.Condition()
+        self._events = deque(maxlen=maxlen)
+        self._seq = 0
+        self._listeners = []
+        self.counts = defaultdict(int)      # kind → 개수
+        self.ret_codes = defaultdict(int)   # 실패 ret → 개수
+
+    def add_listener(self, fn):
+        self._listeners.append(fn)
+
+    def feed(self, line: str):
+        ts = time.time()
+        with self._cv:
+            ev = parse_line(line, ts, self._seq + 1)
+            if ev is None:
+                return None
+            self._seq += 1
+            self._events.append(ev)
+            self.counts[ev.kind] += 1
+            if ev.ret not in (None, 0):
+                self.ret_codes[ev.ret] += 1
+            self._cv.notify_all()
+        for fn in self._listeners:
+            fn(ev)
+        return ev
+
+    def mark(self) -> int:
+        """이후 wait 의 기준점(지금까지 받은 마지막 seq)."""
+        with self._cv:
+            return self._seq
+
+    def wait(self, match, since: int, timeout: float = 5.0):
+        """seq > since 인 이벤트 중 match(ev) 가 참인 첫 이벤트. 시간 초과 시 None."""
+        deadline = time.time() + timeout
+        with self._cv:
+            while True:
+                for ev in self._events:
+                    if ev.seq > since and match(ev):
+                        return ev
+                remain = deadline - time.time()
+                if remain <= 0:
+                    return None
+                self._cv.wait(remain)
+
+    def wait_ack(self, since: int, motion_id=None, action=None, timeout: float = 5.0):
+        """명령 완료(ack/reply) 또는 실패(fail) 이벤트를 기다린다."""
+        def match(ev):
+            if ev.kind not in ("ack", "fail", "reply"):
+                return False
+            if motion_id is not None and ev.motion_id is not None and ev.motion_id != motion_id:
+                return False
+            if action is not None and ev.kind == "reply" and ev.name != action:
+                return False
+            return True
+        return self.wait(match, since, timeout)
+
+    def wait_ready(self, since: int = 0, timeout: float = 3.0):
+        return self.wait(lambda ev: ev.kind == "ready", since, timeout)
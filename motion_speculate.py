@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+추측 준비(speculative pre-positioning): 파셜 가설이 이미 "점프"/"일어서" 를 강하게 가리키면
+확정 전에 준비 동작을 go2_motion2 로 먼저 보낸다.
+- 대상은 카탈로그 prep 필드가 있는 의도 + 현재 자세 조합뿐. 보내는 줄은 로봇을 옮기지 않는 "/prep" 줄만
+  (본 동작을 미리 보내지 않음: 빗나가면 되돌리려고 반대 동작을 해야 하므로)
+    front_jump(서 있음) : "/prep 13" → 점프 전 균형서기 + 600ms 안정화를 미리. 본 명령 13 이 오면 남은 시간만 대기
+- 파셜 SPEC_STABLE 번 연속 같은 의도(점수 ≥ SPEC_MIN_SCORE)일 때만 보낸다. 보낸 뒤에는 확정까지 유지
+- 적중 = 같은 의도의 명령이 디바운스를 통과해 전송 대기열에 들어감. 확정이 다른 의도, 확정됐지만 전송 안 됨
+  (디바운스 등), SPEC_TIMEOUT_SEC 안에 전송 없음은 빗나감 → 준비 취소(undo 줄, "/prep 0") 또는 그대로 둠(undo=null)
+- 파셜 점수는 공유 점수 캐시(score_cache)를 거치지 않는다(청크마다 오는 파셜이 확정 결과를 밀어내지 않게)
+- [SPEC] 로그와 stats(): 시도/적중/빗나감/되돌림, 숨긴 지연(ms). go2_motion2 가 잰 실제 절약은 [PREP] hit saved=
+켜기: SPEC_DISPATCH=1 (voice_please, go2_voice2motion. 여러 대 지휘(GO2_ROBOTS) 중에는 쓰지 않음)
+"""
+import os
+import time
+import asyncio
+from collections import deque
+
+from voice_nlp import default_catalog, normalize_korean, score_intents, best_intent
+
+SPEC_DISPATCH    = os.environ.get("SPEC_DISPATCH", "0") in ("1", "true")
+SPEC_MIN_SCORE   = float(os.environ.get("SPEC_MIN_SCORE", "2.0"))
+SPEC_STABLE      = int(os.environ.get("SPEC_STABLE", "2"))
+SPEC_TIMEOUT_SEC = float(os.environ.get("SPEC_TIMEOUT_SEC", "3.0"))
+
+
+class SpeculativeBackend:
+    """Motion2Backend(send_line/posture/events) 감싸기. 나머지 속성은 그대로 넘긴다."""
+
+    def __init__(self, backend, min_score=SPEC_MIN_SCORE, stable=SPEC_STABLE, timeout_sec=SPEC_TIMEOUT_SEC):
+        self.backend = backend
+        self.min_score = min_score
+        self.stable = max(1, stable)
+        self.timeout_sec = timeout_sec
+        self.pipeline = None
+        self._cand = (None, 0)        # (의도 이름, 연속 파셜 수)
+        self._spec = None             # 진행 중인 추측(dict)
+        self.attempts = 0
+        self.hits = 0
+        self.misses = 0
+        self.rollbacks = 0
+        self.hidden_ms = deque(maxlen=200)      # 적중 시 앞당긴 시간(추정)
+        self.device_saved_ms = deque(maxlen=200)  # go2_motion2 [PREP] hit saved=
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    def attach(self, pipeline):
+        self.pipeline = pipeline
+        pipeline.backend = self
+        pipeline.partial_hooks.append(self._on_partial)
+        pipeline.final_hooks.append(self._on_final)
+        pipeline.intent_hooks.append(self._on_intent)
+        pipeline.extra_tasks.append(self._watch)
+        events = getattr(self.backend, "events", None)
+        if events is not None:
+            events.add_listener(self._on_motion_event)
+        return pipeline
+
+    def _tel(self, msg):
+        if self.pipeline is not None:
+            self.pipeline.tel("SPEC", msg)
+
+    def _on_motion_event(self, ev):
+        # 펌프 스레드에서 호출: 숫자만 쌓는다
+        if ev.kind == "prep" and ev.name == "hit" and ev.ret is not None:
+            self.device_saved_ms.append(ev.ret)
+
+    # ---------- 파셜 → 준비 ----------
+    def _on_partial(self, text, ts):
+        if self._spec is not None:
+            return                     # 보낸 뒤에는 확정까지 유지(파셜 흔들림에 따라 왔다 갔다 하지 않음)
+        tables = default_catalog().tables
+        scores = score_intents(normalize_korean(text), tables)
+        intent, score = best_intent(scores, tables, self.min_score)
+        entry = intent.prep.get(self.backend.posture) if intent is not None else None
+        if entry is not None and not _prep_only(entry):
+            entry = None               # 본 동작을 미리 보내는 항목은 쓰지 않는다
+        if entry is None:
+            self._cand = (None, 0)
+            return
+        name, n = self._cand
+        n = n + 1 if name == intent.name else 1
+        self._cand = (intent.name, n)
+        if n >= self.stable:
+            self._fire(intent, entry, text, score)
+
+    def _fire(self, intent, entry, text, score):
+        posture = self.backend.posture
+        line = entry["line"]
+        self._spec = {"intent": intent.name, "line": line, "undo": entry.get("undo"), "posture": posture,
+                      "saves_ms": entry.get("saves_ms"), "t": time.time(), "final": False, "hit": False}
+        self._cand = (None, 0)
+        self.attempts += 1
+        self.backend.send_line(line)
+        self._tel(f"{intent.name} 준비 '{line}' (파셜 '{text}', score={score:.1f}, 자세 {posture})")
+
+    # ---------- 확정 → 적중/빗나감 ----------
+    def _on_final(self, hyps, ts):
+        # 판단(점수화/디바운스)은 파이프라인이 한다. 같은 handle_final 안에서 명령이 나오면 _on_intent 가 불린다
+        self._cand = (None, 0)
+        spec = self._spec
+        if spec is not None and not spec["hit"]:
+            spec["final"] = hyps[0][0] if hyps else ""
+
+    def _on_intent(self, cmd):
+        spec = self._spec
+        if spec is None or spec["hit"]:
+            return
+        if cmd.intent.name == spec["intent"]:
+            spec["hit"] = True         # 전송 대기열로 감. 본 명령은 dispatch 에서 소비
+            return
+        self._rollback(f"확정 '{cmd.text}' → {cmd.intent.name}")
+
+    def _rollback(self, why):
+        spec, self._spec = self._spec, None
+        self.misses += 1
+        # 준비만 취소한다(로봇을 움직이는 되돌림은 없음)
+        if spec["undo"]:
+            self.rollbacks += 1
+            self.backend.send_line(spec["undo"])
+            self._tel(f"빗나감({why}) → 준비 취소 '{spec['undo']}'")
+        else:
+            self._tel(f"빗나감({why}) → 유지")
+
+    def dispatch(self, cmd):
+        spec = self._spec
+        if spec is None or not spec["hit"] or cmd.intent.name != spec["intent"]:
+            return self.backend.dispatch(cmd)
+        self._spec = None
+        self.hits += 1
+        ahead = (time.time() - spec["t"]) * 1000.0
+        self.hidden_ms.append(min(ahead, spec["saves_ms"] or ahead))
+        return self.backend.dispatch(cmd)
+
+    async def _watch(self, pipeline=None):
+        while True:
+            await asyncio.sleep(0.2)
+            spec = self._spec
+            if spec is None or spec["hit"] and time.time() - spec["t"] < self.timeout_sec:
+                continue
+            if spec["final"] is not False and not spec["hit"]:
+                # 확정은 왔지만 명령이 나오지 않음(디바운스/약한 점수/매칭 없음)
+                self._rollback(f"확정 '{spec['final']}' 전송 안 됨")
+            elif time.time() - spec["t"] >= self.timeout_sec:
+                self._rollback(f"{self.timeout_sec:g}s 안에 " + ("전송 없음" if spec["hit"] else "확정 없음"))
+
+    # ---------- 보고 ----------
+    def stats(self) -> dict:
+        hid = list(self.hidden_ms)
+        dev = list(self.device_saved_ms)
+        st = {"attempts": self.attempts, "hits": self.hits, "misses": self.misses, "rollbacks": self.rollbacks,
+              "miss_rate": round(self.misses / self.attempts, 3) if self.attempts else None,
+              "hidden_ms_avg": round(sum(hid) / len(hid), 1) if hid else None,
+              "hidden_ms_total": round(sum(hid), 1),
+              "device_saved_ms_avg": round(sum(dev) / len(dev), 1) if dev else None}
+        inner = getattr(self.backend, "stats", None)
+        if inner is not None:
+            st["backend"] = inner()
+        return st
+
+    def stop(self):
+        st = self.stats()
+        avg = "-" if st["hidden_ms_avg"] is None else f"{st['hidden_ms_avg']:.0f}ms"
+        print(f"[SPEC] attempts={st['attempts']} hits={st['hits']} misses={st['misses']} "
+              f"rollbacks={st['rollbacks']} hidden avg={avg} total={st['hidden_ms_total']:.0f}ms")
+        if hasattr(self.backend, "stop"):
+            self.backend.stop()
+
+
+def _prep_only(entry):
+    # go2_motion2 "/prep" 줄만 허용(로봇을 옮기는 본 동작 번호는 추측으로 보내지 않음)
+    return all(ln is None or str(ln).startswith("/prep ") for ln in (entry.get("line"), entry.get("undo")))
+
+
+def speculate_from_env(pipeline):
+    """SPEC_DISPATCH=1 이고 단일 go2_motion2 백엔드면 추측 준비를 붙인다."""
+    b = pipeline.backend
+    if not SPEC_DISPATCH:
+        return pipeline
+    if pipeline.router is not None or not hasattr(b, "send_line") or not hasattr(b, "posture"):
+        print("[WARN] SPEC_DISPATCH: 단일 go2_motion2 백엔드에서만 동작 → 끔")
+        return pipeline
+    return SpeculativeBackend(b).attach(pipeline)
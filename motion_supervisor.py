@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+go2_motion2 / go2_action_server 프로세스 감시기
+- stdout 파이프 EOF 로 종료를 즉시 감지 → 백오프 후 재실행
+- 재실행 직후 replay() 가 돌려준 줄(로봇을 움직이지 않는 상태 복원 줄, 예: "/pending sit")을 먼저 보냄
+- 재실행 중 들어온 명령은 버퍼에 모았다가 전달(오래된 명령은 버림). 복원/버퍼 전달이 끝날 때까지
+  새 send() 는 끼어들지 않고 버퍼 뒤에 줄을 선다
+- 다운타임/재시작 횟수 기록
+"""
+import sys
+import time
+import threading
+import subprocess
+from collections import deque
+
+
+class MotionSupervisor:
+    def __init__(self, cmd, name="go2_motion2", cwd=None, env=None,
+                 replay=None, on_line=None, echo=True,
+                 backoff_min=0.5, backoff_max=8.0, stable_sec=10.0,
+                 max_buffer=16, buffer_ttl=3.0):
+        self.cmd = list(cmd)
+        self.name = name
+        self.cwd = cwd
+        self.env = env
+        self.replay = replay          # () -> [line, ...]  재실행 직후 먼저 보낼 줄
+        self.on_line = on_line        # (line) -> None     stdout 한 줄마다 호출
+        self.echo = echo
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.stable_sec = stable_sec  # 이 시간 이상 살아 있었으면 백오프 초기화
+        self.buffer_ttl = buffer_ttl  # 재실행 후 전달할 때 이보다 오래된 명령은 버림
+
+        self.proc = None
+        self._lock = threading.Lock()
+        self._buf = deque(maxlen=max_buffer)
+        self._stopping = False
+        self._warming = False         # 재실행 ~ 복원/버퍼 전달 완료 사이(새 send 는 버퍼로)
+        self._backoff = backoff_min
+        self._started_at = 0.0
+        self._down_since = None
+
+        # 통계
+        self.restarts = 0
+        self.last_exit_code = None
+        self.downtime_total = 0.0
+        self.last_downtime = 0.0
+        self.dropped = 0
+
+    # ---------- 수명 ----------
+    def start(self):
+        self._stopping = False
+        self._spawn()
+
+    def _spawn(self):
+        print(f"[INFO] launch({self.name}): {' '.join(self.cmd)}")
+        p = subprocess.Popen(self.cmd, cwd=self.cwd, env=self.env,
+                             stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                             stderr=subprocess.STDOUT, text=True, bufsize=1)
+        with self._lock:
+            self.proc = p
+            self._started_at = time.time()
+        threading.Thread(target=self._pump, args=(p,), daemon=True, name=f"pump-{self.name}").start()
+
+    def alive(self) -> bool:
+        p = self.proc
+        return p is not None and p.poll() is None and not self._stopping
+
+    def _pump(self, p):
+        for line in p.stdout:
+            if self.echo:
+                sys.stdout.write(line)
+                sys.stdout.flush()
+            if self.on_line is not None:
+                self.on_line(line)
+        # EOF = 프로세스 종료(또는 stdout 닫힘)
+        code = p.wait()
+        if self._stopping:
+            return
+        self._on_exit(p, code)
+
+    def _on_exit(self, p, code):
+        now = time.time()
+        with self._lock:
+            if self.proc is not p:
+                return
+            self.proc = None
+            self._warming = True
+            self.last_exit_code = code
+            self._down_since = now
+            if now - self._started_at >= self.stable_sec:
+                self._backoff = self.backoff_min
+            delay = self._backoff
+            self._backoff = min(self.backoff_max, self._backoff * 2)
+        print(f"[WARN] {self.name} exited (code={code}) → {delay:.1f}s 후 재시작", file=sys.stderr)
+        while not self._stopping:
+            time.sleep(delay)
+            if self._stopping:
+                return
+            try:
+                self._spawn()
+                break
+            except OSError as e:
+                print(f"[ERR] {self.name} relaunch failed: {e}", file=sys.stderr)
+                with self._lock:
+                    delay = self._backoff
+                    self._backoff = min(self.backoff_max, self._backoff * 2)
+        self._warm_up()
+
+    def _warm_up(self):
+        """재실행 직후: 상태 복원 줄 → 버퍼 명령 순으로 전달. 끝날 때까지 잠금을 쥐어 send() 가 끼지 않게."""
+        lines = list(self.replay() or []) if self.replay else []
+        stale, lost = [], []
+        with self._lock:
+            if self.proc is None:
+                # 새 프로세스가 벌써 다시 죽음: 그쪽 _on_exit 가 재실행 후 다시 복원/전달(버퍼는 그대로 둠)
+                return
+            for ln in lines:
+                if not self._write(ln):
+                    lost.append(ln)
+            now = time.time()
+            pending = list(self._buf)
+            self._buf.clear()
+            for ts, ln in pending:
+                if now - ts > self.buffer_ttl:
+                    self.dropped += 1
+                    stale.append(ln)
+                    continue
+                if not self._write(ln):
+                    # 쓰는 사이 다시 죽음(파이프 끊김): 조용히 잃지 않고 버림으로 센다
+                    self.dropped += 1
+                    lost.append(ln)
+            down = now - (self._down_since or now)
+            self._down_since = None
+            self.last_downtime = down
+            self.downtime_total += down
+            self.restarts += 1
+            self._warming = False
+        for ln in lines:
+            print(f"[REPLAY] {self.name}: {ln}")
+        for ln in stale:
+            print(f"[DROP] stale command during restart: {ln}", file=sys.stderr)
+        for ln in lost:
+            print(f"[DROP] {self.name} exited again during restart: {ln}", file=sys.stderr)
+        print(f"[INFO] {self.name} restarted: downtime={down:.2f}s restarts={self.restarts}")
+
+    # ---------- 입력 ----------
+    def _write(self, line: str) -> bool:
+        p = self.proc
+        if p is None or p.poll() is not None:
+            return False
+        try:
+            p.stdin.write(line.rstrip("\n") + "\n")
+            p.stdin.flush()
+            return True
+        except (BrokenPipeError, OSError, ValueError):
+            return False
+
+    def send(self, line: str) -> bool:
+        """한 줄 전송. 프로세스가 내려가 있거나 복원 중이면 버퍼에 넣고 False."""
+        with self._lock:
+            if not self._warming and self._write(line):
+                return True
+            if len(self._buf) == self._buf.maxlen:
+                self.dropped += 1
+            self._buf.append((time.time(), line))
+        print(f"[BUF] {self.name} restarting → queued: {line.strip()}", file=sys.stderr)
+        return False
+
+    def stop(self, quit_line="q", timeout=3.0):
+        self._stopping = True
+        p = self.proc
+        if p is None or p.poll() is not None:
+            return
+        try:
+            if quit_line:
+                p.stdin.write(quit_line + "\n")
+                p.stdin.flush()
+            p.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            p.terminate()
+        except (BrokenPipeError, OSError, ValueError):
+            pass
+
+    def stats(self) -> dict:
+        down = (time.time() - self._down_since) if self._down_since else 0.0
+        return {"name": self.name, "alive": self.alive(), "restarts": self.restarts,
+                "last_exit_code": self.last_exit_code, "downtime_total": self.downtime_total + down,
+                "last_downtime": self.last_downtime, "buffered": len(self._buf), "dropped": self.dropped}
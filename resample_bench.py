@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+리샘플러 벤치마크
+1) 합성: 레이트별 CPU(RTF), 통과대역 이득, 8kHz 이상 성분 억제(앨리어싱), 청크/통짜 결과 일치
+2) 장치(BENCH_DEVICE 지정 시): 같은 마이크를
+     A) plughw:X 를 16k mono 로 열기(ALSA plug 변환)
+     B) hw:X 를 고유 레이트로 열고 audio_frontend 로 변환
+   각각 BENCH_SEC 초 캡처하며 arecord 프로세스 CPU, 우리 변환 CPU, 첫 청크까지 걸린 시간 비교
+  python3 resample_bench.py
+  BENCH_DEVICE=0,0 BENCH_HW_RATE=48000 BENCH_HW_CH=2 python3 resample_bench.py
+"""
+import os
+import json
+import time
+import resource
+import subprocess
+
+from audio_frontend import _need_numpy, PolyphaseResampler, capture_frontend, ASR_RATE
+
+np = None
+
+RATES   = [int(r) for r in os.environ.get("BENCH_RATES", "48000,44100,32000,22050,8000").split(",")]
+SEC     = float(os.environ.get("BENCH_SEC", "5"))
+DEVICE  = os.environ.get("BENCH_DEVICE", "")          # 예: "0,0" → plughw:0,0 / hw:0,0
+HW_RATE = int(os.environ.get("BENCH_HW_RATE", "48000"))
+HW_CH   = int(os.environ.get("BENCH_HW_CH", "2"))
+
+def _tone(rate, f, sec, ch=1):
+    t = np.arange(int(rate * sec)) / rate
+    return np.tile((10000.0 * np.sin(2 * np.pi * f * t)).astype(np.float32), (ch, 1))
+
+def _amp(y):
+    y = y[0, 2000:-2000]
+    return float(np.sqrt(2.0 * np.mean(y ** 2)) / 10000.0)
+
+def synth_one(rate, ch=1):
+    r = PolyphaseResampler(rate, ASR_RATE, ch)
+    chunk = rate // 10
+
+    def run(x):
+        r.reset()
+        return np.concatenate([r.process_float(x[:, i:i + chunk]) for i in range(0, x.shape[1], chunk)], axis=1)
+
+    y = run(_tone(rate, 1000.0, SEC, ch))
+    r.reset()
+    y_once = r.process_float(_tone(rate, 1000.0, SEC, ch))
+    stream_err = float(np.abs(y - y_once[:, : y.shape[1]]).max())
+    alias_db = None
+    if rate > ASR_RATE:
+        ya = run(_tone(rate, min(rate / 2.0 * 0.95, 12000.0), SEC, ch))
+        alias_db = round(20.0 * np.log10(_amp(ya) + 1e-12), 1)
+    # CPU: 실사용과 같은 100ms 청크 int16 경로
+    pcm = np.clip(_tone(rate, 440.0, SEC, ch).T, -32768, 32767).astype("<i2").tobytes()
+    step = chunk * 2 * ch
+    r.reset()
+    t0 = time.perf_counter()
+    for i in range(0, len(pcm), step):
+        r.process(pcm[i:i + step])
+    cpu = time.perf_counter() - t0
+    return {"rate": rate, "channels": ch, "ratio": f"{r.L}/{r.M}", "out_samples": y.shape[1],
+            "passband_gain": round(_amp(y), 4), "alias_db": alias_db, "stream_vs_oneshot": stream_err,
+            "rtf": round(cpu / SEC, 5), "ms_per_chunk": round(cpu / (len(pcm) / step) * 1000.0, 3),
+            "delay_ms": round(r.delay_ms, 2)}
+
+def _capture(device, rate, ch, frontend=None):
+    """arecord 로 SEC 초 읽기 → (arecord CPU s, 변환 CPU s, 첫 청크 ms, 읽은 바이트)"""
+    cmd = ["arecord", "-q", "-D", device, "-f", "S16_LE", "-r", str(rate), "-c", str(ch), "-t", "raw"]
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    t_open = time.perf_counter()
+    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    step = rate // 10 * 2 * ch
+    first_ms = None
+    got = 0
+    conv = 0.0
+    try:
+        while got < rate * 2 * ch * SEC:
+            data = p.stdout.read(step)
+            if not data:
+                break
+            if first_ms is None:
+                first_ms = (time.perf_counter() - t_open) * 1000.0
+            got += len(data)
+            if frontend is not None:
+                t0 = time.perf_counter()
+                frontend.process(data)
+                conv += time.perf_counter() - t0
+    finally:
+        p.terminate()
+        p.wait()
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    ar_cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    return ar_cpu, conv, first_ms, got
+
+def device_bench():
+    out = {}
+    a = _capture(f"plughw:{DEVICE}", ASR_RATE, 1)
+    out["plughw"] = {"arecord_cpu_s": round(a[0], 4), "convert_cpu_s": 0.0, "first_chunk_ms": a[2], "bytes": a[3]}
+    fe = capture_frontend(HW_RATE, HW_CH, mix="avg")
+    b = _capture(f"hw:{DEVICE}", HW_RATE, HW_CH, fe)
+    out["hw+frontend"] = {"arecord_cpu_s": round(b[0], 4), "convert_cpu_s": round(b[1], 4),
+                          "first_chunk_ms": b[2], "bytes": b[3], "frontend": fe.describe() if fe else None}
+    return out
+
+def main():
+    global np
+    np = _need_numpy()
+    rows = [synth_one(r) for r in RATES] + [synth_one(48000, 2)]
+    print(f"{'rate':>6} {'ch':>2} {'L/M':>8} {'gain':>7} {'alias dB':>9} {'stream err':>10} "
+          f"{'rtf':>8} {'ms/chunk':>9} {'delay ms':>8}")
+    for r in rows:
+        al = "-" if r["alias_db"] is None else f"{r['alias_db']:.1f}"
+        print(f"{r['rate']:>6} {r['channels']:>2} {r['ratio']:>8} {r['passband_gain']:>7.4f} {al:>9} "
+              f"{r['stream_vs_oneshot']:>10.2g} {r['rtf']:>8.5f} {r['ms_per_chunk']:>9.3f} {r['delay_ms']:>8.2f}")
+    result = {"synthetic": rows}
+    if DEVICE:
+        dev = device_bench()
+        for k, v in dev.items():
+            print(f"[DEV] {k}: arecord cpu={v['arecord_cpu_s']:.3f}s convert cpu={v['convert_cpu_s']:.3f}s "
+                  f"first chunk={v['first_chunk_ms']}ms ({SEC:.0f}s capture)")
+        result["device"] = dev
+    out = os.environ.get("BENCH_JSON")
+    if out:
+        with open(out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"[INFO] wrote {out}")
+
+if __name__ == "__main__":
+    main()
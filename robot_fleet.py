@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+여러 대의 Go2 를 음성 하나로 지휘
+- parse_robots : "eth0,eth1@ns2" / "알파=eth0,베타=eth1" → [(이름, iface, netns)]
+- RobotRouter  : "일번 앉아" → (("일번",), "앉아"),  "모두 앉아"/"앉아" → (None, "앉아") = 전체
+- FanoutBackend: 로봇별 전송 스레드로 동시에 쓰고, 로봇별 ack 지연/전송 편차(skew)를 기록
+"""
+import sys
+import time
+import queue
+import threading
+
+_KOR_NUM = ["영", "일", "이", "삼", "사", "오", "육", "칠", "팔", "구", "십"]
+_CALL_TAIL = ("아", "야", "은", "는", "이", "가", "도")   # "일번아", "이번은" 등
+BROADCAST_WORDS = ("모두", "전체", "다들", "다같이", "전부", "all")
+
+def parse_robots(spec: str):
+    """
+    "eth0,eth1@ns2"          → [("일번","eth0",None), ("이번","eth1","ns2")]
+    "알파=eth0,베타=eth1"     → [("알파","eth0",None), ("베타","eth1",None)]
+    """
+    out = []
+    for i, item in enumerate([x.strip() for x in (spec or "").split(",") if x.strip()], start=1):
+        name, _, rest = item.rpartition("=")
+        iface, _, netns = rest.partition("@")
+        if not name:
+            name = f"{_KOR_NUM[i]}번" if i < len(_KOR_NUM) else f"{i}번"
+        out.append((name, iface, netns or None))
+    return out
+
+def netns_prefix(sudo, netns):
+    """네트워크 네임스페이스 안에서 실행: sudo ... ip netns exec <ns>"""
+    if not netns:
+        return list(sudo)
+    return list(sudo) + ["ip", "netns", "exec", netns]
+
+
+class RobotRouter:
+    """문장 앞쪽의 로봇 호칭을 떼어 대상 목록으로 바꾼다."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.alias = {}
+        for i, name in enumerate(self.names, start=1):
+            for a in (name, f"{i}번", f"{i}호", f"{i}호기"):
+                self.alias.setdefault(a, name)
+            if i < len(_KOR_NUM):
+                k = _KOR_NUM[i]
+                for a in (f"{k}번", f"{k}호", f"{k}호기"):
+                    self.alias.setdefault(a, name)
+
+    def _lookup(self, tok):
+        if tok in self.alias:
+            return self.alias[tok]
+        if tok[-1:] in _CALL_TAIL and tok[:-1] in self.alias:
+            return self.alias[tok[:-1]]
+        return None
+
+    def split(self, text: str):
+        """→ (대상 이름 tuple 또는 None(전체), 나머지 문장)"""
+        toks = text.split()
+        targets = []
+        broadcast = False
+        i = 0
+        while i < len(toks):
+            tok = toks[i]
+            if tok in BROADCAST_WORDS:
+                broadcast = True
+            else:
+                name = self._lookup(tok)
+                # ASR 가 "일 번" 처럼 띄어 쓴 경우
+                if name is None and i + 1 < len(toks) and toks[i + 1] in ("번", "호", "호기", "번아", "번야"):
+                    name = self._lookup(tok + toks[i + 1])
+                    if name is not None:
+                        i += 1
+                if name is None:
+                    break
+                if name not in targets:
+                    targets.append(name)
+            i += 1
+        rest = " ".join(toks[i:])
+        return (None if broadcast or not targets else tuple(targets)), rest
+
+    def split_hyps(self, hyps):
+        """n-best 전체에서 호칭 제거. 대상은 호칭이 붙은 가장 확률 높은 가설 기준."""
+        targets = None
+        out = []
+        for txt, p in hyps:
+            t, rest = self.split(txt)
+            if t and targets is None:
+                targets = t
+            out.append((rest, p))
+        return targets, out
+
+
+class _Robot:
+    def __init__(self, name, backend):
+        self.name = name
+        self.backend = backend
+        self.q = queue.Queue()
+        self.sent = 0
+        self.acks = 0
+        self.fails = 0
+        self.timeouts = 0
+        self.lat_ms = []          # 최근 ack 지연(ms)
+        self.thread = None
+        self.up = True            # start() 실패면 False → 명령을 보내지 않음
+
+
+class FanoutBackend:
+    """
+    여러 백엔드(Motion2Backend/ActionServerBackend)에 같은 명령을 동시에 보낸다.
+    cmd.targets 가 None 이면 전체, 아니면 지정 로봇만.
+    로봇마다 전송 스레드가 있어 한 대가 막혀도 다른 로봇 전송은 지연되지 않는다.
+    정지(safety=stop)는 줄을 서지 않는다: 대기 명령을 버리고 호출한 스레드에서 바로 보낸다.
+    """
+    name = "fleet"
+
+    def __init__(self, robots, ack_timeout=5.0, keep=200):
+        self.robots = {name: _Robot(name, b) for name, b in robots}
+        self.ack_timeout = ack_timeout
+        self.keep = keep
+        self.skews_ms = []
+        self._lock = threading.Lock()
+        self._pending = {}        # seq → [t_issue, 남은 수, {name: (t_write, 결과)}]
+        self._seq = 0
+
+    # ---------- 수명 ----------
+    def start(self):
+        # 동시에 기동(각 백엔드는 메뉴 출력까지 기다리므로 순차면 N배)
+        errs = []
+        def _start(r):
+            try:
+                r.backend.start()
+            except Exception as e:
+                errs.append((r.name, e))
+        ths = [threading.Thread(target=_start, args=(r,)) for r in self.robots.values()]
+        for t in ths: t.start()
+        for t in ths: t.join()
+        for name, e in errs:
+            print(f"[ERR] robot {name} start failed: {e} → 명령에서 제외", file=sys.stderr)
+            self.robots[name].up = False
+        if len(errs) == len(self.robots):
+            raise RuntimeError("no robot backend started")
+        for r in self.robots.values():
+            if not r.up:
+                continue
+            r.thread = threading.Thread(target=self._worker, args=(r,), daemon=True, name=f"fleet-{r.name}")
+            r.thread.start()
+
+    def stop(self):
+        for r in self.robots.values():
+            r.q.put(None)
+        for r in self.robots.values():
+            if r.thread:
+                r.thread.join(timeout=self.ack_timeout + 1.0)
+            try:
+                r.backend.stop()
+            except Exception as e:
+                print(f"[WARN] robot {r.name} stop: {e}", file=sys.stderr)
+        for name, st in self.stats().items():
+            if name == "skew_ms_max":
+                continue
+            print(f"[FLEET] {name}: sent={st['sent']} acks={st['acks']} fails={st['fails']} "
+                  f"timeouts={st['timeouts']} p50={st['lat_p50_ms']}ms max={st['lat_max_ms']}ms")
+
+    # ---------- 전송 ----------
+    def dispatch(self, cmd):
+        targets = getattr(cmd, "targets", None)
+        names = list(self.robots) if not targets else [n for n in targets if n in self.robots]
+        if not names:
+            return None
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self._pending[seq] = [time.perf_counter(), len(names), {}, cmd.intent.name]
+        stop = cmd.intent.safety == "stop"
+        for n in names:
+            r = self.robots[n]
+            if not r.up:
+                self._report(seq, n, time.perf_counter(), "down", None)
+            elif stop:
+                self._flush(r)
+                self._send_stop(r, seq, cmd)
+            else:
+                r.q.put((seq, cmd))
+        return f"{'전체' if not targets else ','.join(names)} ({len(names)}대)"
+
+    def _flush(self, r: _Robot):
+        """아직 보내지 않은 명령 버리기(정지가 그 뒤에 기다리지 않도록)"""
+        while True:
+            try:
+                item = r.q.get_nowait()
+            except queue.Empty:
+                return
+            if item is None:
+                r.q.put(None)          # 종료 표식은 남긴다
+                return
+            self._report(item[0], r.name, time.perf_counter(), "flushed", None)
+
+    def _send_stop(self, r: _Robot, seq, cmd):
+        # 워커가 이전 명령 ack 를 기다리는 중이어도 바로 쓴다(ack 는 기다리지 않음)
+        t_write = time.perf_counter()
+        try:
+            res = r.backend.dispatch(cmd)
+        except Exception as e:
+            r.fails += 1
+            self._report(seq, r.name, t_write, f"error {e!r}", None)
+            return
+        r.sent += 1
+        self._report(seq, r.name, t_write, "unsupported" if res is None else "stop sent", None)
+
+    def _worker(self, r: _Robot):
+        b = r.backend
+        while True:
+            item = r.q.get()
+            if item is None:
+                return
+            seq, cmd = item
+            events = getattr(b, "events", None)
+            mark = events.mark() if events is not None else 0
+            t_write = time.perf_counter()
+            t_wall = time.time()
+            try:
+                res = b.dispatch(cmd)
+            except Exception as e:
+                # 워커가 죽으면 이 로봇 명령이 영영 끝나지 않으므로 실패로 보고하고 계속
+                r.fails += 1
+                self._report(seq, r.name, t_write, f"error {e!r}", None)
+                continue
+            r.sent += 1
+            outcome = "unsupported" if res is None else "sent"
+            lat = None
+            if res is not None and events is not None:
+                ev = events.wait(lambda e: e.kind in ("ack", "fail", "reply", "trigger"), mark, self.ack_timeout)
+                if ev is None:
+                    r.timeouts += 1
+                    outcome = "timeout"
+                else:
+                    lat = (ev.ts - t_wall) * 1000.0
+                    if ev.ok:
+                        r.acks += 1
+                        outcome = "ack"
+                    else:
+                        r.fails += 1
+                        outcome = f"fail ret={ev.ret}"
+                    r.lat_ms.append(lat)
+                    del r.lat_ms[:-self.keep]
+            self._report(seq, r.name, t_write, outcome, lat)
+
+    def _report(self, seq, name, t_write, outcome, lat):
+        with self._lock:
+            rec = self._pending.get(seq)
+            if rec is None:
+                return
+            rec[2][name] = (t_write, outcome, lat)
+            rec[1] -= 1
+            if rec[1] > 0:
+                return
+            del self._pending[seq]
+        t_issue, _, res, intent = rec
+        writes = [v[0] for v in res.values()]
+        skew = (max(writes) - min(writes)) * 1000.0
+        self.skews_ms.append(skew)
+        del self.skews_ms[:-self.keep]
+        parts = []
+        for n, (_, oc, l) in res.items():
+            parts.append(f"{n} {oc}" + (f" {l:.0f}ms" if l is not None else ""))
+        print(f"[FLEET] {intent}: " + ", ".join(parts) + f" | skew={skew:.2f}ms", flush=True)
+
+    def stats(self) -> dict:
+        out = {}
+        for r in self.robots.values():
+            lat = sorted(r.lat_ms)
+            out[r.name] = {"up": r.up, "sent": r.sent, "acks": r.acks, "fails": r.fails, "timeouts": r.timeouts,
+                           "lat_p50_ms": round(lat[len(lat) // 2], 1) if lat else None,
+                           "lat_max_ms": round(lat[-1], 1) if lat else None}
+        out["skew_ms_max"] = round(max(self.skews_ms), 3) if self.skews_ms else None
+        return out
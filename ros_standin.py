@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ROS2 없는 PC 에서 voice_ros 노드를 돌려 보기 위한 최소 대역(rclpy 의 쓰는 부분만)
+- create_node / Node.create_publisher / create_subscription / create_timer / spin_once / ok / shutdown
+- 같은 프로세스 안에서 토픽 이름으로 발행 → 구독 콜백 전달(직렬화 없음)
+- VOICE_ROS_ECHO=1 이면 발행되는 메시지를 [ROS] 줄로 출력
+  VOICE_ROS_STANDIN=1 python3 voice_agent.py
+"""
+import os
+import time
+from collections import defaultdict
+
+ECHO = os.environ.get("VOICE_ROS_ECHO", "1") in ("1", "true")
+
+_ok = False
+_subs = defaultdict(list)          # topic → [callback]
+
+
+class _Msg:
+    _fields = ()
+
+    def __init__(self, **kw):
+        for k in self._fields:
+            setattr(self, k, kw.get(k, self._default(k)))
+
+    def _default(self, k):
+        return None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{k}={getattr(self, k)!r}' for k in self._fields)})"
+
+
+class String(_Msg):
+    _fields = ("data",)
+
+    def _default(self, k):
+        return ""
+
+
+class Vector3(_Msg):
+    _fields = ("x", "y", "z")
+
+    def _default(self, k):
+        return 0.0
+
+
+class Twist(_Msg):
+    _fields = ("linear", "angular")
+
+    def _default(self, k):
+        return Vector3()
+
+
+class Publisher:
+    def __init__(self, topic):
+        self.topic = topic
+        self.count = 0
+
+    def publish(self, msg):
+        self.count += 1
+        if ECHO:
+            body = msg.data if isinstance(msg, String) else \
+                f"v={msg.linear.x:+.3f} w={msg.angular.z:+.3f}" if isinstance(msg, Twist) else msg
+            print(f"[ROS] {self.topic} {body}", flush=True)
+        for cb in _subs.get(self.topic, ()):
+            cb(msg)
+
+
+class Timer:
+    def __init__(self, period, callback):
+        self.period = period
+        self.callback = callback
+        self.next = time.monotonic() + period
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def is_canceled(self):
+        return self.cancelled
+
+
+class _Logger:
+    def __init__(self, name):
+        self.name = name
+
+    def info(self, msg):
+        print(f"[ROS] [{self.name}] {msg}")
+
+    warn = warning = error = info
+
+
+class Node:
+    def __init__(self, name):
+        self.name = name
+        self.timers = []
+        self.publishers = []
+
+    def get_name(self):
+        return self.name
+
+    def get_logger(self):
+        return _Logger(self.name)
+
+    def create_publisher(self, msg_type, topic, qos):
+        p = Publisher(topic)
+        self.publishers.append(p)
+        return p
+
+    def create_subscription(self, msg_type, topic, callback, qos):
+        _subs[topic].append(callback)
+        return callback
+
+    def create_timer(self, period, callback):
+        t = Timer(period, callback)
+        self.timers.append(t)
+        return t
+
+    def destroy_timer(self, t):
+        t.cancel()
+
+    def destroy_node(self):
+        for t in self.timers:
+            t.cancel()
+        self.timers = []
+
+
+def init(args=None):
+    global _ok
+    _ok = True
+
+def ok():
+    return _ok
+
+def shutdown():
+    global _ok
+    _ok = False
+    _subs.clear()
+
+def create_node(name, **kw):
+    return Node(name)
+
+def spin_once(node, timeout_sec=None):
+    """기한이 된 타이머 콜백 실행(rclpy 처럼 한 번에 하나씩이 아니라 밀린 것 모두)."""
+    now = time.monotonic()
+    node.timers = [t for t in node.timers if not t.cancelled]
+    for t in list(node.timers):
+        if not t.cancelled and now >= t.next:
+            # 늦게 불려도 주기를 유지(밀린 만큼 건너뜀)
+            t.next += t.period * max(1, int((now - t.next) / t.period) + 1)
+            t.callback()
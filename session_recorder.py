@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+현장 디버깅용 상시 녹화기 (SESSION_DIR 을 지정하면 켜짐)
+- AudioRing : ASR 로 들어간 16kHz mono PCM 을 고정 크기 mmap 링 파일에 계속 덮어쓰기
+- EventLog  : 텔레메트리/명령/오디오 위치 기준점을 작은 바이너리 레코드로 세그먼트 파일에 추가,
+              세그먼트마다 희소 색인(.idx)으로 시간 검색, 총 용량을 넘으면 오래된 세그먼트부터 삭제
+- SessionRecorder : Pipeline(recorder=...) 에 붙이는 묶음
+- RingSource : 녹음 구간을 Pipeline 소스로 다시 흘려보내기(session_replay.py)
+디스크 사용량은 오디오 링 + 로그 상한으로 고정된다.
+"""
+import os
+import sys
+import json
+import mmap
+import time
+import glob
+import bisect
+import struct
+import asyncio
+
+SESSION_DIR       = os.environ.get("SESSION_DIR", "")                     # 비우면 녹화 안 함
+SESSION_AUDIO_SEC = float(os.environ.get("SESSION_AUDIO_SEC", "900"))     # 오디오 링 길이(초)
+SESSION_LOG_MB    = float(os.environ.get("SESSION_LOG_MB", "32"))         # 이벤트 로그 상한
+
+# ===== 오디오 링 =====
+_RING_MAGIC = b"G2AR"
+_RING_HDR = struct.Struct("<4sHIQQd")     # magic, ver, rate, capacity, written(누적 바이트), t_last
+_RING_HDR_SIZE = 64
+
+class AudioRing:
+    """
+    [헤더 64B][데이터 capacity B] 고정 크기 파일을 mmap 으로 열어 링으로 쓴다.
+    위치는 누적 바이트(written) 기준이라 덮어쓴 구간인지 바로 알 수 있다.
+    """
+
+    def __init__(self, path, seconds=None, rate=16000):
+        """seconds=None 이면 기존 파일 크기 그대로 연다(재생용, 내용을 지우지 않음)."""
+        self.path = path
+        hdr = None
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                raw = f.read(_RING_HDR.size)
+            if len(raw) == _RING_HDR.size and raw[:4] == _RING_MAGIC:
+                hdr = _RING_HDR.unpack(raw)
+        if seconds is None:
+            if hdr is None:
+                raise FileNotFoundError(f"audio ring not found: {path}")
+            capacity = hdr[3]
+        else:
+            capacity = int(seconds * rate) * 2
+        fresh = hdr is None or hdr[3] != capacity      # 크기/형식이 다르면 새로 만든다
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fresh:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, _RING_HDR_SIZE + capacity)
+            self.mm = mmap.mmap(fd, _RING_HDR_SIZE + capacity)
+        finally:
+            os.close(fd)
+        if fresh:
+            _RING_HDR.pack_into(self.mm, 0, _RING_MAGIC, 1, rate, capacity, 0, 0.0)
+        _, _, self.rate, self.capacity, self.written, self.t_last = _RING_HDR.unpack_from(self.mm, 0)
+
+    def append(self, pcm: bytes, ts: float):
+        n = len(pcm)
+        if n >= self.capacity:
+            pcm = pcm[n - self.capacity:]
+            self.written += n - len(pcm)
+            n = len(pcm)
+        off = self.written % self.capacity
+        first = min(n, self.capacity - off)
+        base = _RING_HDR_SIZE
+        self.mm[base + off: base + off + first] = pcm[:first]
+        if first < n:
+            self.mm[base: base + n - first] = pcm[first:]
+        self.written += n
+        self.t_last = ts
+        _RING_HDR.pack_into(self.mm, 0, _RING_MAGIC, 1, self.rate, self.capacity, self.written, ts)
+
+    @property
+    def oldest(self) -> int:
+        return max(0, self.written - self.capacity)
+
+    def read(self, pos: int, n: int) -> bytes:
+        """누적 위치 pos 부터 n 바이트(덮어쓴 앞부분은 잘라냄)."""
+        pos = max(pos, self.oldest)
+        n = max(0, min(n, self.written - pos))
+        if n == 0:
+            return b""
+        off = pos % self.capacity
+        first = min(n, self.capacity - off)
+        base = _RING_HDR_SIZE
+        out = self.mm[base + off: base + off + first]
+        if first < n:
+            out += self.mm[base: base + n - first]
+        return out
+
+    def flush(self):
+        self.mm.flush()
+
+    def close(self):
+        try:
+            self.mm.flush()
+            self.mm.close()
+        except (ValueError, OSError):
+            pass
+
+# ===== 이벤트 로그 =====
+_REC = struct.Struct("<dBH")          # ts, kind, payload 길이
+_IDX = struct.Struct("<dQ")           # ts, 세그먼트 내 오프셋
+_ANCHOR = struct.Struct("<Q")         # 오디오 누적 바이트 위치
+KIND_ANCHOR, KIND_TEL, KIND_CMD = 0, 1, 2
+
+class EventLog:
+    """
+    dir/ev-<첫 ts ms>.log (+ .idx) 세그먼트.
+    레코드 = [ts f64][kind u8][len u16][payload], idx 는 index_every 개마다 (ts, offset).
+    """
+
+    def __init__(self, directory, max_bytes=int(SESSION_LOG_MB * 1e6), segments=8, index_every=32):
+        self.dir = directory
+        self.max_bytes = max_bytes
+        self.seg_bytes = max(64 * 1024, max_bytes // segments)
+        self.index_every = index_every
+        self._f = None
+        self._idx = None
+        self._count = 0
+        self._size = 0
+
+    def _segments(self):
+        return sorted(glob.glob(os.path.join(self.dir, "ev-*.log")))
+
+    def _open_segment(self, ts):
+        self.close()
+        path = os.path.join(self.dir, f"ev-{int(ts * 1000):015d}.log")
+        self._f = open(path, "ab")
+        self._idx = open(path[:-4] + ".idx", "ab")
+        self._size = self._f.tell()
+        self._count = 0
+        self._evict()
+
+    def _evict(self):
+        segs = self._segments()
+        total = sum(os.path.getsize(p) + _size_or0(p[:-4] + ".idx") for p in segs)
+        while total > self.max_bytes and len(segs) > 1:
+            old = segs.pop(0)
+            total -= os.path.getsize(old) + _size_or0(old[:-4] + ".idx")
+            for p in (old, old[:-4] + ".idx"):
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+
+    def append(self, ts, kind, payload: bytes):
+        if self._f is None or self._size >= self.seg_bytes:
+            self._open_segment(ts)
+        payload = payload[:65535]
+        if self._count % self.index_every == 0:
+            self._idx.write(_IDX.pack(ts, self._size))
+        self._f.write(_REC.pack(ts, kind, len(payload)))
+        self._f.write(payload)
+        self._size += _REC.size + len(payload)
+        self._count += 1
+
+    def flush(self):
+        if self._f:
+            self._f.flush()
+            self._idx.flush()
+
+    def close(self):
+        if self._f:
+            self._f.close()
+            self._idx.close()
+            self._f = self._idx = None
+
+    # ---------- 읽기 ----------
+    def query(self, t0=None, t1=None, kinds=None):
+        """[t0, t1] 구간 레코드 → [(ts, kind, payload)]. 색인으로 시작 위치를 찾아 그 뒤만 읽는다."""
+        self.flush()
+        out = []
+        segs = self._segments()
+        starts = [int(os.path.basename(p)[3:-4]) / 1000.0 for p in segs]
+        for i, path in enumerate(segs):
+            nxt = starts[i + 1] if i + 1 < len(segs) else float("inf")
+            if t0 is not None and nxt < t0:
+                continue
+            if t1 is not None and starts[i] > t1:
+                break
+            with open(path, "rb") as f:
+                f.seek(_seek_offset(path[:-4] + ".idx", t0))
+                data = f.read()
+            p = 0
+            while p + _REC.size <= len(data):
+                ts, kind, n = _REC.unpack_from(data, p)
+                payload = data[p + _REC.size: p + _REC.size + n]
+                p += _REC.size + n
+                if t0 is not None and ts < t0:
+                    continue
+                if t1 is not None and ts > t1:
+                    break
+                if kinds is None or kind in kinds:
+                    out.append((ts, kind, payload))
+        return out
+
+def _size_or0(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def _seek_offset(idx_path, t0):
+    if t0 is None:
+        return 0
+    try:
+        with open(idx_path, "rb") as f:
+            raw = f.read()
+    except OSError:
+        return 0
+    n = len(raw) // _IDX.size
+    ts = [_IDX.unpack_from(raw, i * _IDX.size)[0] for i in range(n)]
+    i = bisect.bisect_right(ts, t0) - 2      # 한 칸 앞부터(로그 ts 는 큐 지연만큼 살짝 뒤섞일 수 있음)
+    return _IDX.unpack_from(raw, i * _IDX.size)[1] if i >= 0 else 0
+
+# ===== 묶음 =====
+class SessionRecorder:
+    """
+    Pipeline 이 부르는 진입점
+      audio(ts, pcm)      : 캡처 단계(전처리 후 16k mono)
+      event(ts, tag, msg) : 텔레메트리 단계(콘솔 로그 그대로)
+      command(cmd, res)   : dispatch 결과
+    오디오 기준점(ts ↔ 누적 위치)은 anchor_sec 마다 로그에 남긴다.
+    """
+
+    def __init__(self, directory=SESSION_DIR, audio_sec=SESSION_AUDIO_SEC, log_mb=SESSION_LOG_MB,
+                 rate=16000, anchor_sec=1.0):
+        os.makedirs(directory, exist_ok=True)
+        self.dir = directory
+        self.ring = AudioRing(os.path.join(directory, "audio.ring"), audio_sec, rate)
+        self.log = EventLog(directory, int(log_mb * 1e6))
+        self.anchor_sec = anchor_sec
+        self._last_anchor = 0.0
+        self.busy = 0.0
+
+    def describe(self):
+        return (f"recorder: {self.dir} (audio {self.ring.capacity / 2 / self.ring.rate:.0f}s ring, "
+                f"log ≤{self.log.max_bytes / 1e6:.0f}MB)")
+
+    def audio(self, ts, pcm: bytes):
+        t0 = time.perf_counter()
+        # 청크 시작 위치를 기준점으로(청크 ts 는 읽기 완료 시각이지만 100ms 이내 오차)
+        if ts - self._last_anchor >= self.anchor_sec:
+            self.log.append(ts, KIND_ANCHOR, _ANCHOR.pack(self.ring.written))
+            self._last_anchor = ts
+        self.ring.append(pcm, ts)
+        self.busy += time.perf_counter() - t0
+
+    def event(self, ts, tag, msg):
+        self.log.append(ts, KIND_TEL, f"{tag}\t{msg}".encode("utf-8"))
+
+    def command(self, cmd, res):
+        d = {"intent": cmd.intent.name, "score": round(cmd.score, 3), "text": cmd.text,
+             "hyps": [[t, round(p, 3)] for t, p in cmd.hyps[:5]], "t_heard": cmd.t_heard,
+             "targets": cmd.targets, "bearing": cmd.bearing, "result": res}
+        self.log.append(cmd.ts, KIND_CMD, json.dumps(d, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    def flush(self):
+        self.log.flush()
+        self.ring.flush()
+
+    def close(self):
+        self.log.close()
+        self.ring.close()
+
+def recorder_from_env():
+    return SessionRecorder(SESSION_DIR) if SESSION_DIR else None
+
+# ===== 재생 =====
+def audio_window(directory, t0, t1, log=None):
+    """
+    [t0, t1] 에 해당하는 링 구간 → (pos0, pos1). 기준점(anchor) 로그로 ts → 누적 위치를 잇는다.
+    기준점이 없으면 헤더의 마지막 시각에서 거꾸로 계산.
+    """
+    ring = AudioRing(os.path.join(directory, "audio.ring"))
+    log = log or EventLog(directory)
+    bps = ring.rate * 2
+    anchors = [(ts, _ANCHOR.unpack(p)[0]) for ts, _, p in log.query(None, None, kinds=(KIND_ANCHOR,))]
+
+    def pos_at(t):
+        if anchors:
+            i = bisect.bisect_right([a[0] for a in anchors], t) - 1
+            ts, pos = anchors[max(i, 0)]
+            return pos + int((t - ts) * ring.rate) * 2
+        return ring.written - int((ring.t_last - t) * ring.rate) * 2
+
+    p0 = max(ring.oldest, min(ring.written, pos_at(t0)))
+    p1 = max(p0, min(ring.written, pos_at(t1)))
+    p0 -= p0 % 2
+    p1 -= p1 % 2
+    return ring, p0, p1, bps
+
+
+class RingSource:
+    """AudioRing 구간을 파이프라인 소스로(RawFileSource 와 같은 인터페이스)."""
+
+    def __init__(self, ring, pos0, pos1, chunk_ms=100, realtime=False):
+        self.ring = ring
+        self.pos = pos0
+        self.end = pos1
+        self.rate = ring.rate
+        self.chunk_ms = chunk_ms
+        self.chunk_bytes = int(ring.rate * chunk_ms / 1000) * 2
+        self.realtime = realtime
+
+    def describe(self):
+        sec = (self.end - self.pos) / 2 / self.rate
+        return f"replay: {self.ring.path} [{self.pos}, {self.end}) {sec:.1f}s"
+
+    async def open(self):
+        if self.pos < self.ring.oldest:
+            print("[WARN] 요청 구간 앞부분은 이미 덮어써짐", file=sys.stderr)
+
+    async def read(self) -> bytes:
+        if self.realtime:
+            await asyncio.sleep(self.chunk_ms / 1000.0)
+        n = min(self.chunk_bytes, self.end - self.pos)
+        data = self.ring.read(self.pos, n) if n > 0 else b""
+        self.pos += len(data)
+        return data
+
+    async def close(self):
+        pass
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+녹화된 세션(SESSION_DIR) 조회/재실행
+  python3 session_replay.py <dir>                  # 녹음 범위 + 최근 명령 목록
+  python3 session_replay.py <dir> -30              # 마지막 30초를 현재 파이프라인(카탈로그/모델)으로 재실행
+  python3 session_replay.py <dir> 14:02:10 14:02:40
+  python3 session_replay.py <dir> 1718000000.5 1718000020
+시각: epoch 초 | HH:MM:SS(녹음 마지막 날짜 기준) | "YYYY-mm-dd HH:MM:SS" | 음수(마지막 오디오 기준 초)
+동작은 보내지 않는다(dry-run). 녹화 당시 명령과 재실행 결과를 나란히 출력.
+REPLAY_REALTIME=1 : 실제 속도로 재생(디바운스까지 현장과 같게)
+"""
+import os
+import sys
+import json
+import time
+from datetime import datetime
+
+from session_recorder import EventLog, AudioRing, RingSource, audio_window, KIND_CMD, KIND_TEL
+from voice_pipeline import Pipeline, VoskAsr, Debouncer, default_vad
+
+VOSK_MODEL_DIR = os.environ.get("VOSK_MODEL_DIR", "/models/vosk-ko")
+ASR_MAX_ALT = int(os.environ.get("ASR_MAX_ALT", "5"))
+REPLAY_REALTIME = os.environ.get("REPLAY_REALTIME", "0") in ("1", "true")
+
+def _fmt(ts):
+    return datetime.fromtimestamp(ts).strftime("%m-%d %H:%M:%S.%f")[:-3]
+
+def parse_when(s, t_ref):
+    s = s.strip()
+    try:
+        v = float(s)
+        return t_ref + v if v <= 0 else v
+    except ValueError:
+        pass
+    ref = datetime.fromtimestamp(t_ref)
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%H:%M:%S"):
+        try:
+            d = datetime.strptime(s, fmt)
+        except ValueError:
+            continue
+        if fmt == "%H:%M:%S":
+            d = ref.replace(hour=d.hour, minute=d.minute, second=d.second, microsecond=0)
+        return d.timestamp()
+    raise ValueError(f"시각 형식을 모르겠음: {s}")
+
+
+class DryRunBackend:
+    """재실행용: 보낼 명령만 문자열로 돌려준다."""
+    name = "dry-run"
+
+    def __init__(self):
+        self.sent = []
+
+    def dispatch(self, cmd):
+        it = cmd.intent
+        what = it.motion2 or (it.action or {}).get("action")
+        if what is None:
+            return None
+        self.sent.append((cmd.t_heard, it.name, cmd.text))
+        return f"(dry) {what}"
+
+
+def summary(directory):
+    ring = AudioRing(os.path.join(directory, "audio.ring"))
+    log = EventLog(directory)
+    sec = (ring.written - ring.oldest) / 2 / ring.rate
+    print(f"[INFO] audio: {sec:.1f}s 보관, 마지막 {_fmt(ring.t_last) if ring.t_last else '-'}")
+    cmds = log.query(kinds=(KIND_CMD,))
+    tels = log.query(kinds=(KIND_TEL,))
+    if tels:
+        print(f"[INFO] log: {len(tels)} lines, {_fmt(tels[0][0])} ~ {_fmt(tels[-1][0])}")
+    for ts, _, p in cmds[-20:]:
+        d = json.loads(p)
+        print(f"[REC] {_fmt(ts)}  {d['intent']:<12} '{d['text']}' → {d['result']}")
+
+def replay(directory, t0, t1):
+    log = EventLog(directory)
+    ring, p0, p1, bps = audio_window(directory, t0, t1, log)
+    if p1 <= p0:
+        print("[ERR] 해당 구간 오디오가 없습니다(이미 덮어썼거나 범위 밖).", file=sys.stderr)
+        sys.exit(1)
+    print(f"[INFO] replay {_fmt(t0)} ~ {_fmt(t1)} ({(p1 - p0) / bps:.1f}s)")
+    print("----- 녹화 당시 -----")
+    for ts, kind, p in log.query(t0, t1, kinds=(KIND_TEL, KIND_CMD)):
+        if kind == KIND_CMD:
+            d = json.loads(p)
+            print(f"[REC] {_fmt(ts)}  CMD {d['intent']} '{d['text']}' score={d['score']} → {d['result']}")
+        else:
+            tag, _, msg = p.decode("utf-8", "replace").partition("\t")
+            if tag in ("ASR", "NLP", "DEBOUNCE", "ACTION", "DOA"):
+                print(f"[REC] {_fmt(ts)}  [{tag}] {msg}")
+    print("----- 현재 파이프라인 -----")
+    backend = DryRunBackend()
+    t_start = time.perf_counter()
+    Pipeline(RingSource(ring, p0, p1, realtime=REPLAY_REALTIME),
+             VoskAsr(VOSK_MODEL_DIR, max_alt=ASR_MAX_ALT),
+             backend,
+             vad=default_vad(),
+             # 빠른 재생에서는 벽시계 기준 디바운스가 의미 없으므로 실시간 재생일 때만 켠다
+             debouncer=Debouncer(1.5, 3.0) if REPLAY_REALTIME else Debouncer(0.0, 0.0),
+             quit_intent=None,
+             show_partial=False).run()
+    print(f"[INFO] {len(backend.sent)} commands, {(p1 - p0) / bps:.1f}s audio in {time.perf_counter() - t_start:.1f}s")
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(2)
+    directory = sys.argv[1]
+    if not os.path.exists(os.path.join(directory, "audio.ring")):
+        print(f"[ERR] 녹화 폴더가 아닙니다: {directory}", file=sys.stderr)
+        sys.exit(2)
+    if len(sys.argv) == 2:
+        summary(directory)
+        return
+    ring = AudioRing(os.path.join(directory, "audio.ring"))
+    t_ref = ring.t_last or time.time()
+    ring.close()
+    t0 = parse_when(sys.argv[2], t_ref)
+    t1 = parse_when(sys.argv[3], t_ref) if len(sys.argv) > 3 else t_ref
+    replay(directory, t0, t1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+장시간(soak) 시험: 녹음/합성 오디오를 반복해서 전체 파이프라인 → 시뮬레이션 동작 서버로 몇 시간 흘리며
+자원과 지연이 시간에 따라 늘어나는지 본다(현장에서 몇 시간 뒤 반응이 느려지는 문제 재현용).
+  g++ -O2 -std=c++14 -DGO2_DRY go2_action_server.cpp -o go2_action_server_dry
+  SOAK_AUDIO=cmds.raw,chat.raw SOAK_HOURS=4 SOAK_SPEED=8 python3 soak_test.py
+환경
+  SOAK_AUDIO       16kHz mono .raw/.wav 목록(쉼표). 차례로 이어 붙여 반복, 파일 사이 SOAK_GAP_SEC 무음.
+                   비우면 합성(무음 + 잡음 버스트: VAD/ASR 부하만, 명령은 거의 없음)
+  SOAK_HOURS=1     흘릴 오디오 길이(시간),  SOAK_SPEED=1  실시간 배수(0 = 최대 속도)
+  SOAK_SERVER_BIN  시뮬레이션 서버(기본 ./go2_action_server_dry). 없으면 dry-run 백엔드(파이프 없음)
+  SOAK_SAMPLE_SEC=10  샘플 간격(벽시계),  SOAK_OUT=/tmp/go2voice_soak.jsonl  샘플 기록
+  SOAK_WARMUP=0.1  앞부분(비율)은 판정에서 뺌
+판정(끝날 때 또는 Ctrl+C 때)
+  자원(RSS, 스레드, fd, 파이프, 서버 RSS): 구간(SOAK_SEGMENTS=8) 중앙값이 거의 계속 오르고 총 증가가 기준 이상 → 증가
+  지연(명령 지연 p99, 단계별 항목당 ms, 이벤트 루프 지연 p99): 마지막 1/4 대 처음 1/4 이 SOAK_P99_DRIFT 이상 → drift
+  큐 깊이: 마지막 1/4 최대가 처음의 2배 이상이고 4 이상 → 적체
+  하나라도 걸리면 [SOAK][FLAG] 출력 후 종료 코드 1
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import struct
+
+from voice_pipeline import Pipeline, Debouncer, default_vad, SAMPLE_RATE, CHUNK_MS
+from asr_tiers import asr_from_env
+
+VOSK_MODEL_DIR  = os.environ.get("VOSK_MODEL_DIR", "/models/vosk-ko")
+SOAK_AUDIO      = os.environ.get("SOAK_AUDIO", "")
+SOAK_GAP_SEC    = float(os.environ.get("SOAK_GAP_SEC", "2"))
+SOAK_HOURS      = float(os.environ.get("SOAK_HOURS", "1"))
+SOAK_SPEED      = float(os.environ.get("SOAK_SPEED", "1"))
+SOAK_SERVER_BIN = os.environ.get("SOAK_SERVER_BIN", "./go2_action_server_dry")
+SOAK_SAMPLE_SEC = float(os.environ.get("SOAK_SAMPLE_SEC", "10"))
+SOAK_OUT        = os.environ.get("SOAK_OUT", "/tmp/go2voice_soak.jsonl")
+SOAK_WARMUP     = float(os.environ.get("SOAK_WARMUP", "0.1"))
+SOAK_SEGMENTS   = int(os.environ.get("SOAK_SEGMENTS", "8"))
+SOAK_P99_DRIFT  = float(os.environ.get("SOAK_P99_DRIFT", "0.3"))
+STAGES = ("capture", "vad", "asr", "intent", "dispatch", "telemetry")
+# 자원 증가 판정의 최소 총 증가량(이보다 작으면 단조 증가라도 무시)
+GROWTH_MIN = {"rss_mb": 4.0, "server_rss_mb": 2.0, "threads": 2, "fds": 4, "pipes": 2}
+# 지연 drift 판정의 최소 증가량(ms)
+DRIFT_MIN_MS = {"cmd_p99_ms": 20.0, "loop_lag_p99_ms": 5.0}
+
+
+# ===== 오디오 =====
+def _synthetic(sec=20.0, seed=7):
+    """무음(약한 잡음) 사이에 0.6~1.5초 잡음 버스트"""
+    rnd = random.Random(seed)
+    out = bytearray()
+    n = int(sec * SAMPLE_RATE)
+    i = 0
+    while i < n:
+        quiet = int(rnd.uniform(1.5, 4.0) * SAMPLE_RATE)
+        loud = int(rnd.uniform(0.6, 1.5) * SAMPLE_RATE)
+        out += struct.pack(f"<{quiet}h", *(rnd.randint(-40, 40) for _ in range(quiet)))
+        out += struct.pack(f"<{loud}h", *(rnd.randint(-4000, 4000) for _ in range(loud)))
+        i += quiet + loud
+    return bytes(out)
+
+
+def load_loop(paths):
+    if not paths:
+        return _synthetic()
+    from transcript_cache import read_pcm
+    gap = b"\0\0" * int(SOAK_GAP_SEC * SAMPLE_RATE)
+    return b"".join(read_pcm(p) + gap for p in paths)
+
+
+class LoopSource:
+    """메모리의 PCM 을 total_sec 만큼 반복 재생. speed 배속으로 시간 맞춤(0 이면 최대 속도)."""
+
+    def __init__(self, pcm, total_sec, speed=1.0, chunk_ms=CHUNK_MS):
+        self.pcm = pcm
+        self.chunk = SAMPLE_RATE * chunk_ms // 1000 * 2
+        self.total = int(total_sec * SAMPLE_RATE) * 2
+        self.speed = speed
+        self.pos = 0               # 누적 바이트
+        self._t0 = None
+
+    @property
+    def audio_s(self):
+        return self.pos / (2.0 * SAMPLE_RATE)
+
+    def describe(self):
+        return (f"soak loop: {len(self.pcm) / (2.0 * SAMPLE_RATE):.1f}s × "
+                f"{self.total / max(1, len(self.pcm)):.0f}, speed {self.speed or 'max'}")
+
+    async def open(self):
+        self._t0 = time.monotonic()
+
+    async def read(self) -> bytes:
+        if self.pos >= self.total:
+            return b""
+        if self.speed > 0:
+            delay = self._t0 + self.audio_s / self.speed - time.monotonic()
+            await asyncio.sleep(max(0.0, delay))
+        else:
+            await asyncio.sleep(0)
+        off = self.pos % len(self.pcm)
+        c = self.pcm[off: off + self.chunk]
+        if len(c) < self.chunk:
+            c += self.pcm[: self.chunk - len(c)]
+        self.pos += len(c)
+        return c
+
+    async def close(self):
+        pass
+
+
+# ===== 측정 =====
+def _proc(pid="self"):
+    """(rss MB, 스레드 수, fd 수, 파이프 fd 수) — /proc 없으면 None"""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+        threads = len(os.listdir(f"/proc/{pid}/task"))
+        fds = pipes = 0
+        for fd in os.listdir(f"/proc/{pid}/fd"):
+            fds += 1
+            try:
+                if os.readlink(f"/proc/{pid}/fd/{fd}").startswith("pipe:"):
+                    pipes += 1
+            except OSError:
+                pass
+        return rss, threads, fds, pipes
+    except (OSError, ValueError):
+        return None
+
+
+def _pct(vals, q):
+    if not vals:
+        return None
+    v = sorted(vals)
+    return v[min(len(v) - 1, int(len(v) * q))]
+
+
+class SoakSampler:
+    """파이프라인에 붙어 SOAK_SAMPLE_SEC 마다 한 줄씩 기록"""
+
+    def __init__(self, source, out_path=SOAK_OUT, every=SOAK_SAMPLE_SEC):
+        self.source = source
+        self.every = every
+        self.out_path = out_path
+        self.samples = []
+        self._lat = []            # 이번 구간 명령 지연(ms)
+        self._lags = []           # 이번 구간 이벤트 루프 지연(ms)
+        self._prev = {}           # 단계 → (processed, busy_s)
+        self.pipeline = None
+
+    def attach(self, pipeline):
+        self.pipeline = pipeline
+        pipeline.ack_hooks.append(lambda cmd, res, ms: self._lat.append(ms))
+        pipeline.extra_tasks.append(self.run)
+        return pipeline
+
+    async def run(self, pipeline=None):
+        f = open(self.out_path, "w") if self.out_path else None
+        t_start = time.monotonic()
+        next_t = t_start + self.every
+        try:
+            while True:
+                # 50ms 간격으로 잠들며 늦게 깨는 정도 = 이벤트 루프 지연(콜백/동기 코드가 루프를 막은 시간)
+                t = time.monotonic()
+                await asyncio.sleep(0.05)
+                self._lags.append(max(0.0, (time.monotonic() - t - 0.05) * 1000.0))
+                if time.monotonic() < next_t:
+                    continue
+                next_t += self.every
+                s = self.sample(time.monotonic() - t_start)
+                self.samples.append(s)
+                if f is not None:
+                    f.write(json.dumps(s, ensure_ascii=False) + "\n")
+                    f.flush()
+                if len(self.samples) % max(1, int(60 / self.every)) == 0:
+                    self.pipeline.tel("SOAK", _line(s))
+        finally:
+            if f is not None:
+                f.close()
+
+    def sample(self, wall):
+        m = self.pipeline.metrics()
+        s = {"wall_s": round(wall, 1), "audio_s": round(self.source.audio_s, 1),
+             "dispatched": m["counters"]["dispatched"], "frames_dropped": m["counters"]["frames_dropped"]}
+        p = _proc()
+        if p is not None:
+            s["rss_mb"], s["threads"], s["fds"], s["pipes"] = round(p[0], 2), p[1], p[2], p[3]
+        sup = getattr(self.pipeline.backend, "sup", None)
+        proc = getattr(sup, "proc", None)
+        if proc is not None:
+            c = _proc(proc.pid)
+            if c is not None:
+                s["server_rss_mb"] = round(c[0], 2)
+            s["restarts"] = sup.stats().get("restarts", 0)
+        for name in STAGES:
+            st = m.get(name)
+            if st is None:
+                continue
+            n0, b0 = self._prev.get(name, (0, 0.0))
+            dn, db = st["processed"] - n0, st["busy_s"] - b0
+            self._prev[name] = (st["processed"], st["busy_s"])
+            s[f"{name}_ms"] = round(db / dn * 1000.0, 3) if dn > 0 else None
+            s[f"{name}_q"] = st["queue_max"]
+            s[f"{name}_qnow"] = st["queue"]
+        for q, key in ((0.5, "cmd_p50_ms"), (0.99, "cmd_p99_ms")):
+            v = _pct(self._lat, q)
+            s[key] = None if v is None else round(v, 1)
+        s["cmd_n"] = len(self._lat)
+        s["loop_lag_p99_ms"] = round(_pct(self._lags, 0.99) or 0.0, 2)
+        s["loop_lag_max_ms"] = round(max(self._lags or [0.0]), 2)
+        self._lat = []
+        self._lags = []
+        return s
+
+
+def _line(s):
+    return (f"{s['audio_s'] / 3600.0:.2f}h audio / {s['wall_s'] / 60.0:.0f}min  rss={s.get('rss_mb')}MB "
+            f"thr={s.get('threads')} fds={s.get('fds')} pipes={s.get('pipes')} srv={s.get('server_rss_mb')}MB  "
+            f"cmd p99={s['cmd_p99_ms']}ms  asr={s.get('asr_ms')}ms/chunk  lag p99={s['loop_lag_p99_ms']}ms")
+
+
+# ===== 판정 =====
+def _med(vals):
+    vals = sorted(v for v in vals if v is not None)
+    return vals[len(vals) // 2] if vals else None
+
+
+def analyze(samples, warmup=SOAK_WARMUP, segments=SOAK_SEGMENTS, drift=SOAK_P99_DRIFT):
+    """[(종류, 지표, 설명)] — 종류: growth | drift | backlog"""
+    xs = samples[int(len(samples) * warmup):]
+    flags = []
+    if len(xs) < segments * 2:
+        return [("short", "-", f"샘플 {len(xs)}개 → 판정하려면 {segments * 2}개 이상 필요")]
+    seg = len(xs) // segments
+    parts = [xs[i * seg:(i + 1) * seg] for i in range(segments)]
+    for key, min_inc in GROWTH_MIN.items():
+        meds = [_med(s.get(key) for s in p) for p in parts]
+        if any(m is None for m in meds):
+            continue
+        ups = sum(b >= a for a, b in zip(meds, meds[1:]))
+        inc = meds[-1] - meds[0]
+        if ups >= (segments - 1) * 0.85 and inc >= max(min_inc, abs(meds[0]) * 0.05):
+            flags.append(("growth", key, f"{meds[0]} → {meds[-1]} (구간 중앙값 {ups}/{segments - 1} 증가)"))
+    q = max(1, len(xs) // 4)
+    head, tail = xs[:q], xs[-q:]
+    lat_keys = list(DRIFT_MIN_MS) + [f"{n}_ms" for n in STAGES]
+    for key in lat_keys:
+        a = _pct([s[key] for s in head if s.get(key) is not None], 0.99)
+        b = _pct([s[key] for s in tail if s.get(key) is not None], 0.99)
+        if a is None or b is None:
+            continue
+        if b > a * (1.0 + drift) and b - a >= DRIFT_MIN_MS.get(key, 1.0):
+            flags.append(("drift", key, f"p99 {a:.2f} → {b:.2f}ms (+{(b / a - 1.0) * 100.0 if a else 0:.0f}%)"))
+    for name in STAGES:
+        a = max((s.get(f"{name}_qnow") or 0 for s in head), default=0)
+        b = max((s.get(f"{name}_qnow") or 0 for s in tail), default=0)
+        if b >= 4 and b >= a * 2:
+            flags.append(("backlog", f"{name}_q", f"큐 깊이 최대 {a} → {b}"))
+    return flags
+
+
+def make_backend():
+    if os.path.exists(SOAK_SERVER_BIN):
+        from motion_backends import ActionServerBackend
+        return ActionServerBackend(os.path.abspath(SOAK_SERVER_BIN), iface="sim", sudo=(), env=dict(os.environ),
+                                   echo=False, name="go2_action_server[sim]")
+    print(f"[WARN] {SOAK_SERVER_BIN} 없음 → dry-run 백엔드(서버 프로세스/파이프 없이). "
+          f"빌드: g++ -O2 -std=c++14 -DGO2_DRY go2_action_server.cpp -o go2_action_server_dry")
+    from session_replay import DryRunBackend
+    return DryRunBackend()
+
+
+def main():
+    paths = [p.strip() for p in SOAK_AUDIO.split(",") if p.strip()]
+    source = LoopSource(load_loop(paths), SOAK_HOURS * 3600.0, speed=SOAK_SPEED)
+    sampler = SoakSampler(source)
+    pipeline = Pipeline(source, asr_from_env(VOSK_MODEL_DIR), make_backend(),
+                        vad=default_vad(),
+                        # 배속 재생에서는 벽시계 기준 디바운스가 현장과 달라지므로 실시간일 때만 켠다
+                        debouncer=Debouncer(1.5, 3.0) if SOAK_SPEED == 1 else Debouncer(0.0, 0.0),
+                        quit_intent=None,
+                        show_partial=False)
+    sampler.attach(pipeline)
+    t0 = time.monotonic()
+    pipeline.run()
+    xs = sampler.samples
+    print(f"[SOAK] {source.audio_s / 3600.0:.2f}h audio in {(time.monotonic() - t0) / 60.0:.1f}min, "
+          f"{len(xs)} samples → {SOAK_OUT}")
+    if xs:
+        print(f"[SOAK] first: {_line(xs[0])}")
+        print(f"[SOAK] last : {_line(xs[-1])}")
+    flags = analyze(xs)
+    for kind, key, msg in flags:
+        print(f"[SOAK][FLAG] {kind:<7} {key:<16} {msg}")
+    if not flags:
+        print("[SOAK] OK: 자원 증가/지연 drift 없음")
+    sys.exit(1 if any(k != "short" for k, _, _ in flags) else 0)
+
+
+if __name__ == "__main__":
+    main()
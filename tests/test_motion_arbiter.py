@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# 동작 중재기: 정지 선점, 등급별 임대 빼앗기, 같은 등급 번갈아 실행, move 교체, 끊기면 정지, 응답 시간 초과
+import asyncio
+import json
+
+from motion_arbiter import Arbiter
+from motion_events import MotionEvents
+
+
+class _Sup:
+    """MotionSupervisor 대역: 보낸 줄을 모으고, hold 가 아니면 바로 서버 응답을 흉내 낸다"""
+
+    def __init__(self, events, hold=False):
+        self.events = events
+        self.hold = hold
+        self.sent = []
+        self._waiting = []
+
+    def send(self, line):
+        req = json.loads(line)
+        self.sent.append(req)
+        self._waiting.append(req)
+        if not self.hold:
+            self.reply_all()
+        return True
+
+    def reply_all(self):
+        waiting, self._waiting = self._waiting, []
+        for req in waiting:
+            self.events.feed(json.dumps({"ok": True, "action": req.get("action", "batch"), "id": req["id"]}))
+
+
+class _Backend:
+    def __init__(self, hold=False):
+        self.events = MotionEvents()
+        self.sup = _Sup(self.events, hold)
+
+
+def _actions(sup):
+    return [r.get("action") for r in sup.sent]
+
+
+async def _settle(n=5):
+    for _ in range(n):
+        await asyncio.sleep(0)
+
+
+def _with_arbiter(fn, hold=False, **kw):
+    async def main():
+        b = _Backend(hold)
+        arb = Arbiter(b, classes=["teleop", "voice", "script"], **kw)
+        task = asyncio.get_running_loop().create_task(arb.run())
+        await _settle()
+        try:
+            return await fn(arb, b.sup)
+        finally:
+            task.cancel()
+    return asyncio.run(main())
+
+
+def test_stop_preempts_queue_and_goes_out_immediately():
+    async def body(arb, sup):
+        v = arb.add_client("voice", "voice", lambda d: None)
+        futs = [arb.submit(v, {"action": a}, i) for i, a in enumerate(("hello", "sit", "heart"))]
+        await _settle()
+        assert _actions(sup) == ["hello"]              # 서버가 아직 hello 를 처리 중
+        stop = arb.submit(v, {"action": "stop"}, 9)
+        await _settle()
+        assert _actions(sup) == ["hello", "stop"]      # 줄 서지 않고 바로
+        assert (await futs[1])["error"] == "preempted"
+        assert (await futs[2])["error"] == "preempted"
+        sup.reply_all()
+        assert (await stop)["ok"] and (await futs[0])["ok"]
+        assert arb.stops == 1 and v.counts["preempted"] == 2
+    _with_arbiter(body, hold=True)
+
+
+def test_lease_taken_over_only_by_higher_rank():
+    async def body(arb, sup):
+        events = []
+        s = arb.add_client("demo", "script", events.append)
+        v = arb.add_client("voice", "voice", lambda d: None)
+        t = arb.add_client("joy", "teleop", lambda d: None)
+        assert arb.request_lease(s, 10)["ok"]
+        assert (await arb.submit(v, {"action": "sit"}))["error"] == "leased"
+        assert arb.request_lease(t, 5)["ok"]           # 더 높은 등급이 빼앗음
+        assert events == [{"event": "lease_lost", "by": "joy"}]
+        r = arb.request_lease(v, 5)
+        assert not r["ok"] and r["error"] == "leased" and r["holder"] == "joy"
+        assert (await arb.submit(t, {"action": "hello"}))["ok"]
+        arb.release(t)
+        assert (await arb.submit(v, {"action": "sit"}))["ok"]
+    _with_arbiter(body)
+
+
+def test_strict_priority_then_round_robin_within_class():
+    async def body(arb, sup):
+        a = arb.add_client("a", "voice", lambda d: None)
+        b = arb.add_client("b", "voice", lambda d: None)
+        s = arb.add_client("s", "script", lambda d: None)
+        t = arb.add_client("t", "teleop", lambda d: None)
+        first = arb.submit(s, {"action": "bow"})       # 서버를 잡아 두고 나머지를 줄 세움
+        await _settle()
+        futs = [arb.submit(s, {"action": "heart"}),
+                arb.submit(a, {"action": "sit", "n": 1}), arb.submit(a, {"action": "sit", "n": 2}),
+                arb.submit(b, {"action": "hello", "n": 1}), arb.submit(b, {"action": "hello", "n": 2}),
+                arb.submit(t, {"action": "stand"})]
+        for _ in range(8):
+            sup.reply_all()
+            await _settle()
+        await asyncio.gather(first, *futs)
+        order = [(r["action"], r.get("n")) for r in sup.sent]
+        assert order == [("bow", None), ("stand", None), ("sit", 1), ("hello", 1), ("sit", 2), ("hello", 2),
+                         ("heart", None)]
+    _with_arbiter(body, hold=True)
+
+
+def test_queued_move_is_superseded():
+    async def body(arb, sup):
+        v = arb.add_client("voice", "voice", lambda d: None)
+        busy = arb.submit(v, {"action": "hello"})
+        await _settle()
+        m1 = arb.submit(v, {"action": "move", "vx": 0.2})
+        m2 = arb.submit(v, {"action": "move", "vx": 0.4})
+        assert (await m1)["error"] == "superseded"
+        for _ in range(3):
+            sup.reply_all()
+            await _settle()
+        await asyncio.gather(busy, m2)
+        assert [r.get("vx") for r in sup.sent if r["action"] == "move"] == [0.4]
+        assert v.counts["superseded"] == 1
+    _with_arbiter(body, hold=True)
+
+
+def test_disconnect_while_moving_sends_stop_move():
+    async def body(arb, sup):
+        v = arb.add_client("voice", "voice", lambda d: None)
+        assert (await arb.submit(v, {"action": "move", "vx": 0.3}))["ok"]
+        assert arb.moving_by == "voice"
+        arb.remove_client(v)
+        await _settle()
+        last = sup.sent[-1]
+        assert last["action"] == "move" and last["vx"] == 0.0 and last["vyaw"] == 0.0
+        assert arb.moving_by is None and "voice" in arb.gone
+    _with_arbiter(body)
+
+
+def test_exec_timeout_forgets_request_id():
+    async def body(arb, sup):
+        v = arb.add_client("voice", "voice", lambda d: None)
+        res = await arb.submit(v, {"action": "sit"})
+        assert res["error"] == "timeout"
+        assert arb._pending == {}
+    _with_arbiter(body, hold=True, exec_timeout=0.05)
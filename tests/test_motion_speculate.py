@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# 추측 준비: "/prep" 줄만 보내고, 적중(전송)/빗나감(준비 취소) 판정과 점수 캐시 비사용 확인
+import asyncio
+
+from motion_speculate import SpeculativeBackend
+from voice_nlp import score_cache
+from voice_pipeline import Debouncer, Pipeline
+
+
+class _Source:
+    def __init__(self, n, gap=0.0):
+        self.n = n
+        self.gap = gap
+
+    def describe(self):
+        return "test source"
+
+    async def open(self):
+        pass
+
+    async def read(self):
+        if self.n <= 0:
+            return b""
+        self.n -= 1
+        await asyncio.sleep(self.gap)
+        return b"\0" * 3200
+
+    async def close(self):
+        pass
+
+
+class _Asr:
+    def __init__(self, script):
+        self.script = list(script)
+
+    def load(self):
+        pass
+
+    def accept(self, pcm):
+        return self.script.pop(0) if self.script else None
+
+    def flush(self):
+        return []
+
+
+class _Motion2:
+    """Motion2Backend 대역: 보낸 줄과 dispatch 된 의도만 기록"""
+    name = "go2_motion2"
+
+    def __init__(self, posture="stand"):
+        self.posture = posture
+        self.lines = []
+        self.sent = []
+
+    def send_line(self, line):
+        self.lines.append(line)
+
+    def dispatch(self, cmd):
+        self.sent.append(cmd.intent.name)
+        return cmd.intent.motion_for(self.posture)
+
+
+def _run(script, backend, n=None, gap=0.0, cooldown=0.0, timeout_sec=3.0):
+    p = Pipeline(_Source(n or len(script) + 1, gap), _Asr(script), backend,
+                 debouncer=Debouncer(cooldown, cooldown), quit_intent=None, show_partial=False)
+    spec = SpeculativeBackend(backend, timeout_sec=timeout_sec)
+    spec.attach(p)
+    p.run()
+    return spec
+
+
+def test_hit_sends_prep_then_command():
+    b = _Motion2("stand")
+    spec = _run([("partial", "점프"), ("partial", "점프"), ("final", [("점프", 1.0)])], b)
+    assert b.lines == ["/prep 13"]
+    assert b.sent == ["front_jump"]
+    assert (spec.hits, spec.misses) == (1, 0)
+
+
+def test_moving_prep_is_never_sent():
+    # 앉아 있을 때 "일어서": 본 동작(RiseSit)을 추측으로 보내지 않는다
+    b = _Motion2("sit")
+    spec = _run([("partial", "일어서"), ("partial", "일어서"), ("final", [("일어서", 1.0)])], b)
+    assert b.lines == []
+    assert b.sent == ["stand_up"] and spec.attempts == 0
+
+
+def test_other_final_cancels_prep():
+    b = _Motion2("stand")
+    spec = _run([("partial", "점프"), ("partial", "점프"), ("final", [("인사", 1.0)])], b)
+    assert b.lines == ["/prep 13", "/prep 0"]
+    assert b.sent == ["hello"]
+    assert (spec.hits, spec.misses, spec.rollbacks) == (0, 1, 1)
+
+
+def test_debounced_final_is_a_miss():
+    # 같은 의도가 확정됐지만 디바운스로 전송되지 않음 → 준비 취소, 빗나감
+    b = _Motion2("stand")
+    script = [("final", [("점프", 1.0)]), ("partial", "점프"), ("partial", "점프"), ("final", [("점프", 1.0)])]
+    spec = _run(script, b, n=12, gap=0.05, cooldown=5.0)
+    assert b.sent == ["front_jump"]
+    assert b.lines == ["/prep 13", "/prep 0"]
+    assert (spec.hits, spec.misses) == (0, 1)
+
+
+def test_partials_bypass_score_cache():
+    b = _Motion2("stand")
+    before = score_cache.stats()
+    _run([("partial", "점프 하자"), ("partial", "점프 하자 빨리")], b)
+    after = score_cache.stats()
+    assert (after["hits"], after["misses"]) == (before["hits"], before["misses"])
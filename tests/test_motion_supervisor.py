@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# 프로세스 감시기: 죽으면 백오프 후 재실행 → 상태 복원 줄 → 버퍼 명령 순서, 재실행 중 다시 죽으면 버림으로 셈
+import sys
+import threading
+import time
+
+from motion_supervisor import MotionSupervisor
+
+# 받은 줄을 "got <줄>" 로 되돌려 주고 "die" 면 종료하는 짧은 자식 프로세스
+CHILD = [sys.executable, "-u", "-c",
+         "import sys\n"
+         "for l in sys.stdin:\n"
+         "    l = l.strip(); print('got', l, flush=True)\n"
+         "    if l == 'die': sys.exit(3)\n"]
+
+
+class _Lines:
+    def __init__(self):
+        self.lines = []
+        self.cv = threading.Condition()
+
+    def __call__(self, line):
+        with self.cv:
+            self.lines.append(line.strip())
+            self.cv.notify_all()
+
+    def wait_for(self, line, timeout=5.0):
+        with self.cv:
+            return self.cv.wait_for(lambda: line in self.lines, timeout)
+
+
+def _sup(out, **kw):
+    return MotionSupervisor(CHILD, name="child", on_line=out, echo=False, replay=lambda: ["/pending sit"],
+                            backoff_min=0.05, backoff_max=0.2, **kw)
+
+
+def test_restart_replays_state_then_flushes_buffer():
+    out = _Lines()
+    sup = _sup(out)
+    sup.start()
+    try:
+        assert sup.send("3")
+        sup.send("die")
+        assert out.wait_for("got die")
+        t0 = time.time()
+        while sup.proc is not None and time.time() - t0 < 2.0:
+            time.sleep(0.005)
+        assert sup.send("1") is False          # 내려가 있는 동안은 버퍼로
+        assert out.wait_for("got 1")
+        assert out.lines == ["got 3", "got die", "got /pending sit", "got 1"]
+        assert sup.restarts == 1 and sup.last_exit_code == 3 and sup.dropped == 0
+        assert sup.send("2") and out.wait_for("got 2")
+    finally:
+        sup.stop(quit_line=None, timeout=1.0)
+        if sup.proc is not None and sup.proc.poll() is None:
+            sup.proc.kill()
+
+
+def test_stale_buffered_command_is_dropped():
+    out = _Lines()
+    sup = _sup(out, buffer_ttl=0.0)
+    sup.start()
+    try:
+        sup.send("die")
+        assert out.wait_for("got die")
+        while sup.proc is not None:
+            time.sleep(0.005)
+        sup.send("old")
+        assert out.wait_for("got /pending sit")
+        t0 = time.time()
+        while sup.restarts == 0 and time.time() - t0 < 2.0:
+            time.sleep(0.005)
+        assert sup.dropped == 1 and "got old" not in out.lines
+    finally:
+        sup.stop(quit_line=None, timeout=1.0)
+        if sup.proc is not None and sup.proc.poll() is None:
+            sup.proc.kill()
+
+
+class _DeadPipe:
+    def write(self, s):
+        raise BrokenPipeError()
+
+    def flush(self):
+        pass
+
+
+class _DyingProc:
+    """재실행됐지만 복원 줄을 쓰는 사이 다시 죽은 프로세스(파이프 끊김, 펌프는 아직 EOF 전)"""
+    stdin = _DeadPipe()
+
+    def poll(self):
+        return None
+
+
+def test_lines_lost_to_a_dying_helper_are_counted():
+    sup = _sup(lambda line: None)
+    sup.proc = _DyingProc()
+    sup._warming = True
+    sup._down_since = time.time()
+    sup._buf.extend([(time.time(), "1"), (time.time(), "8")])
+    sup._warm_up()
+    assert sup.dropped == 2 and not sup._buf and sup._warming is False
+
+
+def test_helper_already_dead_again_keeps_buffer():
+    # 새 프로세스가 벌써 죽어 proc 가 비었으면 다음 재실행이 전달하도록 버퍼를 남김
+    sup = _sup(lambda line: None)
+    sup._warming = True
+    sup._buf.append((time.time(), "1"))
+    sup._warm_up()
+    assert len(sup._buf) == 1 and sup.dropped == 0 and sup._warming is True
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# 점수화 회귀: 단일 결과 확률, 번호로 부르기("이번" 은 번호가 아님), 점수 캐시 적중/무효화
+from voice_nlp import (ScoreCache, best_intent, load_catalog, normalize_korean, result_hypotheses,
+                       score_hypotheses, score_intents)
+
+TABLES = load_catalog()
+
+
+def _scores(text):
+    return score_intents(normalize_korean(text), TABLES)
+
+
+def test_single_result_keeps_full_probability():
+    # 후보가 하나뿐인 결과는 prob=1.0 이어야 MIN_SCORE 아래로 깎이지 않는다
+    hyps = result_hypotheses({"text": "앉아", "result": [{"word": "앉아", "conf": 0.4}]})
+    assert hyps == [("앉아", 1.0)]
+    scores, norm = score_hypotheses(hyps, TABLES)
+    it, _ = best_intent(scores, TABLES)
+    assert norm == "앉아" and it.name == "sit"
+    assert result_hypotheses({"text": "앉아", "result": [{"conf": 0.4}]}, word_conf=True) == [("앉아", 0.4)]
+
+
+def test_alternatives_are_softmaxed():
+    hyps = result_hypotheses({"alternatives": [{"text": "앉아", "confidence": 10.0},
+                                               {"text": "안자", "confidence": 10.0}]})
+    assert [p for _, p in hyps] == [0.5, 0.5]
+
+
+def test_numbers():
+    assert _scores("세번째") == {"sit": 2.0}
+    assert _scores("2번") == {"stand_down": 2.0}
+    assert _scores("이번") == {"stand_down": 2.0}
+    assert _scores("이번 동작") == {"stand_down": 2.0}
+    # 한 글자 수사는 접미사 없이 번호가 아니다
+    assert _scores("오 앉아") == {"sit": 2.0}
+
+
+def test_this_time_is_not_a_number():
+    # "이번"(this time) 뒤에 다른 의도 단서가 있으면 2번 동작으로 읽지 않는다
+    assert _scores("이번에 앉아") == {"sit": 2.0}
+    scores = _scores("이번 거 말고 엎드려")
+    assert set(scores) == {"stand_down"} and scores["stand_down"] == 2.0
+    assert _scores("이번 3번") == {"sit": 2.0}
+
+
+def test_score_cache_hits_and_invalidation():
+    cache = ScoreCache(maxsize=2)
+    a = cache.lookup("앉아", TABLES)
+    assert cache.lookup("앉아", TABLES) is a
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.lookup("엎드려", TABLES)
+    cache.lookup("인사해", TABLES)
+    assert cache.evictions == 1 and cache.stats()["size"] == 2
+    # 카탈로그가 다시 읽히면(버전 변경) 예전 점수표를 쓰지 않는다
+    newer = load_catalog(version=TABLES.version + 1)
+    assert cache.lookup("앉아", newer) is not a
+    assert cache.invalidations == 1 and cache.stats()["size"] == 1
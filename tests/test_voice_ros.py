@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# VoiceNode 를 ros_standin 으로 띄워 파이프라인 한 바퀴 → asr/intent/ack 토픽 본문(JSON) 확인
+import json
+
+import pytest
+
+import ros_standin
+from voice_pipeline import Debouncer, Pipeline
+from voice_ros import VoiceNode
+
+
+class _Source:
+    """조용한 청크 n 개 뒤 EOF"""
+
+    def __init__(self, n):
+        self.n = n
+
+    def describe(self):
+        return "test source"
+
+    async def open(self):
+        pass
+
+    async def read(self):
+        if self.n <= 0:
+            return b""
+        self.n -= 1
+        return b"\0" * 3200
+
+    async def close(self):
+        pass
+
+
+class _Asr:
+    """청크마다 정해 둔 인식 결과를 차례로 돌려주는 대역"""
+
+    def __init__(self, script):
+        self.script = list(script)
+
+    def load(self):
+        pass
+
+    def accept(self, pcm):
+        return self.script.pop(0) if self.script else None
+
+    def flush(self):
+        return []
+
+
+class _Backend:
+    name = "test"
+
+    def dispatch(self, cmd):
+        if cmd.intent.name == "sit":
+            return "sit ok"
+        if cmd.intent.name == "stand_up":
+            raise RuntimeError("link down")
+        return None
+
+
+@pytest.fixture
+def topics():
+    got = {}
+    node = VoiceNode(standin=True, ns="/voice")
+    for k in ("asr/partial", "asr/final", "intent", "ack"):
+        node.node.create_subscription(ros_standin.String, f"/voice/{k}",
+                                      lambda m, k=k: got.setdefault(k, []).append(json.loads(m.data)), 10)
+    yield node, got
+    node.close()
+
+
+def test_voice_node_publishes_pipeline_events(topics):
+    node, got = topics
+    script = [("partial", "앉"), ("final", [("앉아", 0.9), ("안자", 0.1)]),
+              None, ("final", [("일어서", 1.0)])]
+    p = Pipeline(_Source(6), _Asr(script), _Backend(), debouncer=Debouncer(0.0, 0.0),
+                 quit_intent=None, show_partial=False)
+    node.attach(p)
+    p.run()
+
+    assert got["asr/partial"][0]["text"] == "앉"
+    final = got["asr/final"][0]
+    assert final["text"] == "앉아"
+    assert final["hyps"] == [["앉아", 0.9], ["안자", 0.1]]
+    assert [d["intent"] for d in got["intent"]] == ["sit", "stand_up"]
+    assert got["intent"][0]["text"] == "앉아" and got["intent"][0]["score"] > 0
+
+    ok, err = got["ack"]
+    assert ok["intent"] == "sit" and ok["ok"] is True and ok["result"] == "sit ok"
+    assert ok["latency_ms"] >= 0.0
+    # 디스패치 예외: 미지원(None)과 구분해 error 문자열로
+    assert err["intent"] == "stand_up" and err["ok"] is False and err["result"] is None
+    assert "link down" in err["error"]
+
+
+def test_unsupported_intent_acks_not_ok(topics):
+    node, got = topics
+    p = Pipeline(_Source(2), _Asr([("final", [("인사", 1.0)])]), _Backend(), quit_intent=None, show_partial=False)
+    node.attach(p)
+    p.run()
+    (ack,) = got["ack"]
+    assert ack["ok"] is False and ack["result"] is None and "error" not in ack
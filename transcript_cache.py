@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+녹음 → Vosk 인식 결과 영구 캐시(키워드 표/normalize_korean 만 바꿨을 때 코퍼스를 다시 디코딩하지 않도록)
+- 키 = 오디오 내용 sha1(16kHz mono PCM, 파일 이름/위치 무관) + 인식기 키
+  인식기 키 = 모델 경로 + 모델 파일 목록(이름/크기/mtime) + vosk 버전 + rate/max_alt/문법 + VAD/청크 설정
+  → 모델을 바꾸거나 다시 받으면 자동으로 새로 디코딩, 같은 녹음을 복사/이름 변경해도 재사용
+- 값 = 파이프라인과 같은 순서(VAD → 100ms 청크 → accept/flush)로 얻은 이벤트 목록
+    ["p", 오디오 초, 파셜 문장]  /  ["f", 오디오 초, Vosk 최종 결과 JSON 그대로(alternatives, 단어 신뢰도)]
+  최종 결과를 원문 그대로 두므로 alt_temp(n-best 확률 변환)나 점수화 규칙을 바꿔도 캐시는 그대로 유효
+- 저장: sqlite 파일 하나(TRANSCRIPT_CACHE, 빈 값이면 끔)
+"""
+import os
+import sys
+import json
+import time
+import wave
+import sqlite3
+import hashlib
+
+from voice_pipeline import SAMPLE_RATE, CHUNK_MS, VAD_THRESHOLD, EnergyVad
+
+TRANSCRIPT_CACHE = os.environ.get("TRANSCRIPT_CACHE", os.path.expanduser("~/.cache/go2voice/transcripts.sqlite"))
+_VERSION = 1     # 값 형식이 바뀌면 올린다(인식기 키에 포함)
+
+
+def read_pcm(path):
+    """.raw(16kHz mono int16) 또는 .wav → 16kHz mono PCM. 다른 레이트/채널 wav 는 audio_frontend 로 변환."""
+    if not path.lower().endswith(".wav"):
+        with open(path, "rb") as f:
+            return f.read()
+    with wave.open(path, "rb") as w:
+        if w.getsampwidth() != 2:
+            raise ValueError(f"16bit PCM wav 만 지원: {path}")
+        rate, ch = w.getframerate(), w.getnchannels()
+        pcm = w.readframes(w.getnframes())
+    if rate == SAMPLE_RATE and ch == 1:
+        return pcm
+    from audio_frontend import capture_frontend
+    return capture_frontend(rate, ch, mix="avg").process(pcm)
+
+
+def audio_hash(pcm: bytes) -> str:
+    return hashlib.sha1(pcm).hexdigest()
+
+
+def model_fingerprint(model_dir):
+    """모델 폴더의 파일 이름/크기/mtime 해시(내용을 다 읽지 않음)"""
+    h = hashlib.sha1()
+    for root, dirs, files in os.walk(model_dir):
+        dirs.sort()
+        for name in sorted(files):
+            p = os.path.join(root, name)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            h.update(f"{os.path.relpath(p, model_dir)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+def _vosk_version():
+    try:
+        from importlib.metadata import version
+        return version("vosk")
+    except Exception:
+        return "?"
+
+
+def asr_key(model_dir, rate=SAMPLE_RATE, max_alt=5, grammar=None, vad_threshold=VAD_THRESHOLD):
+    """인식 결과를 바꿀 수 있는 설정 전부 → 짧은 키. 설정 내용(dict)도 함께 돌려준다."""
+    settings = {"v": _VERSION, "model": os.path.realpath(model_dir), "model_files": model_fingerprint(model_dir),
+                "vosk": _vosk_version(), "rate": rate, "max_alt": max_alt, "grammar": grammar,
+                "vad": vad_threshold, "chunk_ms": CHUNK_MS}
+    raw = json.dumps(settings, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode()).hexdigest()[:20], settings
+
+
+def decode(rec, pcm, vad_threshold=VAD_THRESHOLD, rate=SAMPLE_RATE):
+    """
+    로드된 KaldiRecognizer 로 녹음 하나를 파이프라인과 같은 순서로 디코딩 → 이벤트 목록.
+    VoskAsr.accept/flush 와 같은 규칙(같은 파셜 반복은 한 번만, VAD 'end' 에서 강제 확정).
+    """
+    chunk = rate * CHUNK_MS // 1000 * 2
+    vad = EnergyVad(vad_threshold) if vad_threshold > 0 else None
+    events = []
+    last_partial = ""
+    t = 0.0
+
+    def final(res):
+        nonlocal last_partial
+        last_partial = ""
+        d = json.loads(res)
+        if (d.get("text") or "").strip() or any((a.get("text") or "").strip() for a in d.get("alternatives") or []):
+            events.append(["f", round(t, 2), d])
+
+    for off in range(0, len(pcm) - 1, chunk):
+        c = pcm[off: off + chunk]
+        t += len(c) / (2.0 * rate)
+        for p, flag in (vad.feed(c) if vad is not None else [(c, "mid")]):
+            if rec.AcceptWaveform(p):
+                final(rec.Result())
+                continue
+            ptxt = (json.loads(rec.PartialResult()).get("partial") or "").strip()
+            if ptxt and ptxt != last_partial:
+                last_partial = ptxt
+                events.append(["p", round(t, 2), ptxt])
+            if flag == "end":
+                final(rec.FinalResult())
+    final(rec.FinalResult())
+    return events
+
+
+class TranscriptCache:
+    """(오디오 sha1, 인식기 키) → 이벤트 목록. get/put 은 메모리 안에서 모았다가 commit() 에 한 번에 쓴다."""
+
+    def __init__(self, path=TRANSCRIPT_CACHE):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.db = sqlite3.connect(path)
+            self.db.execute("CREATE TABLE IF NOT EXISTS transcripts (audio TEXT, asr TEXT, created REAL, "
+                            "events TEXT, PRIMARY KEY (audio, asr))")
+            self.db.execute("CREATE TABLE IF NOT EXISTS asr_keys (asr TEXT PRIMARY KEY, settings TEXT)")
+
+    def get(self, audio, key):
+        row = None
+        if self.db is not None:
+            row = self.db.execute("SELECT events FROM transcripts WHERE audio=? AND asr=?", (audio, key)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, audio, key, events):
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO transcripts VALUES (?,?,?,?)",
+                            (audio, key, time.time(), json.dumps(events, ensure_ascii=False)))
+
+    def register(self, key, settings):
+        if self.db is not None:
+            self.db.execute("INSERT OR IGNORE INTO asr_keys VALUES (?,?)",
+                            (key, json.dumps(settings, ensure_ascii=False)))
+
+    def commit(self):
+        if self.db is not None:
+            self.db.commit()
+
+    def close(self):
+        if self.db is not None:
+            self.db.commit()
+            self.db.close()
+            self.db = None
+
+    def stats(self) -> dict:
+        st = {"path": self.path, "hits": self.hits, "misses": self.misses}
+        if self.db is not None:
+            st["entries"] = self.db.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+            st["asr_keys"] = self.db.execute("SELECT COUNT(*) FROM asr_keys").fetchone()[0]
+        return st
+
+
+class CachedTranscriber:
+    """녹음 PCM → 이벤트 목록. 캐시에 없을 때만 Vosk 를 불러 디코딩한다(모델은 처음 필요할 때 로드)."""
+
+    def __init__(self, model_dir, cache=None, rate=SAMPLE_RATE, max_alt=5, grammar=None,
+                 vad_threshold=VAD_THRESHOLD, refresh=False):
+        self.model_dir = model_dir
+        self.cache = cache if cache is not None else TranscriptCache()
+        self.rate = rate
+        self.max_alt = max_alt
+        self.grammar = grammar
+        self.vad_threshold = vad_threshold
+        self.refresh = refresh
+        self.key, settings = asr_key(model_dir, rate, max_alt, grammar, vad_threshold)
+        self.cache.register(self.key, settings)
+        self._model = None
+        self.decode_s = 0.0
+        self.decoded = 0
+
+    def _recognizer(self):
+        try:
+            import vosk
+        except ImportError:
+            print("[ERR] pip install vosk", file=sys.stderr); sys.exit(2)
+        if self._model is None:
+            if not os.path.isdir(self.model_dir):
+                print(f"[ERR] VOSK 모델 폴더가 없습니다: {self.model_dir}", file=sys.stderr)
+                sys.exit(2)
+            print(f"[INFO] load vosk model: {self.model_dir}")
+            self._model = vosk.Model(self.model_dir)
+        if self.grammar:
+            rec = vosk.KaldiRecognizer(self._model, self.rate, self.grammar)
+        else:
+            rec = vosk.KaldiRecognizer(self._model, self.rate)
+        rec.SetWords(True)
+        if self.max_alt > 0:
+            rec.SetMaxAlternatives(self.max_alt)
+        return rec
+
+    def transcribe(self, pcm):
+        """→ (이벤트 목록, 캐시 적중 여부)"""
+        h = audio_hash(pcm)
+        if not self.refresh:
+            events = self.cache.get(h, self.key)
+            if events is not None:
+                return events, True
+        t0 = time.perf_counter()
+        events = decode(self._recognizer(), pcm, self.vad_threshold, self.rate)
+        self.decode_s += time.perf_counter() - t0
+        self.decoded += 1
+        self.cache.put(h, self.key, events)
+        if self.decoded % 50 == 0:
+            self.cache.commit()      # 긴 디코딩 중에 끊겨도 그때까지는 남도록
+        return events, False
+
+    def close(self):
+        self.cache.close()
@@ -1,60 +1,270 @@
 # voice_diag.py
-import os, sys, json, subprocess, time, traceback
+# 캡처 경로 진단: 읽기 도착 간격(지터), overrun(xrun), 실제 샘플레이트 오차(drift), Vosk 실시간 계수(RTF)
+#   python3 voice_diag.py                          # 마이크 20초
+#   DIAG_FILE=/tmp/test.raw python3 voice_diag.py  # 장치 대신 파일(실시간 속도로 흘림)
+#   DIAG_JSON=/tmp/diag_$(hostname).json ...       # 보드/장치 설정 비교용 JSON
+import os, sys, json, subprocess, time, threading, queue, platform, math, traceback
 
 VOSK_MODEL_DIR = os.environ.get("VOSK_MODEL_DIR", "/models/vosk-ko")
 MIC_DEVICE     = os.environ.get("MIC_DEVICE", "plughw:0,0")  # 필요시 변경
+MIC_RATE       = int(os.environ.get("MIC_RATE", "16000"))
+MIC_CHANNELS   = int(os.environ.get("MIC_CHANNELS", "1"))
+DIAG_SEC       = float(os.environ.get("DIAG_SEC", "20"))      # 측정 시간
+DIAG_FILE      = os.environ.get("DIAG_FILE", "")              # 장치 대신 raw 파일
+DIAG_JSON      = os.environ.get("DIAG_JSON", "")
+DIAG_ASR       = os.environ.get("DIAG_ASR", "1") not in ("0", "false")
+CHUNK_MS       = 100
 
 print("[INFO] Python:", sys.executable)
 print("[INFO] Python ver:", sys.version)
 print("[INFO] VOSK_MODEL_DIR:", VOSK_MODEL_DIR)
-print("[INFO] MIC_DEVICE:", MIC_DEVICE)
+print("[INFO] MIC_DEVICE:", MIC_DEVICE if not DIAG_FILE else f"(file) {DIAG_FILE}")
 
-try:
-    import vosk
-    print("[OK] vosk import")
-except Exception as e:
-    print("[ERR] import vosk failed:", repr(e))
-    sys.exit(2)
+chunk_bytes = int(MIC_RATE * CHUNK_MS / 1000) * 2 * MIC_CHANNELS
+bytes_per_sec = MIC_RATE * 2 * MIC_CHANNELS
 
-if not os.path.isdir(VOSK_MODEL_DIR):
-    print("[ERR] model dir not found:", VOSK_MODEL_DIR)
-    sys.exit(2)
+# ===== Vosk (선택) =====
+rec = None
+if DIAG_ASR:
+    try:
+        import vosk
+        print("[OK] vosk import")
+    except Exception as e:
+        print("[ERR] import vosk failed:", repr(e))
+        sys.exit(2)
+    if not os.path.isdir(VOSK_MODEL_DIR):
+        print("[ERR] model dir not found:", VOSK_MODEL_DIR)
+        sys.exit(2)
+    try:
+        t0 = time.perf_counter()
+        model = vosk.Model(VOSK_MODEL_DIR)
+        rec   = vosk.KaldiRecognizer(model, 16000)
+        model_load_s = time.perf_counter() - t0
+        print(f"[OK] vosk model loaded ({model_load_s:.1f}s)")
+    except Exception as e:
+        print("[ERR] vosk load failed:", repr(e))
+        sys.exit(2)
+    if MIC_RATE != 16000 or MIC_CHANNELS != 1:
+        from audio_frontend import capture_frontend
+        frontend = capture_frontend(MIC_RATE, MIC_CHANNELS, mix="avg")
+        print("[INFO]", frontend.describe())
+    else:
+        frontend = None
+else:
+    model_load_s = None
+    frontend = None
 
-try:
-    model = vosk.Model(VOSK_MODEL_DIR)
-    rec   = vosk.KaldiRecognizer(model, 16000)
-    print("[OK] vosk model loaded")
-except Exception as e:
-    print("[ERR] vosk load failed:", repr(e))
-    sys.exit(2)
+# ===== 소스 =====
+xruns = []            # arecord 가 알린 overrun (ms, 측정 시작 후 초)
+t_start = None
 
-cmd = ["arecord", "-D", MIC_DEVICE, "-f", "S16_LE", "-r", "16000", "-c", "1", "-t", "raw"]
-print("[INFO] arecord cmd:", " ".join(cmd))
+def _stderr_reader(p):
+    # arecord: "overrun!!! (at least 12.345 ms long)"
+    for raw in p.stderr:
+        line = raw.decode("utf-8", "replace").strip()
+        if "overrun" in line or "xrun" in line:
+            ms = None
+            if "at least" in line:
+                try:
+                    ms = float(line.split("at least", 1)[1].split("ms", 1)[0])
+                except ValueError:
+                    pass
+            xruns.append({"at_s": round(time.perf_counter() - (t_start or time.perf_counter()), 3), "ms": ms})
+        elif line:
+            print("[ARECORD]", line)
 
-try:
-    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-except Exception as e:
-    print("[ERR] arecord spawn failed:", repr(e))
-    sys.exit(2)
+class FileSource:
+    """장치 대신 파일을 실제 시간 간격으로(절대 시각 기준 sleep, 누적 오차 없음)."""
+    def __init__(self, path):
+        self.f = open(path, "rb")
+        if self.f.read(4) == b"RIFF":
+            self.f.seek(44)
+        else:
+            self.f.seek(0)
+        self.n = 0
+        self.t0 = None
+    def read(self, size):
+        if self.t0 is None:
+            self.t0 = time.perf_counter()
+        self.n += 1
+        due = self.t0 + self.n * CHUNK_MS / 1000.0
+        d = due - time.perf_counter()
+        if d > 0:
+            time.sleep(d)
+        data = self.f.read(size)
+        if len(data) < size:           # 끝나면 처음부터 반복
+            self.f.seek(0)
+            data += self.f.read(size - len(data))
+        return data
 
-print("[READY] 말해보세요… (Ctrl+C 종료)")
-try:
+p = None
+if DIAG_FILE:
+    src = FileSource(DIAG_FILE)
+    cmd = None
+else:
+    cmd = ["arecord", "-D", MIC_DEVICE, "-f", "S16_LE", "-r", str(MIC_RATE), "-c", str(MIC_CHANNELS), "-t", "raw"]
+    print("[INFO] arecord cmd:", " ".join(cmd))
+    try:
+        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except Exception as e:
+        print("[ERR] arecord spawn failed:", repr(e))
+        sys.exit(2)
+    threading.Thread(target=_stderr_reader, args=(p,), daemon=True).start()
+    src = p.stdout
+
+# ===== ASR 스레드 (읽기 타이밍을 흐리지 않도록 분리) =====
+asr_q = queue.Queue()
+decode_ms = []
+asr_backlog_max = 0
+asr_audio_s = 0.0
+asr_busy_s = 0.0
+
+def asr_worker():
+    global asr_audio_s, asr_busy_s
     while True:
-        data = p.stdout.read(3200)  # 약 0.1초
-        if not data:
-            time.sleep(0.02)
-            continue
-        if rec.AcceptWaveform(data):
-            res = json.loads(rec.Result())
-            txt = (res.get("text") or "").strip()
+        data = asr_q.get()
+        if data is None:
+            return
+        pcm = frontend.process(data) if frontend is not None else data
+        t0 = time.perf_counter()
+        done = rec.AcceptWaveform(pcm)
+        dt = time.perf_counter() - t0
+        decode_ms.append(dt * 1000.0)
+        asr_busy_s += dt
+        asr_audio_s += len(pcm) / 32000.0
+        if done:
+            txt = (json.loads(rec.Result()).get("text") or "").strip()
             if txt:
                 print("[ASR]", txt)
-        # partial은 시끄러우면 생략
+
+asr_thread = None
+if rec is not None:
+    asr_thread = threading.Thread(target=asr_worker, daemon=True)
+    asr_thread.start()
+
+# ===== 측정 루프 =====
+arrivals = []         # 청크 도착 시각(perf_counter)
+total_bytes = 0
+short_reads = 0
+print(f"[READY] {DIAG_SEC:.0f}초 측정… 말해보세요 (Ctrl+C 로 중단)")
+try:
+    # 첫 청크는 장치 시작 지연이라 따로 잰다
+    t_open = time.perf_counter()
+    while True:
+        data = src.read(chunk_bytes)
+        now = time.perf_counter()
+        if not data:
+            print("[WARN] EOF")
+            break
+        if t_start is None:
+            t_start = now
+            first_chunk_ms = (now - t_open) * 1000.0
+        if len(data) < chunk_bytes:
+            short_reads += 1
+        arrivals.append(now)
+        total_bytes += len(data)
+        if rec is not None:
+            asr_q.put(data)
+            asr_backlog_max = max(asr_backlog_max, asr_q.qsize())
+        if now - t_start >= DIAG_SEC:
+            break
 except KeyboardInterrupt:
     pass
 except Exception:
     print("[ERR] loop crashed:\n", traceback.format_exc())
 finally:
-    try: p.terminate()
-    except: pass
+    if p is not None:
+        try: p.terminate()
+        except: pass
+    if asr_thread is not None:
+        asr_q.put(None)
+        asr_thread.join(timeout=30)
+
+# ===== 분석 =====
+def pct(v, q):
+    if not v:
+        return None
+    v = sorted(v)
+    return v[min(len(v) - 1, int(q * (len(v) - 1) + 0.5))]
+
+def linfit(xs, ys):
+    n = len(xs)
+    mx, my = sum(xs) / n, sum(ys) / n
+    sxx = sum((x - mx) ** 2 for x in xs)
+    if sxx == 0:
+        return None
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sxx
+
+if len(arrivals) < 3:
+    print("[ERR] 측정할 데이터가 부족합니다.")
+    sys.exit(1)
+
+expect_ms = CHUNK_MS
+iv = [(b - a) * 1000.0 for a, b in zip(arrivals, arrivals[1:])]
+mean_iv = sum(iv) / len(iv)
+jitter = math.sqrt(sum((x - mean_iv) ** 2 for x in iv) / len(iv))
+bursts = sum(1 for x in iv if x < expect_ms * 0.25)          # 거의 동시에 몰려 온 읽기
+gaps = sum(1 for x in iv if x > expect_ms * 1.8)              # 한 청크 이상 늦은 읽기
+elapsed = arrivals[-1] - arrivals[0]
+# 누적 샘플 vs 시각 기울기 = 실제 레이트(첫 청크 제외, 시작 버퍼링 영향 제거)
+cum = [(i + 1) * chunk_bytes / (2 * MIC_CHANNELS) for i in range(len(arrivals))]
+slope = linfit([a - arrivals[0] for a in arrivals[1:]], cum[1:])
+eff_rate = slope if slope else (total_bytes / (2 * MIC_CHANNELS)) / max(elapsed, 1e-9)
+drift_ppm = (eff_rate / MIC_RATE - 1.0) * 1e6
+# 누적 지연: 벽시계 대비 받은 오디오가 얼마나 모자라는지(+면 샘플 유실/느린 장치)
+lag_ms = (elapsed - (cum[-1] - cum[0]) / MIC_RATE) * 1000.0
+
+report = {
+    "host": {"machine": platform.machine(), "node": platform.node(), "cpus": os.cpu_count(),
+             "python": platform.python_version(), "platform": platform.platform()},
+    "config": {"device": MIC_DEVICE if not DIAG_FILE else None, "file": DIAG_FILE or None,
+               "rate": MIC_RATE, "channels": MIC_CHANNELS, "chunk_ms": CHUNK_MS, "sec": DIAG_SEC},
+    "capture": {
+        "chunks": len(arrivals), "bytes": total_bytes, "short_reads": short_reads,
+        "first_chunk_ms": round(first_chunk_ms, 1),
+        "interval_ms": {"mean": round(mean_iv, 3), "p50": round(pct(iv, 0.5), 3), "p95": round(pct(iv, 0.95), 3),
+                        "p99": round(pct(iv, 0.99), 3), "max": round(max(iv), 3), "min": round(min(iv), 3)},
+        "jitter_ms": round(jitter, 3), "bursts": bursts, "late_reads": gaps,
+        "xruns": len(xruns), "xrun_events": xruns[:50],
+        "effective_rate": round(eff_rate, 2), "drift_ppm": round(drift_ppm, 1), "lag_ms": round(lag_ms, 1),
+    },
+}
+if rec is not None:
+    report["asr"] = {
+        "model": VOSK_MODEL_DIR, "model_load_s": round(model_load_s, 2),
+        "rtf": round(asr_busy_s / asr_audio_s, 4) if asr_audio_s else None,
+        "decode_ms": {"p50": round(pct(decode_ms, 0.5), 3), "p95": round(pct(decode_ms, 0.95), 3),
+                      "max": round(max(decode_ms), 3)} if decode_ms else None,
+        "backlog_max_chunks": asr_backlog_max,
+    }
+
+c = report["capture"]
+print("===== 캡처 경로 진단 =====")
+print(f"[DIAG] 청크 {c['chunks']}개, 첫 청크 {c['first_chunk_ms']}ms, short read {c['short_reads']}")
+print(f"[DIAG] 도착 간격 ms: 평균 {c['interval_ms']['mean']:.2f} p50 {c['interval_ms']['p50']:.2f} "
+      f"p95 {c['interval_ms']['p95']:.2f} p99 {c['interval_ms']['p99']:.2f} max {c['interval_ms']['max']:.2f}")
+print(f"[DIAG] 지터 {c['jitter_ms']:.2f}ms, 몰림(burst) {c['bursts']}, 지연 도착 {c['late_reads']}, xrun {c['xruns']}")
+print(f"[DIAG] 실제 레이트 {c['effective_rate']:.1f}Hz (drift {c['drift_ppm']:+.0f}ppm), 누적 부족 {c['lag_ms']:+.1f}ms")
+if "asr" in report:
+    a = report["asr"]
+    print(f"[DIAG] Vosk RTF {a['rtf']} (1 이상이면 실시간 못 따라감), decode p95 {a['decode_ms']['p95'] if a['decode_ms'] else '-'}ms, "
+          f"최대 밀림 {a['backlog_max_chunks']}청크")
+# 간단 판정
+warn = []
+if c["xruns"] or c["late_reads"] > len(iv) * 0.01:
+    warn.append("프레임 손실/지연 도착 → 장치 버퍼(-B/--buffer-time)나 USB 전원/허브 확인")
+if c["bursts"] > len(iv) * 0.2:
+    warn.append("읽기가 몰려서 도착 → plug/pulse 경로의 주기(period) 설정 확인, hw 장치 직접 사용 고려(MIC_RATE)")
+if abs(c["drift_ppm"]) > 1000:
+    warn.append("샘플레이트 오차가 큼 → 장치 고유 레이트로 열고 변환(MIC_RATE) 권장")
+if "asr" in report and report["asr"]["rtf"] and report["asr"]["rtf"] > 0.7:
+    warn.append("Vosk RTF 가 높음 → 작은 모델/문법 제한 고려")
+for w in warn:
+    print("[WARN]", w)
+if not warn:
+    print("[OK] 캡처 경로 이상 없음")
+if DIAG_JSON:
+    with open(DIAG_JSON, "w") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print("[INFO] wrote", DIAG_JSON)
 print("[EXIT]")
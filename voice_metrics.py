@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+음성 제어 데몬 메트릭: Prometheus 텍스트 형식(/metrics)을 로컬 HTTP(TCP 또는 Unix 소켓)로
+- METRICS_ADDR=127.0.0.1:9108            → curl -s localhost:9108/metrics
+  METRICS_ADDR=unix:/run/go2voice.sock   → curl -s --unix-socket /run/go2voice.sock http://x/metrics
+- 긁을 때마다 Pipeline.metrics() 와 백엔드/프로세스 상태를 그 자리에서 읽어 만든다(따로 도는 수집 작업 없음).
+  이벤트 루프 안에서 응답하므로 파이프라인 상태를 잠금 없이 읽는다.
+- 명령 지연(발화 끝 → 전송 결과)은 ack 훅으로 히스토그램에 쌓는다 → histogram_quantile 로 지연 회귀 알림
+- 제어: GET /profile/start | /profile/stop | /profile(상태) → 샘플링 프로파일러(voice_profiler)
+- prometheus_client 없이 표준 라이브러리만 사용
+"""
+import os
+import time
+import asyncio
+
+PREFIX = "go2voice"
+LAT_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0)   # 초
+
+_HELP = {
+    "frames": "captured audio chunks (100ms)",
+    "frames_dropped": "chunks the capture device lost (estimated from elapsed time)",
+    "tel_dropped": "telemetry lines dropped because the log queue was full",
+    "finals": "final ASR results",
+    "gateway": "requests decided from command_gateway (text/intent input, not ASR)",
+    "partials": "partial ASR results",
+    "no_match": "finals with no matching intent",
+    "weak": "finals whose best intent was below the score threshold",
+    "unsupported": "intents the motion backend does not support",
+    "debounced": "commands suppressed by cooldown/repeat debounce",
+    "dispatch_errors": "commands whose backend dispatch raised",
+    "dispatched": "commands sent to the motion backend",
+}
+
+
+def _esc(v):
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(d):
+    if not d:
+        return ""
+    return "{" + ",".join(f'{k}="{_esc(v)}"' for k, v in d.items()) + "}"
+
+
+class _Out:
+    """지표 이름별 HELP/TYPE 한 번 + 샘플 줄"""
+
+    def __init__(self):
+        self.lines = []
+        self._seen = set()
+
+    def add(self, name, kind, help_, value, labels=None, full=False):
+        n = name if full else f"{PREFIX}_{name}"
+        if n not in self._seen:
+            self._seen.add(n)
+            self.lines.append(f"# HELP {n} {help_}")
+            self.lines.append(f"# TYPE {n} {kind}")
+        if value is None:
+            return
+        v = str(int(value)) if isinstance(value, (bool, int)) else repr(float(value))
+        self.lines.append(f"{n}{_labels(labels)} {v}")
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+
+def _flatten(d, prefix=""):
+    """중첩 dict 의 숫자 값만 (점으로 이은 키, 값)"""
+    for k, v in d.items():
+        key = f"{prefix}.{k}" if prefix else str(k)
+        if isinstance(v, dict):
+            yield from _flatten(v, key)
+        elif isinstance(v, (int, float)):
+            yield key, v
+
+
+def _proc_stats():
+    """(rss_bytes, cpu_s, threads) — /proc 없으면 resource 로 대신"""
+    cpu = time.process_time()
+    rss = threads = None
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    threads = int(line.split()[1])
+    except (OSError, ValueError):
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return rss, cpu, threads
+
+
+def _backend_parts(backend):
+    """백엔드(또는 그 안의 server)의 MotionEvents / MotionSupervisor 들"""
+    seen, out = set(), []
+    for b in (backend, getattr(backend, "server", None)):
+        if b is None or id(b) in seen:
+            continue
+        seen.add(id(b))
+        out.append((getattr(b, "name", type(b).__name__), getattr(b, "events", None), getattr(b, "sup", None)))
+    return out
+
+
+class MetricsServer:
+    """attach(pipeline) 로 붙으면 파이프라인 작업으로 소켓을 열고 종료 때 닫는다."""
+
+    def __init__(self, addr):
+        self.addr = addr
+        self.pipeline = None
+        self.t_start = time.time()
+        self.scrapes = 0
+        self._lat_counts = {}            # result(ok|none|error) → [버킷별 누적 개수..., +Inf]
+        self._lat_sum = {}
+
+    def attach(self, pipeline):
+        self.pipeline = pipeline
+        pipeline.ack_hooks.append(self._on_ack)
+        pipeline.extra_tasks.append(self.serve)
+        return pipeline
+
+    def _on_ack(self, cmd, result, latency_ms):
+        # result=None: 미지원 의도, Exception: 디스패치 예외
+        res = "error" if isinstance(result, Exception) else "ok" if result is not None else "none"
+        sec = latency_ms / 1000.0
+        counts = self._lat_counts.setdefault(res, [0] * (len(LAT_BUCKETS) + 1))
+        for i, b in enumerate(LAT_BUCKETS):
+            if sec <= b:
+                counts[i] += 1
+        counts[-1] += 1
+        self._lat_sum[res] = self._lat_sum.get(res, 0.0) + sec
+
+    # ---------- 형식 ----------
+    def render(self) -> str:
+        p = self.pipeline
+        m = p.metrics()
+        o = _Out()
+        for k, v in m["counters"].items():
+            o.add(f"{k}_total", "counter", _HELP.get(k, k), v)
+        for name, v in sorted(m["intents"].items()):
+            o.add("intents_total", "counter", "commands decided per intent (after debounce)", v, {"intent": name})
+        finals = m["counters"].get("finals", 0) + m["counters"].get("gateway", 0)
+        o.add("no_match_ratio", "gauge", "no_match / (finals + gateway requests) since start",
+              m["counters"].get("no_match", 0) / finals if finals else 0.0)
+        o.add("vad_duty_ratio", "gauge", "fraction of captured audio passed to ASR", m.get("vad_duty", 1.0))
+        o.add("asr_rtf", "gauge", "ASR decode time / audio time since start", m.get("asr_rtf"))
+        o.add("asr_audio_seconds_total", "counter", "audio seconds decoded by ASR", p.asr_audio_s)
+        for stage in ("capture", "vad", "asr", "intent", "dispatch", "telemetry"):
+            st = m.get(stage)
+            if st is None:
+                continue
+            lab = {"stage": stage}
+            o.add("stage_processed_total", "counter", "items processed per pipeline stage", st["processed"], lab)
+            o.add("stage_busy_seconds_total", "counter", "busy time per pipeline stage", st["busy_s"], lab)
+            o.add("queue_depth", "gauge", "current input queue depth of the next stage", st["queue"], lab)
+            o.add("queue_depth_max", "gauge", "max queue depth seen", st["queue_max"], lab)
+            o.add("queue_capacity", "gauge", "queue capacity", st["queue_cap"], lab)
+        for key, v in _flatten(m.get("asr_model", {})):
+            o.add("asr_model", "gauge", "numeric fields of the recognizer stats() (asr_tiers, asr_bilingual, asr_wake)",
+                  v, {"key": key})
+        for key, v in _flatten(m.get("backend", {})):
+            o.add("backend", "gauge", "numeric fields of the motion backend stats() (e.g. motion_speculate)",
+                  v, {"key": key})
+        sc = m.get("score_cache") or {}
+        if "hit_rate" in sc:
+            o.add("score_cache_hit_ratio", "gauge", "intent scoring cache hit rate", sc["hit_rate"])
+        self._render_latency(o)
+        self._render_backend(o)
+        self._render_process(o)
+        self.scrapes += 1
+        o.add("scrapes_total", "counter", "metrics scrapes served", self.scrapes)
+        return o.text()
+
+    def _render_latency(self, o):
+        n = f"{PREFIX}_command_latency_seconds"
+        o.add("command_latency_seconds", "histogram", "utterance heard -> backend dispatch returned", None)
+        for res, counts in sorted(self._lat_counts.items()):
+            for b, c in zip(LAT_BUCKETS, counts):
+                o.lines.append(f'{n}_bucket{{result="{res}",le="{b}"}} {c}')
+            o.lines.append(f'{n}_bucket{{result="{res}",le="+Inf"}} {counts[-1]}')
+            o.lines.append(f'{n}_sum{{result="{res}"}} {self._lat_sum[res]!r}')
+            o.lines.append(f'{n}_count{{result="{res}"}} {counts[-1]}')
+
+    def _render_backend(self, o):
+        for name, ev, sup in _backend_parts(self.pipeline.backend):
+            if ev is not None:
+                for kind, c in sorted(dict(ev.counts).items()):
+                    o.add("motion_events_total", "counter", "motion process output events by kind (reply/fail/...)",
+                          c, {"backend": name, "kind": kind})
+                for ret, c in sorted(dict(ev.ret_codes).items()):
+                    o.add("motion_ret_codes_total", "counter", "motion failures by SDK return code",
+                          c, {"backend": name, "ret": ret})
+            if sup is not None:
+                st = sup.stats()
+                lab = {"backend": name}
+                o.add("motion_up", "gauge", "motion helper process alive", sup.alive(), lab)
+                o.add("motion_restarts_total", "counter", "motion helper restarts", st.get("restarts", 0), lab)
+                o.add("motion_dropped_total", "counter", "commands dropped while the helper was down",
+                      st.get("dropped", 0), lab)
+                o.add("motion_downtime_seconds_total", "counter", "total helper downtime",
+                      st.get("downtime_total", 0.0), lab)
+                if st.get("last_exit_code") is not None:
+                    o.add("motion_last_exit_code", "gauge", "exit code of the last helper exit",
+                          st["last_exit_code"], lab)
+
+    def _render_process(self, o):
+        rss, cpu, threads = _proc_stats()
+        o.add("process_resident_memory_bytes", "gauge", "Resident memory size in bytes.", rss, full=True)
+        o.add("process_cpu_seconds_total", "counter", "Total user and system CPU time spent in seconds.", cpu, full=True)
+        o.add("process_start_time_seconds", "gauge", "Start time of the process since unix epoch in seconds.",
+              self.t_start, full=True)
+        if threads is not None:
+            o.add("process_threads", "gauge", "Number of OS threads in the process.", threads, full=True)
+
+    # ---------- HTTP ----------
+    async def _handle(self, reader, writer):
+        try:
+            req = await asyncio.wait_for(reader.readline(), 5.0)
+            while True:                      # 헤더는 읽고 버림
+                line = await asyncio.wait_for(reader.readline(), 5.0)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+            parts = req.decode("latin-1").split()
+            path = parts[1].split("?")[0] if len(parts) >= 2 else ""
+            if parts and parts[0] == "GET" and path in ("/metrics", "/"):
+                body = self.render().encode()
+                head = "200 OK", "text/plain; version=0.0.4; charset=utf-8"
+            elif parts and parts[0] == "GET" and path in ("/profile", "/profile/start", "/profile/stop"):
+                # 제어 명령: 샘플링 프로파일러(voice_profiler) 켜기/끄기/상태
+                action = path.rpartition("/")[2] if path != "/profile" else "status"
+                body = (self.pipeline.profile(action) + "\n").encode()
+                head = "200 OK", "text/plain; charset=utf-8"
+            else:
+                body = b"not found\n"
+                head = "404 Not Found", "text/plain"
+            writer.write(f"HTTP/1.0 {head[0]}\r\nContent-Type: {head[1]}\r\nContent-Length: {len(body)}\r\n"
+                         f"Connection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, pipeline=None):
+        if self.addr.startswith("unix:"):
+            path = self.addr[5:]
+            if os.path.exists(path):
+                os.unlink(path)
+            server = await asyncio.start_unix_server(self._handle, path)
+        else:
+            host, _, port = self.addr.rpartition(":")
+            server = await asyncio.start_server(self._handle, host or "127.0.0.1", int(port))
+            path = None
+        self.pipeline.tel("INFO", f"metrics: http://{self.addr}/metrics" if path is None
+                          else f"metrics: unix socket {path} (/metrics)")
+        try:
+            async with server:
+                await asyncio.Event().wait()     # 파이프라인 종료 때 취소됨
+        finally:
+            if path and os.path.exists(path):
+                os.unlink(path)
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+한국어 음성 명령 NLP 공용 모듈
+- normalize_korean : 구두점/군더더기/조사/어미 제거
+- IntentCatalog    : intent_catalog.json 로드 → 색인 테이블로 컴파일, 파일 변경 시 자동 재적재
+- score_intents / score_hypotheses / resolve : 카탈로그 기반 의도 점수화
+- ScoreCache       : 원문 → (정규화 문장, 점수표) LRU 캐시(카탈로그 변경 시 자동 무효화)
+"""
+import os
+import re
+import sys
+import json
+import math
+import site
+import threading
+from collections import defaultdict, OrderedDict
+
+def _catalog_path():
+    """INTENT_CATALOG → 소스 폴더(pip install -e / 스크립트 실행) → 설치 데이터(<prefix>/share/go2voice)"""
+    env = os.environ.get("INTENT_CATALOG")
+    if env:
+        return env
+    here = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_catalog.json")
+    if os.path.isfile(here):
+        return here
+    for base in (sys.prefix, site.USER_BASE):
+        p = os.path.join(base or "", "share", "go2voice", "intent_catalog.json")
+        if base and os.path.isfile(p):
+            return p
+    return here
+
+CATALOG_PATH = _catalog_path()
+MIN_SCORE = 1.2   # 의도 채택 최소 점수(가설 확률로 가중한 기대 점수 기준)
+SCORE_CACHE_SIZE = int(os.environ.get("SCORE_CACHE_SIZE", "256"))
+
+# ===== 한글 정규화 유틸 =====
+_JOSA_RE = re.compile(r"(은|는|이|가|을|를|에|에서|으로|로|와|과|한테|에게|께|께서|에도|에도|까지|부터|밖에|마다|처럼|같이|인데|인데요|인데다|인데도)$")
+_ENDING_RE = re.compile(r"(해줘|해주라|해줘요|해주세요|해|해라|해라요|해요|해라구|해라구요|해달라|하자|하시오|하세|하세요|해보자|해봐|해봐요|해볼래|해줄래|해줄수있어|해줄수있니|해줄수있나요)$")
+_FILLERS = ("그냥","저기","음","어","에","아","그","저","이제","그러면","근데","자")
+def normalize_korean(s: str) -> str:
+    s = s.strip()
+    # 공백 제거 + 소문자화(영문 섞였을 때만 영향)
+    s = s.lower()
+    # 보편적 구두점 제거
+    s = re.sub(r"[^\w가-힣\s/]", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    # 군더더기 토큰 제거
+    toks = [t for t in s.split() if t not in _FILLERS]
+    s = " ".join(toks)
+    # 조사/끝맺음 제거(토큰별로 뒤에서 한 번만 삭제)
+    def strip_tail(token):
+        t = _ENDING_RE.sub("", token)
+        t = _JOSA_RE.sub("", t)
+        return t
+    toks = [strip_tail(t) for t in s.split()]
+    s = " ".join([t for t in toks if t])
+    return s
+
+# ===== 카탈로그 =====
+class Intent:
+    """카탈로그의 의도 하나(컴파일 결과)."""
+    __slots__ = ("name", "index", "motion2", "motion_id", "action", "safety",
+                 "posture", "variant", "prep", "patterns", "numbers", "doa")
+
+    def __init__(self, name, index, spec):
+        self.name = name
+        self.index = index
+        self.motion2 = spec.get("motion2")          # go2_motion2 stdin 한 줄("3", "/go")
+        self.motion_id = int(self.motion2) if (self.motion2 or "").isdigit() else None
+        self.action = spec.get("action")            # go2_action_server JSON 필드
+        self.safety = spec.get("safety", "gesture")
+        self.posture = spec.get("posture")
+        self.variant = dict(spec.get("variant") or {})
+        self.prep = dict(spec.get("prep") or {})      # 자세 → {"line", "undo", "saves_ms"} (추측 준비)
+        self.patterns = [(re.compile(p), float(w)) for p, w in (spec.get("patterns") or {}).items()]
+        self.numbers = list(spec.get("numbers") or [])
+        self.doa = bool(spec.get("doa"))             # 화자 방향이 필요한 의도(이리와/여기 봐)
+
+    def motion_for(self, posture: str):
+        """현재 자세를 반영한 go2_motion2 명령(예: 앉은 상태의 일어서 → RiseSit)."""
+        return self.variant.get(posture, self.motion2)
+
+    def __repr__(self):
+        return f"Intent({self.name!r}, motion2={self.motion2!r}, safety={self.safety!r})"
+
+
+class CompiledCatalog:
+    """카탈로그 JSON을 한 번 컴파일한 색인 테이블."""
+
+    def __init__(self, doc: dict, version: int = 0):
+        self.version = version
+        self.grammar = list(doc.get("grammar") or [])
+        self.grammar_en = list(doc.get("grammar_en") or [])   # 영어 인식기 문법(asr_bilingual)
+        self.number_weight = float(doc.get("number_weight", 2.0))
+        self.intents = [Intent(name, i, spec) for i, (name, spec) in enumerate((doc.get("intents") or {}).items())]
+        self.by_name = {it.name: it for it in self.intents}
+        self.by_motion = {it.motion2: it for it in self.intents if it.motion2}
+        self.by_action = {}
+        for it in self.intents:
+            if it.action and it.action.get("action") not in self.by_action:
+                self.by_action[it.action.get("action")] = it
+        # (정규식, 의도 index, 가중치) 평탄화 목록 / 번호 토큰 → 의도 index
+        self.patterns = [(rx, it.index, w) for it in self.intents for rx, w in it.patterns]
+        self.numbers = {}          # "번/번째" 를 뗀 뒤 비교하는 전체 표
+        self.numbers_bare = {}     # 접미사 없이 단독으로도 번호로 보는 것(한 글자 한글은 제외)
+        for it in self.intents:
+            for tok in it.numbers:
+                self.numbers.setdefault(tok, it.index)
+                if not _needs_suffix(tok):
+                    self.numbers_bare.setdefault(tok, it.index)
+        # 자세 추정: motion2 → 이후 자세 (variant 로 보내는 번호도 포함)
+        self.posture_after = {}
+        for it in self.intents:
+            if it.posture and it.motion2:
+                self.posture_after[it.motion2] = it.posture
+        for it in self.intents:
+            for alt in it.variant.values():
+                tgt = self.by_motion.get(alt)
+                if tgt is not None and tgt.posture:
+                    self.posture_after.setdefault(alt, tgt.posture)
+
+
+def load_catalog(path: str = CATALOG_PATH, version: int = 0) -> CompiledCatalog:
+    with open(path, "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    return CompiledCatalog(doc, version)
+
+
+class IntentCatalog:
+    """
+    카탈로그 파일 감시 + 자동 재적재.
+    tables 는 통째로 교체되므로 읽는 쪽은 잠금 없이 `cat.tables` 한 번만 참조하면 된다.
+    재적재 실패(JSON/정규식 오류) 시 이전 테이블을 유지한다.
+    """
+
+    def __init__(self, path: str = CATALOG_PATH, watch: bool = True, poll_sec: float = 1.0):
+        self.path = path
+        self.poll_sec = poll_sec
+        self._stamp = self._file_stamp()
+        self.tables = load_catalog(path, 1)
+        self._listeners = []
+        self._stop = threading.Event()
+        self._watcher = None
+        if watch:
+            self.start_watch()
+
+    @property
+    def version(self) -> int:
+        return self.tables.version
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def on_reload(self, fn):
+        """재적재 성공 시 fn(tables) 호출."""
+        self._listeners.append(fn)
+
+    def reload(self) -> bool:
+        try:
+            tables = load_catalog(self.path, self.tables.version + 1)
+        except (OSError, ValueError, re.error) as e:
+            print(f"[WARN] catalog reload failed (이전 카탈로그 유지): {e}", file=sys.stderr)
+            return False
+        self.tables = tables
+        print(f"[INFO] catalog reloaded: v{tables.version}, intents={len(tables.intents)}")
+        for fn in self._listeners:
+            fn(tables)
+        return True
+
+    def start_watch(self):
+        if self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch_loop, daemon=True, name="catalog-watch")
+        self._watcher.start()
+
+    def _watch_loop(self):
+        while not self._stop.wait(self.poll_sec):
+            stamp = self._file_stamp()
+            if stamp is not None and stamp != self._stamp:
+                self._stamp = stamp
+                self.reload()
+
+    def stop(self):
+        self._stop.set()
+
+
+_default = None
+def default_catalog() -> IntentCatalog:
+    """프로세스 공용 카탈로그(처음 호출 시 로드 + 감시 시작)."""
+    global _default
+    if _default is None:
+        _default = IntentCatalog()
+    return _default
+
+# ===== 점수화 =====
+_NUM_SUFFIX_RE = re.compile(r"(번째|번)$")
+
+def _needs_suffix(tok: str) -> bool:
+    """한 글자 한글 수사(일/이/사/오/구...)는 흔한 낱말·조사와 겹쳐 "번/번째" 가 붙어야만 번호로 본다."""
+    return len(tok) == 1 and "가" <= tok <= "힣"
+
+def score_intents(text_norm: str, tables: CompiledCatalog = None):
+    """정규화된 문장 → {의도 이름: 점수}. 동률/낮은 점수 필터링은 호출부에서 처리."""
+    tables = tables or default_catalog().tables
+    acc = defaultdict(float)
+    for rx, idx, w in tables.patterns:
+        if rx.search(text_norm):
+            acc[idx] += w
+    if tables.numbers:
+        toks = text_norm.split()
+        weak = []
+        for i, tok in enumerate(toks):
+            # "오 앉아", "이 자세" 의 오/이 는 번호가 아니다 → 한 글자 수사는 "오번", "이번째" 처럼 부를 때만
+            idx = tables.numbers_bare.get(tok)
+            if idx is None:
+                base = _NUM_SUFFIX_RE.sub("", tok)
+                idx = tables.numbers.get(base) if base != tok else None
+                # "이번에 앉아", "이번 거 말고" 의 이번(this time)은 번호가 아니다:
+                # 한 글자 수사 + "번" 은 뒤에 "동작" 이 오거나 다른 의도 단서가 없을 때만 번호로 본다
+                if idx is not None and tok.endswith("번") and _needs_suffix(base) \
+                        and not (i + 1 < len(toks) and toks[i + 1] == "동작"):
+                    weak.append(idx)
+                    continue
+            if idx is not None:
+                acc[idx] += tables.number_weight
+        if weak and not acc:
+            for idx in weak:
+                acc[idx] += tables.number_weight
+    return {tables.intents[i].name: v for i, v in acc.items()}
+
+def result_hypotheses(res: dict, temp: float = 1.0, word_conf: bool = False):
+    """
+    Vosk 최종 결과(JSON) → [(text, prob)] 목록. prob 합은 1.
+    - SetMaxAlternatives > 0 : {"alternatives":[{"text","confidence"},...]}
+      confidence(로그우도)를 softmax 하여 확률로 변환 → 후보 사이 순위/배분에만 쓰인다
+    - 단일 결과(SetWords) : {"text", "result":[{"word","conf",...}]}
+      후보가 하나뿐이므로 prob=1.0(점수가 MIN_SCORE 아래로 깎이지 않게).
+      word_conf=True 면 단어 신뢰도 평균(호출어/영어 인식기의 채택 문턱용)
+    """
+    alts = res.get("alternatives")
+    if alts:
+        hyps = [((a.get("text") or "").strip(), float(a.get("confidence", 0.0))) for a in alts]
+        hyps = [(t, c) for t, c in hyps if t]
+        if not hyps:
+            return []
+        top = max(c for _, c in hyps)
+        ws = [math.exp((c - top) / temp) for _, c in hyps]
+        tot = sum(ws)
+        return [(t, w / tot) for (t, _), w in zip(hyps, ws)]
+    txt = (res.get("text") or "").strip()
+    if not txt:
+        return []
+    if not word_conf:
+        return [(txt, 1.0)]
+    confs = [float(w.get("conf", 1.0)) for w in (res.get("result") or [])]
+    return [(txt, sum(confs) / len(confs) if confs else 1.0)]
+
+class ScoreCache:
+    """
+    원문 문장 → (정규화 문장, 점수표) LRU 캐시.
+    실사용 발화는 "앉아", "인사해", "멈춰" 같은 몇십 개가 대부분이라
+    normalize_korean 의 정규식 치환과 패턴 탐색을 매번 반복할 필요가 없다.
+    카탈로그 버전이 바뀌면 다음 조회 때 통째로 비운다.
+    반환되는 점수표는 공유 객체이므로 읽기 전용으로 다룰 것.
+    """
+
+    def __init__(self, maxsize: int = SCORE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._d = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def lookup(self, raw: str, tables: CompiledCatalog):
+        with self._lock:
+            if self._version != tables.version:
+                if self._d:
+                    self.invalidations += 1
+                self._d.clear()
+                self._version = tables.version
+            hit = self._d.get(raw)
+            if hit is not None:
+                self._d.move_to_end(raw)
+                self.hits += 1
+                return hit
+            self.misses += 1
+        norm = normalize_korean(raw)
+        val = (norm, score_intents(norm, tables) if norm else {})
+        if self.maxsize <= 0:
+            return val
+        with self._lock:
+            if self._version == tables.version:
+                self._d[raw] = val
+                if len(self._d) > self.maxsize:
+                    self._d.popitem(last=False)
+                    self.evictions += 1
+        return val
+
+    def clear(self):
+        with self._lock:
+            self._d.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"size": len(self._d), "maxsize": self.maxsize,
+                    "hits": self.hits, "misses": self.misses,
+                    "hit_rate": (self.hits / total) if total else 0.0,
+                    "evictions": self.evictions, "invalidations": self.invalidations}
+
+score_cache = ScoreCache()
+
+def score_hypotheses(hyps, tables: CompiledCatalog = None):
+    """
+    여러 가설을 한 번에 훑어 의도별 기대 점수(Σ prob × score)를 계산.
+    1순위 가설이 빗나가도 다른 후보들이 같은 의도를 가리키면 채택될 수 있다.
+    반환: (scores, best_norm)  best_norm은 로그용 1순위 정규화 문장
+    """
+    tables = tables or default_catalog().tables
+    scores = defaultdict(float)
+    best_norm = ""
+    for txt, p in hyps:
+        norm, sc = score_cache.lookup(txt, tables)
+        if not norm:
+            continue
+        if not best_norm:
+            best_norm = norm
+        for name, v in sc.items():
+            scores[name] += p * v
+    return scores, best_norm
+
+def best_intent(scores, tables: CompiledCatalog = None, min_score: float = MIN_SCORE):
+    """
+    점수표 → (Intent|None, score). 'go'(특수 트리거)는 임계치만 넘으면 우선한다.
+    """
+    tables = tables or default_catalog().tables
+    if not scores:
+        return None, 0.0
+    if scores.get("go", 0.0) >= min_score and "go" in tables.by_name:
+        return tables.by_name["go"], scores["go"]
+    name, sc = max(scores.items(), key=lambda kv: kv[1])
+    if sc < min_score or name not in tables.by_name:
+        return None, sc
+    return tables.by_name[name], sc
+
+def resolve(text: str, tables: CompiledCatalog = None, min_score: float = MIN_SCORE):
+    """단일 문장 → Intent 또는 None (단순 스크립트용)."""
+    tables = tables or default_catalog().tables
+    scores, _ = score_hypotheses([(text, 1.0)], tables)
+    return best_intent(scores, tables, min_score)[0]
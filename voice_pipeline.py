@@ -0,0 +1,712 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+asyncio 음성 제어 파이프라인
+  capture → vad → asr(executor) → intent → dispatch
+                 (모든 단계) → telemetry
+단계 사이는 크기 제한 큐(backpressure)로 연결하고, 종료는 EOS 표식을 앞에서부터
+흘려보내 각 단계가 남은 일을 마치고 순서대로 끝나게 한다(os._exit 없음).
+각 스크립트(voice_please.py 등)는 Pipeline 에 소스/백엔드/설정만 넘기는 얇은 진입점이다.
+"""
+import os
+import sys
+import json
+import math
+import time
+import signal
+import asyncio
+import inspect
+from array import array
+from collections import namedtuple, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from voice_nlp import default_catalog, result_hypotheses, score_hypotheses, best_intent, score_cache, MIN_SCORE
+
+SAMPLE_RATE = 16000
+CHUNK_MS = 100
+VAD_THRESHOLD = float(os.environ.get("VAD_THRESHOLD", "300"))   # 0 이면 VAD 끔(전 구간 디코딩)
+METRICS_ADDR = os.environ.get("METRICS_ADDR", "")   # 예: 127.0.0.1:9108 | unix:/run/go2voice.sock (voice_metrics)
+GATEWAY_ADDR = os.environ.get("GATEWAY_ADDR", "")   # 예: unix:/tmp/go2voice-cmd.sock (command_gateway: 문장/의도 직접 입력)
+
+Chunk = namedtuple("Chunk", "ts pcm")                     # 캡처(전처리 후 int16 mono)
+Speech = namedtuple("Speech", "ts pcm flag")              # flag: start | mid | end
+AsrResult = namedtuple("AsrResult", "ts kind hyps")       # kind: partial | final
+Command = namedtuple("Command", "ts intent score text hyps t_heard targets bearing")
+# targets: None = 전체,  bearing: 화자 방향(도, 로봇 정면 기준 +왼쪽) 또는 None
+
+_EOS = object()   # 종료 표식(단계 → 단계로 전달)
+
+# ===== 오디오 소스 =====
+class ArecordSource:
+    """arecord raw S16_LE 스트림."""
+    live = True          # 실시간 장치(캡처 누락 추정 대상)
+
+    def __init__(self, device, rate=SAMPLE_RATE, channels=1, chunk_ms=CHUNK_MS):
+        self.device = device
+        self.rate = rate
+        self.channels = channels
+        self.chunk_bytes = int(rate * chunk_ms / 1000) * 2 * channels
+        self.proc = None
+
+    def describe(self):
+        return f"mic: {self.device}, sr={self.rate}, ch={self.channels}"
+
+    async def open(self):
+        cmd = ["arecord","-D",self.device,"-f","S16_LE","-r",str(self.rate),"-c",str(self.channels),"-t","raw"]
+        self.proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+
+    async def read(self) -> bytes:
+        """한 청크(~100ms). EOF 면 b''."""
+        try:
+            return await self.proc.stdout.readexactly(self.chunk_bytes)
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+
+    async def close(self):
+        if self.proc and self.proc.returncode is None:
+            try: self.proc.terminate()
+            except ProcessLookupError: pass
+            await self.proc.wait()
+
+
+class RawFileSource:
+    """
+    S16_LE raw/wav 파일 재생(테스트/재현용). 다채널이면 인터리브 배치.
+    realtime=True 면 실제 시간 간격으로 흘려보낸다.
+    """
+
+    def __init__(self, path, rate=SAMPLE_RATE, chunk_ms=CHUNK_MS, realtime=False, channels=1):
+        self.path = path
+        self.rate = rate
+        self.channels = channels
+        self.chunk_ms = chunk_ms
+        self.chunk_bytes = int(rate * chunk_ms / 1000) * 2 * channels
+        self.realtime = realtime
+        self.f = None
+
+    def describe(self):
+        return f"file: {self.path}, sr={self.rate}, ch={self.channels}"
+
+    async def open(self):
+        self.f = open(self.path, "rb")
+        if self.f.read(4) == b"RIFF":
+            self.f.seek(44)   # 표준 PCM wav 헤더
+        else:
+            self.f.seek(0)
+
+    async def read(self) -> bytes:
+        if self.f is None:
+            return b""
+        if self.realtime:
+            await asyncio.sleep(self.chunk_ms / 1000.0)
+        return self.f.read(self.chunk_bytes)
+
+    async def close(self):
+        if self.f:
+            self.f.close()
+            self.f = None
+
+# ===== VAD =====
+def rms_int16(pcm: bytes) -> float:
+    a = array("h", pcm[: len(pcm) // 2 * 2])
+    if not a:
+        return 0.0
+    return math.sqrt(sum(x * x for x in a) / len(a))
+
+class EnergyVad:
+    """
+    에너지 기반 발화 구간 검출. 잡음 바닥을 따라가며 그 ratio 배 이상이면 발화.
+    무음 구간은 ASR 로 보내지 않아 디코딩 CPU 를 아낀다.
+    발화 시작 시 preroll 을 함께 넘기고, 끝난 뒤 hang_ms 만큼 더 보낸 다음 'end' 표시.
+    """
+
+    def __init__(self, threshold=300.0, ratio=3.0, preroll_ms=300, hang_ms=800, chunk_ms=CHUNK_MS):
+        self.threshold = threshold
+        self.ratio = ratio
+        self.noise = threshold / ratio
+        self.preroll = deque(maxlen=max(1, preroll_ms // chunk_ms))
+        self.hang_chunks = max(1, hang_ms // chunk_ms)
+        self.active = False
+        self._silent = 0
+        self.speech_chunks = 0
+        self.total_chunks = 0
+
+    def feed(self, pcm: bytes):
+        """청크 하나 → [(pcm, flag), ...]"""
+        self.total_chunks += 1
+        e = rms_int16(pcm)
+        loud = e >= max(self.threshold, self.noise * self.ratio)
+        if not self.active:
+            if not loud:
+                self.noise = 0.95 * self.noise + 0.05 * e
+                self.preroll.append(pcm)
+                return []
+            self.active = True
+            self._silent = 0
+            out = [(p, "start" if i == 0 else "mid") for i, p in enumerate(self.preroll)]
+            self.preroll.clear()
+            out.append((pcm, "mid" if out else "start"))
+            self.speech_chunks += 1
+            return out
+        self.speech_chunks += 1
+        if loud:
+            self._silent = 0
+            return [(pcm, "mid")]
+        self._silent += 1
+        if self._silent >= self.hang_chunks:
+            self.active = False
+            return [(pcm, "end")]
+        return [(pcm, "mid")]
+
+    @property
+    def duty(self) -> float:
+        return self.speech_chunks / self.total_chunks if self.total_chunks else 0.0
+
+def default_vad():
+    """VAD_THRESHOLD 환경변수 기준 EnergyVad (0 이면 None)."""
+    return EnergyVad(VAD_THRESHOLD) if VAD_THRESHOLD > 0 else None
+
+# ===== ASR =====
+class VoskAsr:
+    """Vosk 인식기(전용 스레드 1개에서만 호출)."""
+
+    def __init__(self, model_dir, rate=SAMPLE_RATE, max_alt=5, alt_temp=1.0, grammar=None):
+        self.model_dir = model_dir
+        self.rate = rate
+        self.max_alt = max_alt
+        self.alt_temp = alt_temp
+        self.grammar = grammar
+        self.word_conf = False       # 단일 결과 prob 로 단어 신뢰도를 쓸지(언어 사이 비교용, asr_bilingual)
+        self.model = None            # 불러온 vosk.Model (호출어 인식기 등이 같은 폴더면 나눠 씀)
+        self.rec = None
+        self._last_partial = ""
+
+    def load(self):
+        try:
+            import vosk
+        except ImportError:
+            print("[ERR] pip install vosk", file=sys.stderr); sys.exit(2)
+        if not os.path.isdir(self.model_dir):
+            print(f"[ERR] VOSK 모델 폴더가 없습니다: {self.model_dir}", file=sys.stderr)
+            sys.exit(2)
+        print(f"[INFO] load vosk model: {self.model_dir}")
+        model = self.model = vosk.Model(self.model_dir)
+        if self.grammar:
+            self.rec = vosk.KaldiRecognizer(model, self.rate, self.grammar)
+        else:
+            self.rec = vosk.KaldiRecognizer(model, self.rate)
+        self.rec.SetWords(True)                     # 단어 타이밍/신뢰도
+        if self.max_alt > 0:
+            self.rec.SetMaxAlternatives(self.max_alt)   # n-best 후보
+
+    def accept(self, pcm: bytes):
+        """→ ('final', hyps) | ('partial', text) | None"""
+        if self.rec.AcceptWaveform(pcm):
+            self._last_partial = ""
+            return "final", result_hypotheses(json.loads(self.rec.Result()), self.alt_temp, self.word_conf)
+        ptxt = (json.loads(self.rec.PartialResult()).get("partial") or "").strip()
+        if ptxt and ptxt != self._last_partial:
+            self._last_partial = ptxt
+            return "partial", ptxt
+        return None
+
+    def flush(self):
+        """발화 종료 시 강제 확정."""
+        self._last_partial = ""
+        return result_hypotheses(json.loads(self.rec.FinalResult()), self.alt_temp, self.word_conf)
+
+# ===== 디바운스 =====
+class Debouncer:
+    """
+    cooldown_sec : 직전 명령 후 이 시간 안의 명령은 무시
+    repeat_sec   : 같은 의도 반복은 이 시간 안이면 무시
+    정지(safety=stop) 의도는 항상 통과. key(대상 로봇 등)별로 따로 센다.
+    """
+
+    def __init__(self, cooldown_sec=1.5, repeat_sec=3.0):
+        self.cooldown_sec = cooldown_sec
+        self.repeat_sec = repeat_sec
+        self._last = {}          # key → (ts, intent name)
+        self.suppressed = 0
+
+    def check(self, intent, now, key=None):
+        """통과하면 None, 막히면 사유 문자열."""
+        if intent.safety == "stop":
+            return None
+        last_ts, last_intent = self._last.get(key, (0.0, None))
+        if (now - last_ts) < self.cooldown_sec:
+            self.suppressed += 1
+            return "너무 빠른 연속 명령 → 무시"
+        if last_intent == intent.name and (now - last_ts) < self.repeat_sec:
+            self.suppressed += 1
+            return "같은 의도 반복 → 무시"
+        return None
+
+    def fired(self, intent, now, key=None):
+        self._last[key] = (now, intent.name)
+
+# ===== 단계 통계 =====
+class StageStats:
+    __slots__ = ("name", "processed", "busy", "q", "q_max")
+
+    def __init__(self, name, q=None):
+        self.name = name
+        self.processed = 0
+        self.busy = 0.0
+        self.q = q
+        self.q_max = 0
+
+    def observe_queue(self):
+        if self.q is not None:
+            d = self.q.qsize()
+            if d > self.q_max:
+                self.q_max = d
+
+    def as_dict(self):
+        return {"processed": self.processed, "busy_s": round(self.busy, 4),
+                "queue": self.q.qsize() if self.q is not None else 0,
+                "queue_max": self.q_max,
+                "queue_cap": self.q.maxsize if self.q is not None else 0}
+
+# ===== 파이프라인 =====
+class Pipeline:
+    """
+    source  : ArecordSource / RawFileSource (open/read/close)
+    asr     : VoskAsr
+    backend : dispatch(cmd) 를 가진 객체(Motion2Backend 등). dispatch 가 코루틴이면 await.
+    frontend: 캡처 직후 process(pcm) → int16 mono 로 바꾸는 전처리(mic_array 빔포머 등). None 이면 그대로.
+    recorder: session_recorder.SessionRecorder. 오디오/로그/명령을 링 파일에 남긴다(재생: session_replay.py).
+    metrics_addr: Prometheus 텍스트 형식 /metrics 를 내보낼 주소(voice_metrics). 빈 문자열이면 끔.
+    gateway_addr: 문장/의도를 음성 없이 넣는 로컬 소켓(command_gateway). 빈 문자열이면 끔.
+    router  : 여러 로봇 호칭 분리기(robot_fleet.RobotRouter). None 이면 단일 로봇.
+    """
+
+    def __init__(self, source, asr, backend, vad=None, debouncer=None, router=None, frontend=None,
+                 recorder=None, min_score=MIN_SCORE, quit_intent="quit", show_partial=True,
+                 queue_size=32, metrics_sec=0.0, tasks=(), metrics_addr=METRICS_ADDR, gateway_addr=GATEWAY_ADDR):
+        self.source = source
+        self.asr = asr
+        self.backend = backend
+        self.vad = vad
+        self.debounce = debouncer or Debouncer()
+        self.router = router
+        self.frontend = frontend
+        self.recorder = recorder
+        self.min_score = min_score
+        self.quit_intent = quit_intent
+        self.show_partial = show_partial
+        self.queue_size = queue_size
+        self.metrics_sec = metrics_sec
+        self.extra_tasks = list(tasks)      # 추가 코루틴 팩토리(pipeline) → 종료 시 취소
+        self.partial_hooks = []             # fn(text, ts) : partial 가설 관찰(추측 실행 등)
+        self.command_hooks = []             # fn(cmd)      : 확정 명령 관찰
+        self.final_hooks = []               # fn(hyps, ts) : 확정 인식 결과(n-best)
+        self.intent_hooks = []              # fn(cmd)      : 의도 결정(전송 전)
+        self.ack_hooks = []                 # fn(cmd, result, latency_ms) : 전송 결과(미지원이면 None, 디스패치 예외면 그 Exception)
+        self.counters = {"frames": 0, "frames_dropped": 0, "tel_dropped": 0, "finals": 0, "partials": 0,
+                         "gateway": 0, "no_match": 0, "weak": 0, "unsupported": 0, "debounced": 0,
+                         "dispatch_errors": 0, "dispatched": 0}
+        self.intent_counts = {}
+        self.asr_audio_s = 0.0              # ASR 에 넣은 오디오 길이(디코딩 RTF = asr busy / 이 값)
+        self._utt_t0 = None                 # 현재/직전 발화 시작 시각(VAD start)
+        self._stop = None
+        self._stopping = False
+        self._stats = {}
+        self._tasks = []
+        self.profiler = None                # voice_profiler.SamplingProfiler (SIGUSR2 / 메트릭 소켓으로 켬)
+        self.gateway = None                 # command_gateway.CommandGateway
+        if metrics_addr:
+            from voice_metrics import MetricsServer
+            MetricsServer(metrics_addr).attach(self)
+        if gateway_addr:
+            from command_gateway import CommandGateway
+            CommandGateway(gateway_addr).attach(self)
+
+    # ---------- 공개 ----------
+    def run(self):
+        """동기 진입점: 이벤트 루프를 만들고 종료까지 블록."""
+        asyncio.run(self.main())
+
+    def request_stop(self, reason=""):
+        if self._stopping:
+            return
+        self._stopping = True
+        if reason:
+            self.tel("EXIT", reason)
+        if self._stop is not None:
+            self._stop.set()
+
+    def profile(self, action="toggle"):
+        """샘플링 프로파일러 start | stop | toggle | status → 상태 문자열. 이벤트 루프 스레드에서 호출."""
+        if self.profiler is None:
+            from voice_profiler import SamplingProfiler
+            loop = asyncio.get_running_loop()
+            self.profiler = SamplingProfiler(report=lambda msg: loop.call_soon_threadsafe(self.tel, "PROF", msg))
+        if action == "status":
+            pr = self.profiler
+            return "running" if pr.running else ("idle, last: " + " ".join(pr.last_files) if pr.last_files else "idle")
+        return getattr(self.profiler, action)()
+
+    def tel(self, tag, msg):
+        """텔레메트리(콘솔 로그) 큐에 넣기. 가득 차면 버림(파이프라인을 막지 않음)."""
+        q = getattr(self, "q_tel", None)
+        if q is None:
+            print(f"[{tag}] {msg}")
+            return
+        try:
+            q.put_nowait((time.time(), tag, msg))
+        except asyncio.QueueFull:
+            self.counters["tel_dropped"] += 1
+
+    def metrics(self) -> dict:
+        m = {name: st.as_dict() for name, st in self._stats.items()}
+        m["counters"] = dict(self.counters)
+        m["intents"] = dict(self.intent_counts)
+        if self.vad is not None:
+            m["vad_duty"] = round(self.vad.duty, 3)
+        if self.asr_audio_s > 0 and "asr" in self._stats:
+            m["asr_rtf"] = round(self._stats["asr"].busy / self.asr_audio_s, 4)
+        m["score_cache"] = score_cache.stats()
+        if self.frontend is not None and hasattr(self.frontend, "stats"):
+            m["frontend"] = self.frontend.stats()
+        if hasattr(self.asr, "stats"):
+            m["asr_model"] = self.asr.stats()
+        if hasattr(self.backend, "stats"):
+            m["backend"] = self.backend.stats()
+        if self.gateway is not None:
+            m["gateway"] = self.gateway.stats()
+        return m
+
+    # ---------- 본체 ----------
+    async def main(self):
+        loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        if self._stopping:
+            self._stop.set()
+        n = self.queue_size
+        self.q_audio = asyncio.Queue(n)
+        self.q_speech = asyncio.Queue(n)
+        self.q_asr = asyncio.Queue(n)
+        self.q_cmd = asyncio.Queue(n)
+        self.q_tel = asyncio.Queue(n * 8)
+        self._stats = {"capture": StageStats("capture", self.q_audio),
+                       "vad": StageStats("vad", self.q_speech),
+                       "asr": StageStats("asr", self.q_asr),
+                       "intent": StageStats("intent", self.q_cmd),
+                       "dispatch": StageStats("dispatch"),
+                       "telemetry": StageStats("telemetry", self.q_tel)}
+        self._asr_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asr")
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._on_signal)
+            except (NotImplementedError, RuntimeError):
+                pass
+        if hasattr(signal, "SIGUSR2"):
+            # kill -USR2 <pid> : 프로파일러 켜기/끄기(voice_profiler)
+            try:
+                loop.add_signal_handler(signal.SIGUSR2, self.profile)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        tel_task = loop.create_task(self._telemetry())
+        try:
+            await loop.run_in_executor(self._asr_pool, self.asr.load)
+            self._asr_events()
+            if hasattr(self.backend, "start"):
+                await loop.run_in_executor(None, self.backend.start)
+            await self.source.open()
+            self.tel("INFO", self.source.describe())
+            if self.frontend is not None:
+                self.tel("INFO", self.frontend.describe())
+            if self.recorder is not None:
+                self.tel("INFO", self.recorder.describe())
+            self.tel("READY", "음성 명령 대기 시작.")
+
+            stages = [self._capture(), self._vad(), self._asr(), self._intent(), self._dispatch()]
+            self._tasks = [loop.create_task(c) for c in stages]
+            extra = [loop.create_task(f(self)) for f in self.extra_tasks]
+            if self.metrics_sec > 0:
+                extra.append(loop.create_task(self._metrics_loop()))
+
+            # 단계들은 EOS 가 끝까지 전달되면 스스로 끝난다
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            for t in extra:
+                t.cancel()
+            await asyncio.gather(*extra, return_exceptions=True)
+        finally:
+            if self.profiler is not None and self.profiler.running:
+                self.profiler.stop()
+            await self.source.close()
+            if hasattr(self.backend, "stop"):
+                await loop.run_in_executor(None, self.backend.stop)
+            self._asr_pool.shutdown(wait=True)
+            await self.q_tel.put(_EOS)
+            await tel_task
+            if self.recorder is not None:
+                self.recorder.close()
+            st = score_cache.stats()
+            print(f"[NLP] cache hit_rate={st['hit_rate']:.2f} hits={st['hits']} misses={st['misses']} "
+                  f"evictions={st['evictions']} invalidations={st['invalidations']}")
+            print("[EXIT] bye")
+
+    def _on_signal(self):
+        if self._stopping:
+            # 두 번째 Ctrl+C: 기다리지 않고 단계 취소
+            for t in self._tasks:
+                t.cancel()
+            return
+        self.request_stop("종료 신호 수신")
+
+    async def _capture(self):
+        st = self._stats["capture"]
+        stop_wait = asyncio.ensure_future(self._stop.wait())
+        live = getattr(self.source, "live", False)
+        t_first = None
+        try:
+            while True:
+                read = asyncio.ensure_future(self.source.read())
+                done, _ = await asyncio.wait({read, stop_wait}, return_when=asyncio.FIRST_COMPLETED)
+                if read not in done:
+                    read.cancel()
+                    break
+                pcm = read.result()
+                if not pcm:
+                    self.tel("INFO", "audio source EOF")
+                    break
+                t0 = time.perf_counter()
+                ts = time.time()
+                if live:
+                    # 장치 버퍼 넘침으로 잃은 청크 추정: 경과 시간 대비 받은 청크 수(도착 지연 0.5초까지는 봐줌)
+                    if t_first is None:
+                        t_first = t0
+                    lost = int(((t0 - t_first) * 1000.0 - 500.0) / CHUNK_MS) - st.processed
+                    if lost > self.counters["frames_dropped"]:
+                        self.counters["frames_dropped"] = lost
+                if self.frontend is not None:
+                    pcm = self.frontend.process(pcm)
+                if self.recorder is not None:
+                    self.recorder.audio(ts, pcm)
+                self.counters["frames"] += 1
+                st.processed += 1
+                await self.q_audio.put(Chunk(ts, pcm))   # 가득 차면 여기서 대기(backpressure)
+                st.observe_queue()
+                st.busy += time.perf_counter() - t0
+        finally:
+            stop_wait.cancel()
+            await self.q_audio.put(_EOS)
+
+    async def _vad(self):
+        st = self._stats["vad"]
+        while True:
+            item = await self.q_audio.get()
+            if item is _EOS:
+                await self.q_speech.put(_EOS)
+                return
+            t0 = time.perf_counter()
+            if self.vad is None:
+                out = [(item.pcm, "mid")]
+            else:
+                out = self.vad.feed(item.pcm)
+            st.processed += 1
+            st.busy += time.perf_counter() - t0
+            for pcm, flag in out:
+                if flag == "start":
+                    self._utt_t0 = item.ts
+                await self.q_speech.put(Speech(item.ts, pcm, flag))
+                st.observe_queue()
+
+    async def _asr(self):
+        loop = asyncio.get_running_loop()
+        st = self._stats["asr"]
+        while True:
+            item = await self.q_speech.get()
+            if item is _EOS:
+                hyps = await loop.run_in_executor(self._asr_pool, self.asr.flush)
+                if hyps:
+                    await self.q_asr.put(AsrResult(time.time(), "final", hyps))
+                await self.q_asr.put(_EOS)
+                return
+            t0 = time.perf_counter()
+            self.asr_audio_s += len(item.pcm) / (2.0 * SAMPLE_RATE)
+            res = await loop.run_in_executor(self._asr_pool, self.asr.accept, item.pcm)
+            if item.flag == "end" and (res is None or res[0] != "final"):
+                hyps = await loop.run_in_executor(self._asr_pool, self.asr.flush)
+                res = ("final", hyps) if hyps else None
+            st.processed += 1
+            st.busy += time.perf_counter() - t0
+            self._asr_events()
+            if res is None:
+                continue
+            kind, payload = res
+            if kind == "final" and not payload:
+                continue
+            await self.q_asr.put(AsrResult(item.ts, kind, payload))
+            st.observe_queue()
+
+    def _asr_events(self):
+        # 인식기 내부 이벤트(asr_tiers 단계 변경 등)는 ASR 스레드에서 쌓이고 여기서 로그로 옮긴다
+        pop = getattr(self.asr, "pop_events", None)
+        if pop is not None:
+            for tag, msg in pop():
+                self.tel(tag, msg)
+
+    async def _intent(self):
+        st = self._stats["intent"]
+        while True:
+            item = await self.q_asr.get()
+            if item is _EOS:
+                await self.q_cmd.put(_EOS)
+                return
+            t0 = time.perf_counter()
+            st.processed += 1
+            if item.kind == "partial":
+                self.counters["partials"] += 1
+                if self.show_partial:
+                    self.tel("~", item.hyps)
+                for fn in self.partial_hooks:
+                    fn(item.hyps, item.ts)
+                continue
+            cmd, _ = self.handle_final(item.hyps, item.ts)
+            st.busy += time.perf_counter() - t0
+            if cmd is not None:
+                await self.q_cmd.put(cmd)
+                st.observe_queue()
+
+    def handle_final(self, hyps, t_heard, intent=None, source="voice"):
+        """
+        확정 결과 하나 → (Command | None, 사유). 음성과 command_gateway 가 같이 쓰는 경로
+        (final 훅 → 정규화/점수화 → 디바운스 → intent 훅). 큐에 넣는 것은 호출한 쪽.
+        intent: 점수화 대신 쓸 의도(이름으로 직접 지정한 구조화 입력)
+        source: "voice" 면 finals/[ASR], "gateway" 면 gateway/[GATEWAY] 로 따로 집계·기록
+        """
+        if source == "gateway":
+            self.counters["gateway"] += 1
+            self.tel("GATEWAY", f"{hyps[0][0]}  (p={hyps[0][1]:.2f}, n={len(hyps)}"
+                                + (f", intent={intent.name})" if intent is not None else ")"))
+        else:
+            self.counters["finals"] += 1
+            self.tel("ASR", f"{hyps[0][0]}  (p={hyps[0][1]:.2f}, n={len(hyps)})")
+        for fn in self.final_hooks:
+            fn(hyps, t_heard)
+        cmd, why = self._decide(hyps, t_heard, intent)
+        if cmd is not None:
+            for fn in self.intent_hooks:
+                fn(cmd)
+        return cmd, why
+
+    def _decide(self, hyps, t_heard, forced=None):
+        """→ (Command, None) 또는 (None, 사유: empty | no_match | weak | quit | debounced)"""
+        tables = default_catalog().tables
+        targets = None
+        if self.router is not None:
+            # "일번 앉아" → 대상 ("일번",) + "앉아" (호칭은 점수화 전에 제거)
+            targets, hyps = self.router.split_hyps(hyps)
+        scores, text_norm = score_hypotheses(hyps, tables)
+        if forced is not None:
+            intent, score = forced, scores.get(forced.name, 0.0)
+        else:
+            if not text_norm:
+                self.tel("NLP", "공백/무효")
+                return None, "empty"
+            if not scores:
+                self.counters["no_match"] += 1
+                self.tel("NLP", "매칭 없음")
+                return None, "no_match"
+            # 최고 점수 의도 채택 (최소 임계치, 특수 트리거 'go' 우선)
+            intent, score = best_intent(scores, tables, self.min_score)
+            if intent is None:
+                self.counters["weak"] += 1
+                self.tel("NLP", f"약한 신호({max(scores, key=scores.get)}:{score:.2f}) → 무시")
+                return None, "weak"
+        if self.quit_intent and intent.name == self.quit_intent:
+            self.request_stop("종료 명령 인식. 프로그램을 종료합니다.")
+            return None, "quit"
+        now = time.time()
+        why = self.debounce.check(intent, now, targets)
+        if why:
+            self.counters["debounced"] += 1
+            self.tel("DEBOUNCE", why)
+            return None, "debounced"
+        self.debounce.fired(intent, now, targets)
+        self.intent_counts[intent.name] = self.intent_counts.get(intent.name, 0) + 1
+        bearing = self._bearing(now) if intent.doa else None
+        return Command(now, intent, score, hyps[0][0], hyps, t_heard, targets, bearing), None
+
+    def _bearing(self, now):
+        """방금 발화 구간의 화자 방향(frontend 가 다채널 빔포머일 때만)."""
+        fn = getattr(self.frontend, "bearing", None)
+        if fn is None:
+            self.tel("DOA", "마이크 어레이 없음 → 방향 모름")
+            return None
+        sec = (now - self._utt_t0 + 0.3) if self._utt_t0 else None
+        rel, conf, ms = fn(sec)
+        budget = CHUNK_MS
+        self.tel("DOA", f"{rel:+.0f}deg conf={conf:.1f} ({ms:.1f}ms{', 예산 초과' if ms > budget else ''})")
+        return rel if conf > 1.5 else None
+
+    async def _dispatch(self):
+        st = self._stats["dispatch"]
+        while True:
+            cmd = await self.q_cmd.get()
+            if cmd is _EOS:
+                return
+            t0 = time.perf_counter()
+            try:
+                res = self.backend.dispatch(cmd)
+                if inspect.isawaitable(res):
+                    res = await res
+            except Exception as e:
+                # 미지원(None)과 구분되도록 예외 자체를 ack 훅에 넘김
+                self.counters["dispatch_errors"] += 1
+                self.tel("ERR", f"dispatch failed: {e!r}")
+                for fn in self.ack_hooks:
+                    fn(cmd, e, (time.time() - cmd.t_heard) * 1000.0)
+                continue
+            st.processed += 1
+            st.busy += time.perf_counter() - t0
+            if self.recorder is not None:
+                self.recorder.command(cmd, res)
+            lat = (time.time() - cmd.t_heard) * 1000.0
+            for fn in self.ack_hooks:
+                fn(cmd, res, lat)
+            if res is None:
+                self.counters["unsupported"] += 1
+                self.tel("NLP", f"{getattr(self.backend, 'name', 'backend')} 미지원 의도: {cmd.intent.name}")
+                continue
+            self.counters["dispatched"] += 1
+            self.tel("ACTION", f"{cmd.intent.name} → {res}  ({lat:.0f}ms)")
+            for fn in self.command_hooks:
+                fn(cmd)
+
+    async def _telemetry(self):
+        st = self._stats["telemetry"]
+        rec = self.recorder
+        last_flush = time.time()
+        while True:
+            item = await self.q_tel.get()
+            if item is _EOS:
+                # 남은 로그 비우기
+                while not self.q_tel.empty():
+                    item = self.q_tel.get_nowait()
+                    if item is not _EOS:
+                        print(f"[{item[1]}] {item[2]}")
+                        if rec is not None:
+                            rec.event(*item)
+                return
+            ts, tag, msg = item
+            st.processed += 1
+            print(f"[{tag}] {msg}", flush=True)
+            if rec is not None:
+                rec.event(ts, tag, msg)
+                if ts - last_flush >= 1.0:      # 비정상 종료 때 잃는 로그를 1초 이내로
+                    rec.flush()
+                    last_flush = ts
+
+    async def _metrics_loop(self):
+        while True:
+            await asyncio.sleep(self.metrics_sec)
+            m = self.metrics()
+            depth = " ".join(f"{k}={m[k]['queue']}/{m[k]['queue_max']}" for k in self._stats)
+            self.tel("METRIC", f"queues {depth} vad_duty={m.get('vad_duty', 1.0)}")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+실행 중인 파이프라인용 샘플링 프로파일러(컨트롤러를 멈추지 않고 켜고 끔)
+- 켜기/끄기: kill -USR2 <pid>  또는  METRICS_ADDR 소켓에 GET /profile/start, /profile/stop (voice_metrics)
+- 별도 스레드가 PROF_HZ 로 sys._current_frames() 를 떠서 스택을 센다(대상 코드는 손대지 않음).
+  샘플은 파이프라인 단계로 나눈다:
+    capture / vad / intent / intent/score(voice_nlp) / dispatch / telemetry : 이벤트 루프 스레드의 현재 코루틴
+    asr/vosk(디코딩) / asr/py / asr-en : ASR 전용 스레드,  motion-pump : 모션 프로세스 stdout 펌프 스레드
+    idle : 대기 중(select, 큐/조건 변수 대기)
+- 끄면(또는 PROF_MAX_SEC 경과) PROF_DIR 에
+    prof_<시각>.folded  접힌 스택("단계;스레드;모듈.함수;... 개수") → flamegraph.pl / speedscope / inferno 입력
+    prof_<시각>.svg     같은 내용의 불꽃 그래프(브라우저로 열기, 칸에 마우스를 올리면 샘플 수)
+  를 쓰고 단계별 비율을 [PROF] 로 남긴다.
+"""
+import os
+import sys
+import time
+import threading
+from collections import defaultdict
+
+PROF_HZ      = float(os.environ.get("PROF_HZ", "100"))
+PROF_MAX_SEC = float(os.environ.get("PROF_MAX_SEC", "120"))
+PROF_DIR     = os.environ.get("PROF_DIR", "/tmp/go2voice_prof")
+
+# 이벤트 루프 스레드: 이 코루틴 프레임이 스택에 있으면 그 단계
+_LOOP_STAGES = {"_capture": "capture", "_vad": "vad", "_asr": "asr-wait", "_intent": "intent",
+                "_dispatch": "dispatch", "_telemetry": "telemetry", "_metrics_loop": "metrics"}
+# 스레드 이름 접두어 → 단계 (긴 것부터)
+_THREAD_STAGES = (("asr-en", "asr-en"), ("asr", "asr"), ("pump-", "motion-pump"), ("turn", "motion-turn"),
+                  ("fleet-", "fleet"), ("catalog", "catalog"), ("ros", "ros"))
+# 가장 안쪽 프레임이 여기서 멈춰 있으면 대기
+_IDLE = {("selectors", "select"), ("selectors", "poll"), ("threading", "wait"), ("queue", "get"),
+         ("thread", "_worker")}
+
+
+def _mod(code):
+    name = os.path.splitext(os.path.basename(code.co_filename))[0]
+    if name == "__init__":       # 패키지면 폴더 이름(vosk 등)
+        name = os.path.basename(os.path.dirname(code.co_filename))
+    return name
+
+
+def _label(code):
+    return f"{_mod(code)}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _stage(tname, frames):
+    """frames: 바깥 → 안쪽 code 목록"""
+    inner = frames[-1] if frames else None
+    if inner is not None and (_mod(inner), inner.co_name) in _IDLE:
+        return "idle"
+    if tname == "MainThread":
+        stage = "loop"
+        for c in frames:
+            s = _LOOP_STAGES.get(c.co_name)
+            if s and _mod(c) == "voice_pipeline":
+                stage = s
+            elif stage == "intent" and _mod(c) == "voice_nlp":
+                return "intent/score"
+        return stage
+    for prefix, s in _THREAD_STAGES:
+        if tname.startswith(prefix):
+            if s == "asr":
+                return "asr/vosk" if any(_mod(c) == "vosk" for c in frames) else "asr/py"
+            return s
+    return "other"
+
+
+class SamplingProfiler:
+    """start()/stop()/toggle(). report(msg) 는 샘플링 스레드에서 불린다(스레드 안전하게 넘길 것)."""
+
+    def __init__(self, hz=PROF_HZ, max_sec=PROF_MAX_SEC, out_dir=PROF_DIR, report=print):
+        self.interval = 1.0 / max(1.0, hz)
+        self.max_sec = max_sec
+        self.out_dir = out_dir
+        self.report = report
+        self._thread = None
+        self._stop = threading.Event()
+        self.last_files = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, sec=None):
+        if self.running:
+            return "already running"
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(sec or self.max_sec,), daemon=True, name="profiler")
+        self._thread.start()
+        return f"profiling at {1.0 / self.interval:.0f}Hz (max {sec or self.max_sec:.0f}s)"
+
+    def stop(self):
+        if not self.running:
+            return "not running"
+        self._stop.set()
+        return f"stopping → {self.out_dir}"
+
+    def toggle(self):
+        return self.stop() if self.running else self.start()
+
+    # ---------- 샘플링 ----------
+    def _run(self, max_sec):
+        me = threading.get_ident()
+        stacks = defaultdict(int)
+        stages = defaultdict(int)
+        n = 0
+        t0 = time.monotonic()
+        cpu0 = time.thread_time()
+        self.report(f"start {1.0 / self.interval:.0f}Hz, max {max_sec:.0f}s")
+        next_t = t0
+        while not self._stop.is_set() and time.monotonic() - t0 < max_sec:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                codes = []
+                f = frame
+                while f is not None:
+                    codes.append(f.f_code)
+                    f = f.f_back
+                codes.reverse()
+                tname = names.get(tid, str(tid))
+                st = _stage(tname, codes)
+                stages[st] += 1
+                stacks[";".join([st, tname] + [_label(c) for c in codes])] += 1
+            n += 1
+            next_t += self.interval
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_t = time.monotonic()     # 밀렸으면 따라잡지 않는다
+        wall = time.monotonic() - t0
+        overhead = (time.thread_time() - cpu0) / wall * 100.0 if wall > 0 else 0.0
+        self._write(stacks, stages, n, wall, overhead)
+
+    def _write(self, stacks, stages, n, wall, overhead):
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, "prof_" + time.strftime("%Y%m%d_%H%M%S"))
+        with open(base + ".folded", "w") as f:
+            for k, v in sorted(stacks.items()):
+                f.write(f"{k} {v}\n")
+        write_svg(stacks, base + ".svg", title=f"go2voice {wall:.0f}s @ {1.0 / self.interval:.0f}Hz")
+        self.last_files = (base + ".folded", base + ".svg")
+        busy = {k: v for k, v in stages.items() if k != "idle"}
+        tot = sum(busy.values()) or 1
+        top = " ".join(f"{k}={v * 100.0 / tot:.0f}%" for k, v in sorted(busy.items(), key=lambda kv: -kv[1])[:8])
+        self.report(f"{n} samples / {wall:.1f}s, overhead {overhead:.1f}% core, busy: {top or '-'}")
+        self.report(f"wrote {base}.folded, {base}.svg")
+
+
+# ---------- 불꽃 그래프(SVG) ----------
+def _color(name):
+    h = 0
+    for ch in name:
+        h = (h * 31 + ord(ch)) & 0xFFFFFF
+    return f"rgb({205 + h % 50},{(h >> 8) % 180 + 40},{(h >> 16) % 55})"
+
+
+def _xml(s):
+    return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+def write_svg(stacks, path, title="", width=1200, row=16):
+    """접힌 스택 dict → 불꽃 그래프 SVG(아래가 바깥 프레임)"""
+    root = {"n": 0, "kids": {}}
+    depth = 0
+    for k, v in stacks.items():
+        node = root
+        node["n"] += v
+        parts = k.split(";")
+        depth = max(depth, len(parts))
+        for p in parts:
+            node = node["kids"].setdefault(p, {"n": 0, "kids": {}})
+            node["n"] += v
+    total = root["n"] or 1
+    height = (depth + 2) * row + 30
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="monospace" '
+           f'font-size="11"><rect width="100%" height="100%" fill="#fff"/>'
+           f'<text x="{width / 2}" y="18" text-anchor="middle" font-size="14">{_xml(title)} ({total} samples)</text>']
+
+    def walk(node, name, x, level):
+        w = node["n"] / total * width
+        if w < 0.3:
+            return
+        y = height - (level + 1) * row
+        pct = node["n"] * 100.0 / total
+        out.append(f'<g><title>{_xml(name)} ({node["n"]} samples, {pct:.1f}%)</title>'
+                   f'<rect x="{x:.1f}" y="{y}" width="{max(w - 0.5, 0.1):.1f}" height="{row - 1}" '
+                   f'fill="{_color(name)}"/>')
+        if w > 40:
+            txt = name if len(name) * 7 < w else name[: max(0, int(w / 7) - 2)] + ".."
+            out.append(f'<text x="{x + 3:.1f}" y="{y + row - 4}">{_xml(txt)}</text>')
+        out.append("</g>")
+        cx = x
+        for kname, kid in sorted(node["kids"].items()):
+            walk(kid, kname, cx, level + 1)
+            cx += kid["n"] / total * width
+
+    walk(root, "all", 0.0, 0)
+    out.append("</svg>")
+    with open(path, "w") as f:
+        f.write("\n".join(out))
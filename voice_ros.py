@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ROS2 음성 노드: 인식/의도/전송 결과를 토픽으로 내보내고, 이동 속도를 ROS 타이머로 출판
+- 토픽(std_msgs/String, 본문 JSON)
+    <ns>/asr/partial  {"text", "ts"}
+    <ns>/asr/final    {"text", "hyps": [[text, p], ...], "ts"}
+    <ns>/intent       {"intent", "score", "text", "targets", "bearing", "t_heard"}
+    <ns>/ack          {"intent", "result", "ok", "latency_ms"}
+- cmd_vel(geometry_msgs/Twist): move(v, sec) → VOICE_ROS_HZ 타이머에서 가속 제한 램프 → 유지 → 정지.
+  새 명령/정지가 오면 stop_motion() 으로 즉시 0 을 내고 타이머를 멈춘다(time.sleep 루프 없음)
+- 같은 프로세스 안의 소비자는 on_event(fn) 로 붙으면 메시지 직렬화 없이 dict 를 그대로 받는다.
+  (rclpy 는 rclcpp 의 intra-process 전달을 지원하지 않음 → 파이썬 쪽 직접 전달로 대신)
+- VOICE_ROS_STANDIN=1 이면 rclpy 대신 ros_standin(로컬 대역)으로 동작
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+
+VOICE_ROS_NS      = os.environ.get("VOICE_ROS_NS", "/voice")
+VOICE_ROS_CMD_VEL = os.environ.get("VOICE_ROS_CMD_VEL", "/unitree_go2/cmd_vel")
+VOICE_ROS_HZ      = float(os.environ.get("VOICE_ROS_HZ", "15"))
+VOICE_ROS_STANDIN = os.environ.get("VOICE_ROS_STANDIN", "0") in ("1", "true")
+
+def ros_modules(standin=VOICE_ROS_STANDIN):
+    """→ (rclpy 또는 ros_standin, String, Twist)"""
+    if standin:
+        import ros_standin as ros
+        return ros, ros.String, ros.Twist
+    try:
+        import rclpy
+        from std_msgs.msg import String
+        from geometry_msgs.msg import Twist
+    except ImportError:
+        print("[ERR] ROS2 환경(rclpy)을 source 하세요. PC 에서 시험하려면 VOICE_ROS_STANDIN=1", file=sys.stderr)
+        sys.exit(2)
+    return rclpy, String, Twist
+
+
+class VoiceNode:
+    """ROS 노드 하나 + Pipeline 훅. attach(pipeline) 로 연결하고 spin 은 파이프라인 작업으로 돈다."""
+
+    def __init__(self, name="voice_agent", ns=VOICE_ROS_NS, cmd_vel=VOICE_ROS_CMD_VEL, rate_hz=VOICE_ROS_HZ,
+                 max_v=0.4, accel=0.8, standin=VOICE_ROS_STANDIN):
+        self.ros, self.String, self.Twist = ros_modules(standin)
+        if not self.ros.ok():
+            self.ros.init()
+        self.node = self.ros.create_node(name)
+        self.ns = ns.rstrip("/")
+        self.pub = {k: self.node.create_publisher(self.String, f"{self.ns}/{k}", 10)
+                    for k in ("asr/partial", "asr/final", "intent", "ack")}
+        self.pub_vel = self.node.create_publisher(self.Twist, cmd_vel, 10)
+        self.period = 1.0 / rate_hz
+        self.max_v = max_v
+        self.accel = accel                     # m/s² (램프 기울기)
+        self._listeners = []
+        self._timer = None
+        self._v = 0.0                          # 지금 내보내는 속도
+        self._target = 0.0
+        self._t_end = 0.0
+        self._t_last = 0.0
+        self.ticks = 0
+        self.tick_late_max = 0.0               # 타이머 지연 최댓값(초)
+
+    def describe(self):
+        return (f"ros node {self.node.get_name()} topics {self.ns}/{{asr/partial,asr/final,intent,ack}} "
+                f"cmd_vel@{1.0 / self.period:.0f}Hz{' (standin)' if self.ros.__name__ == 'ros_standin' else ''}")
+
+    # ---------- 이벤트 ----------
+    def on_event(self, fn):
+        """fn(kind, dict): 같은 프로세스 소비자(직렬화 없음). kind = asr/partial | asr/final | intent | ack"""
+        self._listeners.append(fn)
+
+    def _emit(self, kind, d):
+        self.pub[kind].publish(self.String(data=json.dumps(d, ensure_ascii=False)))
+        for fn in self._listeners:
+            fn(kind, d)
+
+    def attach(self, pipeline):
+        pipeline.partial_hooks.append(self._on_partial)
+        pipeline.final_hooks.append(self._on_final)
+        pipeline.intent_hooks.append(self._on_intent)
+        pipeline.ack_hooks.append(self._on_ack)
+        pipeline.extra_tasks.append(self.spin)
+        return pipeline
+
+    def _on_partial(self, text, ts):
+        self._emit("asr/partial", {"text": text, "ts": ts})
+
+    def _on_final(self, hyps, ts):
+        self._emit("asr/final", {"text": hyps[0][0], "hyps": [[t, round(p, 4)] for t, p in hyps], "ts": ts})
+
+    def _on_intent(self, cmd):
+        self._emit("intent", {"intent": cmd.intent.name, "score": round(cmd.score, 3), "text": cmd.text,
+                              "targets": list(cmd.targets) if cmd.targets else None,
+                              "bearing": cmd.bearing, "t_heard": cmd.t_heard})
+
+    def _on_ack(self, cmd, result, latency_ms):
+        d = {"intent": cmd.intent.name, "result": result, "ok": result is not None,
+             "latency_ms": round(latency_ms, 1)}
+        if isinstance(result, Exception):
+            # 디스패치 예외: JSON 으로 못 싣는 예외 대신 문자열로
+            d.update(result=None, ok=False, error=repr(result))
+        self._emit("ack", d)
+
+    # ---------- 속도 프로파일 ----------
+    def move(self, v, sec):
+        """v(m/s, 부호가 방향)로 sec 초. 진행 중인 이동은 대체(속도는 램프로 이어짐)."""
+        v = max(-self.max_v, min(self.max_v, float(v)))
+        now = time.monotonic()
+        self._target = v
+        # 가속/감속 램프에서 잃고 얻는 거리가 v²/2a 로 같아서 sec 는 그대로 d/v
+        self._t_end = now + sec
+        if self._timer is None:
+            self._t_last = now
+            self._timer = self.node.create_timer(self.period, self._tick)
+
+    def stop_motion(self):
+        """즉시 정지(램프 없음) + 0 한 번."""
+        self._target = 0.0
+        self._t_end = 0.0
+        if self._timer is not None or self._v != 0.0:
+            self._v = 0.0
+            self._publish_vel(0.0)
+        self._cancel_timer()
+
+    @property
+    def moving(self) -> bool:
+        return self._timer is not None
+
+    def _tick(self):
+        now = time.monotonic()
+        dt = now - self._t_last
+        self._t_last = now
+        self.ticks += 1
+        self.tick_late_max = max(self.tick_late_max, dt - self.period)
+        target = self._target if now < self._t_end else 0.0
+        step = self.accel * dt
+        self._v += max(-step, min(step, target - self._v))
+        self._publish_vel(self._v)
+        if target == 0.0 and self._v == 0.0:
+            self._cancel_timer()
+
+    def _publish_vel(self, v):
+        msg = self.Twist()
+        msg.linear.x = float(v)
+        msg.angular.z = 0.0
+        self.pub_vel.publish(msg)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self.node.destroy_timer(self._timer)
+            self._timer = None
+
+    # ---------- 실행 ----------
+    async def spin(self, pipeline=None):
+        """이벤트 루프 안에서 ROS 콜백(타이머 포함) 처리. 타이머 주기보다 촘촘하게 돈다."""
+        poll = min(0.01, self.period / 4.0)
+        try:
+            while self.ros.ok():
+                self.ros.spin_once(self.node, timeout_sec=0.0)
+                await asyncio.sleep(poll)
+        finally:
+            self.stop_motion()
+
+    def close(self):
+        self.stop_motion()
+        self.node.destroy_node()
+        if self.ros.ok():
+            self.ros.shutdown()
+
+    def stats(self) -> dict:
+        return {"ticks": self.ticks, "tick_late_max_ms": round(self.tick_late_max * 1000.0, 2)}
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+호출어 앞단 벤치마크: 전체 인식기 상시 디코딩(full) vs 호출어 뒤에만(wake)
+  BENCH_NOISE=/tmp/lab_noise.raw BENCH_CMDS=/tmp/wake_cmds.raw WAKE_WORDS=고투야 python3 wake_bench.py
+입력(16kHz mono int16 raw, 파이프라인과 같은 EnergyVad 를 거쳐 인식기에 들어감)
+  BENCH_NOISE   호출어/명령이 없는 현장 소리(잡담, 모터, 음악 등)
+                → 오디오 1초당 CPU(한 코어 %), 파셜 수, 오인 명령 수, 호출 오인식(시간당 횟수)
+  BENCH_CMDS    "고투야 앉아" / "고투야 … (쉬고) 멈춰" 처럼 호출어 + 명령을 녹음한 것
+                → 호출 검출 수, 인식된 명령 수, 호출 → 명령 확정 지연(오디오 시각 기준 p50/p95), preroll 넘김 비용
+  BENCH_JSON=out.json  결과 저장
+시간은 파일 안의 오디오 시각(무음 포함)으로 재므로 실시간으로 흘릴 필요가 없다.
+"""
+import os
+import json
+import time
+
+from voice_pipeline import EnergyVad, VAD_THRESHOLD, SAMPLE_RATE, CHUNK_MS
+from voice_nlp import default_catalog, score_hypotheses, best_intent, MIN_SCORE
+from asr_tiers import asr_from_env
+from asr_wake import WakeAsr, WAKE_WORDS, WAKE_MODEL_DIR
+
+VOSK_MODEL_DIR = os.environ.get("VOSK_MODEL_DIR", "/models/vosk-ko")
+NOISE = os.environ.get("BENCH_NOISE", "")
+CMDS  = os.environ.get("BENCH_CMDS", "")
+WORDS = [w.strip() for w in (WAKE_WORDS or "고투야").split(",") if w.strip()]
+CHUNK = SAMPLE_RATE * CHUNK_MS // 1000 * 2     # 바이트
+
+class AudioClock:
+    """파일 안의 오디오 시각(청크마다 전진)"""
+    t = 0.0
+    def __call__(self):
+        return self.t
+
+def run(path, mode):
+    clock = AudioClock()
+    full = asr_from_env(VOSK_MODEL_DIR, wake=False)
+    asr = WakeAsr(full, WORDS, WAKE_MODEL_DIR or VOSK_MODEL_DIR, clock=clock) if mode == "wake" else full
+    asr.load()
+    if hasattr(asr, "pop_events"):
+        asr.pop_events()
+    vad = EnergyVad(VAD_THRESHOLD or 300.0)
+    tables = default_catalog().tables
+    out = {"partials": 0, "finals": 0, "commands": 0, "intents": {}}
+
+    def final(hyps):
+        if not hyps:
+            return
+        out["finals"] += 1
+        scores, _ = score_hypotheses(hyps, tables)
+        intent, _ = best_intent(scores, tables, MIN_SCORE)
+        if intent is not None:
+            out["commands"] += 1
+            out["intents"][intent.name] = out["intents"].get(intent.name, 0) + 1
+
+    audio_s = 0.0
+    cpu0, t0 = time.process_time(), time.perf_counter()
+    with open(path, "rb") as f:
+        while True:
+            pcm = f.read(CHUNK)
+            if len(pcm) < 2:
+                break
+            audio_s += len(pcm) / (2.0 * SAMPLE_RATE)
+            clock.t = audio_s
+            for p, flag in vad.feed(pcm):
+                res = asr.accept(p)
+                if flag == "end" and (res is None or res[0] != "final"):
+                    hyps = asr.flush()
+                    res = ("final", hyps) if hyps else None
+                if res is None:
+                    continue
+                if res[0] == "partial":
+                    out["partials"] += 1
+                else:
+                    final(res[1])
+    final(asr.flush())
+    cpu = time.process_time() - cpu0
+    out.update({"audio_s": round(audio_s, 1), "vad_duty": round(vad.duty, 3),
+                "cpu_pct": round(cpu / audio_s * 100.0, 2) if audio_s else None,
+                "wall_s": round(time.perf_counter() - t0, 2)})
+    if mode == "wake":
+        st = asr.stats()
+        lat = sorted(asr.wake_to_final)
+        out.update({"wakes": st["wakes"], "armed_frac": st["armed_frac"],
+                    "wakes_per_h": round(st["wakes"] / audio_s * 3600.0, 1) if audio_s else None,
+                    "wake_to_cmd_ms_p50": round(lat[len(lat) // 2]) if lat else None,
+                    "wake_to_cmd_ms_p95": round(lat[min(len(lat) - 1, int(len(lat) * 0.95))]) if lat else None,
+                    "handover_ms": st["handover_ms"], "spot_ms_per_chunk": st["spot_ms_per_chunk"]})
+    return out
+
+def main():
+    if not NOISE and not CMDS:
+        print(__doc__)
+        raise SystemExit(2)
+    rows = {}
+    for name, path in (("noise", NOISE), ("cmds", CMDS)):
+        if not path:
+            continue
+        for mode in ("full", "wake"):
+            r = run(path, mode)
+            rows[f"{name}/{mode}"] = r
+            print(f"[BENCH] {name:<5} {mode:<4} audio={r['audio_s']}s vad_duty={r['vad_duty']} cpu={r['cpu_pct']}% "
+                  f"partials={r['partials']} finals={r['finals']} commands={r['commands']}"
+                  + (f" wakes={r['wakes']} ({r['wakes_per_h']}/h) armed={r['armed_frac']} "
+                     f"wake→cmd p50={r['wake_to_cmd_ms_p50']}ms p95={r['wake_to_cmd_ms_p95']}ms "
+                     f"handover={r['handover_ms']}ms" if mode == "wake" else ""))
+    if "noise/wake" in rows:
+        n, w = rows["noise/full"], rows["noise/wake"]
+        print(f"[BENCH] noise: CPU {n['cpu_pct']}% → {w['cpu_pct']}%, 오인 명령 {n['commands']} → {w['commands']}, "
+              f"호출 오인식 {w['wakes_per_h']}/h")
+    if "cmds/wake" in rows:
+        print(f"[BENCH] cmds : 명령 {rows['cmds/full']['commands']} (상시) vs {rows['cmds/wake']['commands']} (호출어), "
+              f"wake→cmd p50 {rows['cmds/wake']['wake_to_cmd_ms_p50']}ms")
+    out = os.environ.get("BENCH_JSON")
+    if out:
+        with open(out, "w") as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+        print(f"[INFO] wrote {out}")
+
+if __name__ == "__main__":
+    main()